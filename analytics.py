@@ -0,0 +1,194 @@
+import logging
+import time
+from datetime import datetime
+
+from sqlalchemy import select
+
+from extensions import db
+
+# Dimensions score distributions are broken down by
+DIMENSIONS = ('sector', 'location', 'social_category')
+
+# Scores are histogrammed into 100 bins of 0.01; quantiles are read off the histogram
+BINS = 100
+
+# Conversion is reported per band of this many bins (10 = 10-point bands)
+BAND_WIDTH = 10
+
+# Reserved-seat categories: quota column -> how a student qualifies
+QUOTA_CATEGORIES = {
+    'sc_quota': ('social_category', ('SC',)),
+    'st_quota': ('social_category', ('ST',)),
+    'obc_quota': ('social_category', ('OBC',)),
+    'rural_quota': ('district_type', ('Rural', 'Aspirational')),
+}
+
+UNKNOWN = 'Not specified'
+
+
+def _histogram_quantile(histogram, q):
+    """Score at quantile q (0-1) of a BINS-bin histogram, to the bin midpoint"""
+    import numpy as np
+
+    total = histogram.sum()
+    if not total:
+        return None
+    position = int(np.searchsorted(np.cumsum(histogram), q * total, side='left'))
+    return (min(position, BINS - 1) + 0.5) / BINS
+
+
+class _Accumulator:
+    """Per-group score histograms plus application and acceptance counts, merged chunk by chunk"""
+
+    def __init__(self):
+        self.histograms = {}
+        self.sums = {}
+        self.applied = {}
+        self.accepted = {}
+
+    def add(self, frame, key):
+        import numpy as np
+
+        grouped = frame.groupby(key, sort=False)
+        bins = grouped['bin'].value_counts()
+        for (value, bin_), count in bins.items():
+            histogram = self.histograms.get(value)
+            if histogram is None:
+                histogram = self.histograms[value] = np.zeros(BINS, dtype=np.int64)
+            histogram[bin_] += count
+        for value, total in grouped['overall_score'].sum().items():
+            self.sums[value] = self.sums.get(value, 0.0) + float(total)
+        for value, total in grouped['applied'].sum().items():
+            self.applied[value] = self.applied.get(value, 0) + int(total)
+        for value, total in grouped['accepted'].sum().items():
+            self.accepted[value] = self.accepted.get(value, 0) + int(total)
+
+    def rows(self):
+        for value, histogram in self.histograms.items():
+            matches = int(histogram.sum())
+            yield value, {
+                'matches': matches,
+                'mean_score': self.sums[value] / matches if matches else None,
+                'p25': _histogram_quantile(histogram, 0.25),
+                'p50': _histogram_quantile(histogram, 0.50),
+                'p75': _histogram_quantile(histogram, 0.75),
+                'applied': self.applied.get(value, 0),
+                'accepted': self.accepted.get(value, 0),
+            }
+
+
+def _match_query():
+    from generations import live_matches
+    from models import Application, Internship, Match, Student
+
+    return select(
+        Match.overall_score, Internship.sector, Internship.location, Student.social_category,
+        Application.status.label('application_status'),
+    ).join(Internship, Match.internship_id == Internship.id)\
+     .join(Student, Match.student_id == Student.id)\
+     .outerjoin(Application, (Application.student_id == Match.student_id)
+                & (Application.internship_id == Match.internship_id))\
+     .where(live_matches())\
+     .execution_options(stream_results=True)
+
+
+def _quota_query():
+    from models import Application, Internship, Student
+
+    return select(
+        Application.internship_id, Student.social_category, Student.district_type,
+        Internship.sc_quota, Internship.st_quota, Internship.obc_quota, Internship.rural_quota,
+    ).join(Student, Application.student_id == Student.id)\
+     .join(Internship, Application.internship_id == Internship.id)\
+     .where(Application.status == 'accepted', Internship.is_active.is_(True))\
+     .execution_options(stream_results=True)
+
+
+def compute_match_analytics(connection, chunksize=50000):
+    """Summaries of stored matches and applications, reading the raw tables in chunks.
+
+    Returns {'scores': {dimension: {value: stats}}, 'conversion': {band: stats},
+    'quotas': {quota column: {'reserved_seats', 'filled'}}}. Only the histograms
+    and counters are kept between chunks, so memory does not grow with the tables.
+    """
+    import numpy as np
+    import pandas as pd
+
+    from models import Internship
+
+    by_dimension = {dimension: _Accumulator() for dimension in DIMENSIONS}
+    by_band = _Accumulator()
+    for frame in pd.read_sql(_match_query(), connection, chunksize=chunksize):
+        frame['bin'] = np.clip((frame['overall_score'].to_numpy() * BINS).astype(np.int64), 0, BINS - 1)
+        frame['band'] = frame['bin'] // BAND_WIDTH * BAND_WIDTH
+        frame['applied'] = frame['application_status'].notna()
+        frame['accepted'] = frame['application_status'] == 'accepted'
+        for dimension in DIMENSIONS:
+            frame[dimension] = frame[dimension].fillna('').str.strip().replace('', UNKNOWN)
+            by_dimension[dimension].add(frame, dimension)
+        by_band.add(frame, 'band')
+
+    # Seats reserved across active internships, and accepted students filling them
+    # (at most the quota per internship)
+    quota_columns = list(QUOTA_CATEGORIES)
+    reserved = connection.execute(select(*[db.func.coalesce(db.func.sum(getattr(Internship, column)), 0)
+                                           for column in quota_columns])
+                                  .where(Internship.is_active.is_(True))).one()
+    filled = dict.fromkeys(quota_columns, 0)
+    for frame in pd.read_sql(_quota_query(), connection, chunksize=chunksize):
+        for column, (field, qualifying) in QUOTA_CATEGORIES.items():
+            eligible = frame[frame[field].isin(qualifying) & (frame[column].fillna(0) > 0)]
+            if eligible.empty:
+                continue
+            per_internship = eligible.groupby('internship_id').agg(count=(column, 'size'), quota=(column, 'first'))
+            filled[column] += int(np.minimum(per_internship['count'], per_internship['quota']).sum())
+
+    return {
+        'scores': {dimension: dict(accumulator.rows()) for dimension, accumulator in by_dimension.items()},
+        'conversion': dict(by_band.rows()),
+        'quotas': {column: {'reserved_seats': int(seats), 'filled': filled[column]}
+                   for column, seats in zip(quota_columns, reserved)},
+    }
+
+
+def refresh_match_analytics(chunksize=50000):
+    """Recompute the analytics and replace the summary tables in one transaction.
+
+    Returns the seconds taken.
+    """
+    from models import MatchConversion, MatchScoreStat, QuotaFill
+
+    start = time.perf_counter()
+    summary = compute_match_analytics(db.session.connection(), chunksize=chunksize)
+    now = datetime.utcnow()
+    try:
+        for model in (MatchScoreStat, MatchConversion, QuotaFill):
+            model.query.delete()
+        db.session.add_all(MatchScoreStat(dimension=dimension, value=str(value), computed_at=now, **stats)
+                           for dimension, values in summary['scores'].items()
+                           for value, stats in values.items())
+        db.session.add_all(MatchConversion(band=int(band), matches=stats['matches'], applied=stats['applied'],
+                                           accepted=stats['accepted'], computed_at=now)
+                           for band, stats in summary['conversion'].items())
+        db.session.add_all(QuotaFill(category=column.replace('_quota', '').upper(), computed_at=now, **stats)
+                           for column, stats in summary['quotas'].items())
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    seconds = time.perf_counter() - start
+    logging.info(f"Refreshed match analytics in {seconds:.2f}s")
+    return seconds
+
+
+def dashboard_summary(top=8):
+    """What the admin dashboard shows, read from the summary tables only"""
+    from models import MatchConversion, MatchScoreStat, QuotaFill
+
+    scores = {dimension: MatchScoreStat.query.filter_by(dimension=dimension)
+                                             .order_by(MatchScoreStat.matches.desc()).limit(top).all()
+              for dimension in DIMENSIONS}
+    conversion = MatchConversion.query.order_by(MatchConversion.band).all()
+    quotas = QuotaFill.query.order_by(QuotaFill.category).all()
+    computed_at = max((row.computed_at for row in conversion + quotas), default=None)
+    return {'scores': scores, 'conversion': conversion, 'quotas': quotas, 'computed_at': computed_at}
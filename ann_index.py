@@ -0,0 +1,161 @@
+import numpy as np
+from scipy import sparse
+
+
+def _rademacher_signs(columns, n_planes, seed):
+    """Deterministic +/-1 hyperplane coefficients for the given feature columns.
+
+    Coefficients are derived by hashing (seed, column, plane), so the projection
+    matrix is never materialised: only the columns present in a query are
+    generated, which keeps 2**19-wide hashing vectors as cheap as small TF-IDF ones.
+    """
+    x = (columns.astype(np.uint64)[:, None] * np.uint64(n_planes)
+         + np.arange(n_planes, dtype=np.uint64)[None, :]) ^ np.uint64(seed)
+    # splitmix64 finaliser
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    x = x ^ (x >> np.uint64(31))
+    return np.where(x >> np.uint64(63), 1.0, -1.0).astype(np.float32)
+
+
+class SkillsLSHIndex:
+    """Random-hyperplane LSH over L2-normalised sparse skill vectors.
+
+    Each of ``n_tables`` hash tables buckets vectors by the sign pattern of
+    ``n_bits`` random projections, so similar vectors (small angle) collide with
+    high probability. Queries gather the colliding buckets, optionally probing
+    every bucket one bit away, and re-rank only those candidates exactly.
+    Removal tombstones an ID; buckets are compacted once tombstones pile up.
+    """
+
+    def __init__(self, n_tables=8, n_bits=12, seed=0):
+        if n_bits > 62:
+            raise ValueError("n_bits must be at most 62")
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.seed = seed
+        self.tables = [dict() for _ in range(n_tables)]
+        self.tombstones = set()
+        self._bit_weights = (np.uint64(1) << np.arange(n_bits, dtype=np.uint64))
+        # Vectors live in one CSR row store so re-ranking is a single fancy-indexed product
+        self._matrix = None
+        self._pending = []
+        self._row_of = {}
+        self._n_rows = 0
+
+    def __len__(self):
+        return len(self._row_of)
+
+    def __contains__(self, internship_id):
+        return internship_id in self._row_of
+
+    def _keys(self, matrix):
+        """Bucket key of every row in every table, shape (rows, n_tables)"""
+        matrix = sparse.csr_matrix(matrix)
+        n_planes = self.n_tables * self.n_bits
+        columns = np.unique(matrix.indices)
+        if len(columns) == 0:
+            bits = np.zeros((matrix.shape[0], n_planes), dtype=bool)
+        else:
+            projected = matrix[:, columns] @ _rademacher_signs(columns, n_planes, self.seed)
+            bits = np.asarray(projected) > 0
+        bits = bits.reshape(matrix.shape[0], self.n_tables, self.n_bits).astype(np.uint64)
+        return (bits * self._bit_weights).sum(axis=2, dtype=np.uint64)
+
+    def _rows(self):
+        """The row store, folding in rows appended since the last call"""
+        if self._pending:
+            parts = ([self._matrix] if self._matrix is not None else []) + self._pending
+            self._matrix = sparse.vstack(parts, format='csr')
+            self._pending = []
+        return self._matrix
+
+    def _vector(self, internship_id):
+        return self._rows()[self._row_of[internship_id]]
+
+    def add_many(self, internship_ids, matrix):
+        """Insert (or replace) one vector per ID; rows of ``matrix`` align with ``internship_ids``"""
+        matrix = sparse.csr_matrix(matrix, dtype=np.float32)
+        keys = self._keys(matrix)
+        for internship_id in internship_ids:
+            internship_id = int(internship_id)
+            if internship_id in self._row_of:
+                self._unlink(internship_id)
+            elif internship_id in self.tombstones:
+                # Re-inserting a removed ID: purge its stale entries first
+                self.compact()
+        self._pending.append(matrix)
+        for row, internship_id in enumerate(internship_ids):
+            internship_id = int(internship_id)
+            self._row_of[internship_id] = self._n_rows + row
+            for table, key in zip(self.tables, keys[row]):
+                table.setdefault(int(key), []).append(internship_id)
+        self._n_rows += matrix.shape[0]
+
+    def add(self, internship_id, vector):
+        self.add_many([internship_id], vector)
+
+    def _unlink(self, internship_id):
+        """Remove an ID from the buckets of its current vector; its old row becomes dead"""
+        for table, key in zip(self.tables, self._keys(self._vector(internship_id))[0]):
+            bucket = table.get(int(key))
+            if bucket and internship_id in bucket:
+                bucket.remove(internship_id)
+                if not bucket:
+                    del table[int(key)]
+        del self._row_of[internship_id]
+
+    def remove(self, internship_id):
+        """Tombstone an ID; its bucket entries are skipped until the next compaction"""
+        if self._row_of.pop(int(internship_id), None) is not None:
+            self.tombstones.add(int(internship_id))
+            if len(self.tombstones) > max(64, len(self._row_of) // 4):
+                self.compact()
+
+    def compact(self):
+        """Drop tombstoned IDs from every bucket and dead rows from the row store"""
+        for table in self.tables:
+            for key in list(table):
+                live = [i for i in table[key] if i not in self.tombstones]
+                if live:
+                    table[key] = live
+                else:
+                    del table[key]
+        self.tombstones.clear()
+
+        ids = list(self._row_of)
+        if ids:
+            self._matrix = self._rows()[[self._row_of[i] for i in ids]]
+        else:
+            self._matrix = None
+        self._row_of = {internship_id: row for row, internship_id in enumerate(ids)}
+        self._n_rows = len(ids)
+
+    def candidates(self, vector, multiprobe=True):
+        """IDs sharing a bucket with the query in any table"""
+        keys = self._keys(vector)[0]
+        found = set()
+        for table, key in zip(self.tables, keys):
+            key = int(key)
+            found.update(table.get(key, ()))
+            if multiprobe:
+                for bit in range(self.n_bits):
+                    found.update(table.get(key ^ (1 << bit), ()))
+        return found - self.tombstones
+
+    def query(self, vector, top_n=50, multiprobe=True):
+        """Approximate top-N most similar IDs as {internship_id: cosine similarity}"""
+        candidate_ids = [i for i in self.candidates(vector, multiprobe) if i in self._row_of]
+        if len(candidate_ids) < top_n:
+            # Too few collisions (small catalog or an unusual query): an exact scan is
+            # no more expensive than the scorer would have been without the index
+            candidate_ids = list(self._row_of)
+        if not candidate_ids:
+            return {}
+        rows = self._rows()[[self._row_of[i] for i in candidate_ids]]
+        similarities = (rows @ sparse.csr_matrix(vector, dtype=np.float32).T).toarray().ravel()
+        if len(candidate_ids) > top_n:
+            best = np.argpartition(-similarities, top_n)[:top_n]
+        else:
+            best = np.arange(len(candidate_ids))
+        return {candidate_ids[i]: float(min(similarities[i], 1.0)) for i in best if similarities[i] > 0}
@@ -3,6 +3,7 @@ import logging
 from flask import Flask
 from werkzeug.middleware.proxy_fix import ProxyFix
 from extensions import db, migrate
+from replicas import replica_binds
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
@@ -20,20 +21,140 @@ def create_app():
         "pool_pre_ping": True,
     }
 
+    # Read replicas for read-only views (comma-separated URLs), and how many seconds a
+    # user's own writes keep their reads on the primary
+    app.config["SQLALCHEMY_BINDS"] = replica_binds(os.environ.get("DATABASE_REPLICA_URLS"))
+    app.config["REPLICA_READ_YOUR_WRITES"] = float(os.environ.get("REPLICA_READ_YOUR_WRITES", "5"))
+
+    # Fast boot: no schema work at startup (run `flask db upgrade` instead) and the
+    # matching engine is warmed up lazily on the first scoring call
+    app.config["FAST_BOOT"] = os.environ.get("FAST_BOOT", "0") == "1"
+
+    # Directory holding versioned matching-engine snapshots
+    app.config["ENGINE_SNAPSHOT_DIR"] = os.environ.get(
+        "ENGINE_SNAPSHOT_DIR", os.path.join(app.instance_path, "engine_snapshots")
+    )
+
+    # Skills similarity backend: "tfidf" (fitted vocabulary) or "hashing" (fit-free)
+    app.config["SKILLS_BACKEND"] = os.environ.get("SKILLS_BACKEND", "tfidf")
+
+    # Approximate nearest-neighbour preselection for "Generate Matches" (0 scores every internship)
+    app.config["ANN_CANDIDATES"] = int(os.environ.get("ANN_CANDIDATES", "0"))
+    app.config["ANN_TABLES"] = int(os.environ.get("ANN_TABLES", "8"))
+    app.config["ANN_BITS"] = int(os.environ.get("ANN_BITS", "12"))
+
+    # Password hashing: werkzeug method string (e.g. "scrypt" or "pbkdf2:sha256:600000"), threads
+    # of the per-process hash-check pool, further checks that may wait (0 = twice the threads)
+    # and seconds a login waits for a slot
+    app.config["PASSWORD_HASH_METHOD"] = os.environ.get("PASSWORD_HASH_METHOD", "scrypt")
+    app.config["PASSWORD_HASH_WORKERS"] = int(os.environ.get("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+    app.config["PASSWORD_HASH_QUEUE"] = int(os.environ.get("PASSWORD_HASH_QUEUE", "0"))
+    app.config["PASSWORD_CHECK_WAIT"] = float(os.environ.get("PASSWORD_CHECK_WAIT", "1.0"))
+
+    # Seconds a signed-in user's row is reused across requests (0 loads it once per request)
+    app.config["IDENTITY_CACHE_TTL"] = float(os.environ.get("IDENTITY_CACHE_TTL", "0"))
+
+    # Rendered-page cache for anonymous visitors; RESPONSE_CACHE_DIR adds a tier shared by workers
+    app.config["RESPONSE_CACHE_ENTRIES"] = int(os.environ.get("RESPONSE_CACHE_ENTRIES", "512"))
+    app.config["RESPONSE_CACHE_MAX_BYTES"] = int(os.environ.get("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+    app.config["RESPONSE_CACHE_DIR"] = os.environ.get("RESPONSE_CACHE_DIR")
+
+    # Weight of the student's match score when re-ranking search results (0 = text rank only)
+    app.config["SEARCH_BLEND_WEIGHT"] = float(os.environ.get("SEARCH_BLEND_WEIGHT", "0.3"))
+
+    # Facet index: seconds between cheap staleness checks, and maximum age before a full rebuild
+    app.config["FACET_CHECK_INTERVAL"] = float(os.environ.get("FACET_CHECK_INTERVAL", "5"))
+    app.config["FACET_MAX_AGE"] = float(os.environ.get("FACET_MAX_AGE", "300"))
+
+    # Deadline expiry: run every EXPIRY_INTERVAL seconds in each process (0 = only via
+    # `flask internships expire`); EXPIRY_PRUNE is "flag" or "delete" for pending matches
+    app.config["EXPIRY_INTERVAL"] = float(os.environ.get("EXPIRY_INTERVAL", "0"))
+    app.config["EXPIRY_PRUNE"] = os.environ.get("EXPIRY_PRUNE", "flag")
+
+    # Match retention: matches kept per student (0 keeps all), capped when matches are generated
+    # and by `flask matches archive` (which also archives stale ones), and students per archive
+    # transaction
+    app.config["MATCH_RETENTION_TOP_K"] = int(os.environ.get("MATCH_RETENTION_TOP_K", "50"))
+    app.config["MATCH_RETENTION_BATCH"] = int(os.environ.get("MATCH_RETENTION_BATCH", "1000"))
+
+    # Match weights: a named profile (see weights.WEIGHT_PROFILES, extendable here), or an
+    # explicit "skills=0.4,academic=0.2,..." MATCH_WEIGHTS that takes precedence
+    from weights import WEIGHT_PROFILES, resolve_weights
+    app.config["MATCH_WEIGHT_PROFILES"] = dict(WEIGHT_PROFILES)
+    app.config["MATCH_WEIGHT_PROFILE"] = os.environ.get("MATCH_WEIGHT_PROFILE", "default")
+    app.config["MATCH_WEIGHTS"] = os.environ.get("MATCH_WEIGHTS")
+    # Seconds between checks for weights switched with `flask matches reweight`
+    app.config["MATCH_WEIGHTS_CHECK_INTERVAL"] = float(os.environ.get("MATCH_WEIGHTS_CHECK_INTERVAL", "5"))
+
+    # Full rematch ("Generate All Matches", `flask matches rematch`): students per batch, and
+    # the RSS ceiling in MB the run aborts at (0 = unchecked)
+    app.config["REMATCH_BATCH_SIZE"] = int(os.environ.get("REMATCH_BATCH_SIZE", "1000"))
+    app.config["REMATCH_MEMORY_LIMIT_MB"] = int(os.environ.get("REMATCH_MEMORY_LIMIT_MB", "1024"))
+    # Seconds without a checkpoint after which a running rematch is presumed dead and resumable
+    app.config["REMATCH_STALE_AFTER"] = float(os.environ.get("REMATCH_STALE_AFTER", "300"))
+    # Seconds a superseded match generation is kept for requests still reading it
+    app.config["REMATCH_GC_GRACE"] = float(os.environ.get("REMATCH_GC_GRACE", "600"))
+    # MB one students x internships score tile may take
+    app.config["REMATCH_TILE_BUDGET_MB"] = float(os.environ.get("REMATCH_TILE_BUDGET_MB", "64"))
+
     # Initialize extensions
     db.init_app(app)
     migrate.init_app(app, db)
 
     # Import models to register them with SQLAlchemy
-    from models import Student, Department, Admin, Internship, Match, Application
+    from models import Student, Department, Admin, Internship, Match, MatchArchive, Application
+    from models import MatchScoreStat, MatchConversion, QuotaFill, ShadowRun, ShadowScore, MatchRun, AppSetting
 
     # Import and register blueprint
     from routes import bp as main_bp
     app.register_blueprint(main_bp)
 
-    # Create tables in development
-    with app.app_context():
-        db.create_all()
+    import replicas
+    replicas.init_app(app)
+
+    # Request-scoped current-user loader
+    import auth
+    auth.init_app(app)
+
+    import response_cache
+    response_cache.init_app(app)
+
+    import facets
+    facets.init_app(app)
+
+    import expiry
+    expiry.init_app(app)
+
+    # Register CLI commands
+    from commands import register_commands
+    register_commands(app)
+
+    # Create tables in development; fast-boot deployments rely on Alembic migrations
+    if not app.config["FAST_BOOT"]:
+        with app.app_context():
+            db.create_all()
+            from search import ensure_search_index
+            with db.engine.begin() as connection:
+                ensure_search_index(connection)
+
+    # Map the latest engine snapshot so workers start without refitting
+    from routes import matching_engine
+    matching_engine.configure(
+        snapshot_dir=app.config["ENGINE_SNAPSHOT_DIR"],
+        skills_backend=app.config["SKILLS_BACKEND"],
+        ann_candidates=app.config["ANN_CANDIDATES"],
+        ann_tables=app.config["ANN_TABLES"],
+        ann_bits=app.config["ANN_BITS"],
+        weights=resolve_weights(app.config["MATCH_WEIGHT_PROFILE"], app.config["MATCH_WEIGHTS"],
+                                app.config["MATCH_WEIGHT_PROFILES"]),
+        rematch_batch_size=app.config["REMATCH_BATCH_SIZE"],
+        rematch_memory_limit_mb=app.config["REMATCH_MEMORY_LIMIT_MB"],
+        rematch_tile_budget_mb=app.config["REMATCH_TILE_BUDGET_MB"],
+        match_top_k=app.config["MATCH_RETENTION_TOP_K"],
+        weights_check_interval=app.config["MATCH_WEIGHTS_CHECK_INTERVAL"],
+    )
+    if not app.config["FAST_BOOT"]:
+        matching_engine.warm_up()
 
     return app
 
@@ -0,0 +1,169 @@
+import hmac
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import abort, flash, g, redirect, request, session, url_for
+from sqlalchemy.orm import make_transient_to_detached
+from werkzeug.local import LocalProxy
+
+from extensions import db
+from models import Student, Department, Admin
+
+USER_MODELS = {
+    'student': Student,
+    'department': Department,
+    'admin': Admin,
+}
+
+_MISSING = object()
+
+
+class IdentityCache:
+    """Short-lived, per-process cache of the column values of signed-in users.
+
+    Only plain column values are kept, never ORM instances, so entries are safe to
+    share between threads and sessions. Each entry carries the identity_stamp of
+    the row it was read from, and is only served to a session signed in with the
+    same stamp, so a password change made in another worker is never hidden by
+    a cached copy. A hit is turned back into a persistent instance with
+    ``session.merge(load=False)``, which issues no SELECT; _load_user uses it for
+    read-only requests only.
+    """
+
+    def __init__(self, ttl=30.0, max_entries=10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_type, user_id, stamp):
+        with self._lock:
+            entry = self._entries.get((user_type, user_id))
+            if entry is None:
+                return None
+            expires_at, entry_stamp, values = entry
+            if expires_at < time.monotonic() or entry_stamp != stamp:
+                del self._entries[(user_type, user_id)]
+                return None
+            self._entries.move_to_end((user_type, user_id))
+            return values
+
+    def put(self, user_type, user):
+        values = {attr.key: getattr(user, attr.key) for attr in db.inspect(type(user)).column_attrs}
+        with self._lock:
+            self._entries[(user_type, user.id)] = (time.monotonic() + self.ttl, identity_stamp(user), values)
+            self._entries.move_to_end((user_type, user.id))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_type, user_id):
+        with self._lock:
+            self._entries.pop((user_type, user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+identity_cache = IdentityCache()
+
+
+def identity_stamp(user):
+    """Credential version kept in the session at sign-in: when the password was last set.
+
+    A hash upgraded on login (new hashing parameters) keeps it, so only a real
+    password change ends the user's other sessions.
+    """
+    return user.password_changed_at.isoformat() if user.password_changed_at else ''
+
+
+def _load_user(user_type, user_id, stamp):
+    """Fetch the signed-in user, from the identity cache when it is enabled.
+
+    Cached copies are only used for GET and HEAD requests, so a view that writes
+    to the user always works on the current row. A session whose stamp no longer
+    matches the row (the password changed since it signed in) gets no user.
+    """
+    model = USER_MODELS[user_type]
+    cached = identity_cache.ttl > 0 and stamp is not None
+    if cached and request.method in ('GET', 'HEAD'):
+        values = identity_cache.get(user_type, user_id, stamp)
+        if values is not None:
+            user = model(**values)
+            make_transient_to_detached(user)
+            return db.session.merge(user, load=False)
+
+    user = db.session.get(model, user_id)
+    if user is not None and stamp is not None and identity_stamp(user) != stamp:
+        return None
+    if user is not None and cached:
+        identity_cache.put(user_type, user)
+    return user
+
+
+def get_current_user():
+    """The signed-in Student, Department or Admin, resolved at most once per request"""
+    user = g.get('current_user', _MISSING)
+    if user is _MISSING:
+        user = None
+        user_type = session.get('user_type')
+        user_id = session.get('user_id')
+        if user_type in USER_MODELS and user_id:
+            user = _load_user(user_type, user_id, session.get('identity_stamp'))
+        g.current_user = user
+    return user
+
+
+current_user = LocalProxy(get_current_user)
+
+
+def invalidate_user(user_type, user_id):
+    """Drop a user's cached identity after their profile changed"""
+    identity_cache.invalidate(user_type, user_id)
+
+
+def login_required(user_type, message=None, category='danger'):
+    """Only let a signed-in user of ``user_type`` through; everyone else goes home.
+
+    ``message`` is flashed on the way out when given.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(*args, **kwargs):
+            if session.get('user_type') != user_type or get_current_user() is None:
+                if message:
+                    flash(message, category)
+                return redirect(url_for('main.index'))
+            return view(*args, **kwargs)
+        return wrapped
+    return decorator
+
+
+def csrf_token():
+    """Per-session token that forms posting to csrf_protected views carry as ``csrf_token``"""
+    if 'csrf_token' not in session:
+        session['csrf_token'] = secrets.token_urlsafe(32)
+    return session['csrf_token']
+
+
+def csrf_protected(view):
+    """Reject a POST whose ``csrf_token`` field does not match the session's token"""
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        expected = session.get('csrf_token')
+        if not expected or not hmac.compare_digest(request.form.get('csrf_token', ''), expected):
+            abort(400)
+        return view(*args, **kwargs)
+    return wrapped
+
+
+def init_app(app):
+    """Configure the identity cache and expose ``current_user`` and ``csrf_token`` to templates"""
+    identity_cache.ttl = app.config.get("IDENTITY_CACHE_TTL", 0)
+
+    @app.context_processor
+    def inject_current_user():
+        return {'current_user': current_user, 'csrf_token': csrf_token}
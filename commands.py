@@ -0,0 +1,544 @@
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+engine_cli = AppGroup('engine', help='Matching engine state management.')
+perf_cli = AppGroup('perf', help='Performance measurement tools.')
+internships_cli = AppGroup('internships', help='Internship maintenance tasks.')
+replica_cli = AppGroup('replica', help='Read replica tools.')
+matches_cli = AppGroup('matches', help='Match table maintenance.')
+analytics_cli = AppGroup('analytics', help='Match quality analytics.')
+shadow_cli = AppGroup('shadow', help='Shadow scoring of candidate engine versions.')
+
+
+@engine_cli.command('snapshot')
+@click.option('--keep', default=3, show_default=True, help='Number of snapshot versions to retain.')
+def engine_snapshot(keep):
+    """Fit the engine on active internships and publish a new snapshot"""
+    from routes import matching_engine
+
+    root = current_app.config["ENGINE_SNAPSHOT_DIR"]
+    state = matching_engine.fit()
+    version = matching_engine.save_snapshot(root, keep=keep)
+    click.echo(f"Published snapshot {version} ({len(state)} internships) to {root}")
+
+
+@engine_cli.command('snapshots')
+def engine_snapshots():
+    """List snapshot versions, marking the current one"""
+    from engine_state import list_snapshots, current_version
+
+    root = current_app.config["ENGINE_SNAPSHOT_DIR"]
+    current = current_version(root)
+    versions = list_snapshots(root)
+    if not versions:
+        click.echo(f"No snapshots in {root}")
+    for version in versions:
+        click.echo(f"{'*' if version == current else ' '} {version}")
+
+
+@internships_cli.command('expire')
+@click.option('--prune', type=click.Choice(['flag', 'delete']), default=None,
+              help='Flag (status "expired") or delete pending matches; defaults to EXPIRY_PRUNE.')
+@click.option('--batch-size', default=500, show_default=True)
+def internships_expire(prune, batch_size):
+    """Deactivate internships past their application deadline (run from cron)"""
+    from expiry import expire_internships
+
+    prune = prune or current_app.config["EXPIRY_PRUNE"]
+    expired_ids, pruned = expire_internships(prune=prune, batch_size=batch_size)
+    click.echo(f"Expired {len(expired_ids)} internships; "
+               f"{'deleted' if prune == 'delete' else 'flagged'} {pruned} pending matches")
+
+
+@matches_cli.command('archive')
+@click.option('--top-k', type=int, default=None, help='Matches kept per student; defaults to MATCH_RETENTION_TOP_K.')
+@click.option('--batch-size', type=int, default=None, help='Students per transaction; defaults to MATCH_RETENTION_BATCH.')
+def matches_archive(top_k, batch_size):
+    """Archive stale matches and those beyond each student's top K (run from cron)"""
+    from generations import live_matches
+    from models import Match, MatchArchive
+    from retention import RANK, STALE, archive_matches
+
+    top_k = current_app.config["MATCH_RETENTION_TOP_K"] if top_k is None else top_k
+    batch_size = batch_size or current_app.config["MATCH_RETENTION_BATCH"]
+    archived = archive_matches(top_k=top_k, batch_size=batch_size)
+    click.echo(f"Archived {archived[STALE]} stale matches and {archived[RANK]} beyond the top {top_k}; "
+               f"{Match.query.filter(live_matches()).count()} hot, {MatchArchive.query.count()} archived")
+
+
+@matches_cli.command('reweight')
+@click.option('--profile', default=None, help='Weight profile to switch to.')
+@click.option('--weights', default=None, help='Explicit "skills=0.4,academic=0.2,..." weights to switch to.')
+def matches_reweight(profile, weights):
+    """Switch the match weights and re-derive every live overall score, without rescoring.
+
+    Without options the switched weights are cleared and MATCH_WEIGHT_PROFILE/MATCH_WEIGHTS apply again.
+    """
+    from generations import unfinished_run
+    from weights import resolve_weights, reweight_matches
+
+    config = current_app.config
+    run = unfinished_run()
+    if run is not None:
+        # The run keeps scoring with the weights it started with and would publish them
+        raise click.ClickException(f"match run {run.id} is unfinished; switch weights after it is published")
+    switch = bool(profile or weights)
+    try:
+        if switch:
+            resolved = resolve_weights(profile or config["MATCH_WEIGHT_PROFILE"], weights,
+                                       config["MATCH_WEIGHT_PROFILES"])
+        else:
+            resolved = resolve_weights(config["MATCH_WEIGHT_PROFILE"], config["MATCH_WEIGHTS"],
+                                       config["MATCH_WEIGHT_PROFILES"])
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint='--profile/--weights')
+    rows, seconds = reweight_matches(resolved, switch=switch)
+    click.echo(f"Re-weighted {rows} matches in {seconds:.2f}s with "
+               + ", ".join(f"{name}={weight:.3f}" for name, weight in resolved.items()))
+
+
+@matches_cli.command('rematch')
+@click.option('--batch-size', type=int, default=None, help='Students per batch; defaults to REMATCH_BATCH_SIZE.')
+@click.option('--memory-limit', type=int, default=None,
+              help='RSS ceiling in MB; defaults to REMATCH_MEMORY_LIMIT_MB.')
+@click.option('--tile-budget', type=float, default=None,
+              help='MB per score tile; defaults to REMATCH_TILE_BUDGET_MB.')
+@click.option('--top-k', type=int, default=None,
+              help='Matches kept per student (0 = all above threshold); defaults to MATCH_RETENTION_TOP_K.')
+@click.option('--fresh', is_flag=True, help='Abandon an unfinished run instead of resuming it.')
+def matches_rematch(batch_size, memory_limit, tile_budget, top_k, fresh):
+    """Build and publish a new match generation for every student, resuming an interrupted run"""
+    from rematch import rematch_all
+    from routes import matching_engine
+
+    config = current_app.config
+    stats = rematch_all(matching_engine, batch_size=batch_size or config["REMATCH_BATCH_SIZE"],
+                        memory_limit_mb=config["REMATCH_MEMORY_LIMIT_MB"] if memory_limit is None else memory_limit,
+                        resume=not fresh, stale_after=config["REMATCH_STALE_AFTER"],
+                        gc_grace=config["REMATCH_GC_GRACE"],
+                        tile_budget_mb=tile_budget or config["REMATCH_TILE_BUDGET_MB"],
+                        top_k=config["MATCH_RETENTION_TOP_K"] if top_k is None else top_k)
+    click.echo(f"Published match run {stats['id']}: {stats['students_done']} students in {stats['batches_done']} "
+               f"batches over {stats['attempts']} attempt(s), {stats['matches_created']} matches, "
+               f"peak RSS {stats['peak_rss_mb']:.0f} MB")
+
+
+@matches_cli.command('gc')
+@click.option('--grace', type=float, default=None,
+              help='Seconds superseded generations are kept; defaults to REMATCH_GC_GRACE.')
+def matches_gc(grace):
+    """Delete match generations that were superseded or abandoned (run from cron)"""
+    from generations import current_generation, garbage_collect
+
+    deleted = garbage_collect(current_app.config["REMATCH_GC_GRACE"] if grace is None else grace)
+    click.echo(f"Deleted {deleted} matches of old generations; generation {current_generation()} is published")
+
+
+@matches_cli.command('runs')
+@click.option('--limit', default=5, show_default=True)
+def matches_runs(limit):
+    """Show the latest full rematch runs and their checkpoints"""
+    from models import MatchRun
+
+    runs = MatchRun.query.order_by(MatchRun.id.desc()).limit(limit).all()
+    if not runs:
+        click.echo("No match runs yet")
+    for run in runs:
+        progress = run.progress()
+        click.echo(f"Run {run.id} [{run.status}] {progress['percent']:.1f}%: {run.students_done}/{run.total_students} "
+                   f"students, {run.matches_created} matches, last student {run.last_student_id}, "
+                   f"{run.seconds:.1f}s over {run.attempts} attempt(s), peak RSS {run.peak_rss_mb or 0:.0f} MB"
+                   + (f" - {run.error}" if run.error else ""))
+
+
+@analytics_cli.command('refresh')
+@click.option('--chunksize', default=50000, show_default=True, help='Rows read per chunk.')
+def analytics_refresh(chunksize):
+    """Recompute match quality summaries for the admin dashboard (run from cron)"""
+    from analytics import refresh_match_analytics
+
+    seconds = refresh_match_analytics(chunksize=chunksize)
+    click.echo(f"Refreshed match analytics in {seconds:.2f}s")
+
+
+def _echo_shadow_run(run):
+    def fmt(value, spec='.3f'):
+        return '-' if value is None else format(value, spec)
+
+    click.echo(f"Run {run.id} [{run.status}] {run.label}: {run.pairs} matches of {run.students} students")
+    click.echo(f"  rank correlation {fmt(run.rank_correlation)}, top-{run.top_k} overlap {fmt(run.top_k_overlap)}")
+    click.echo(f"  score delta mean {fmt(run.mean_delta, '+.4f')}, |delta| mean {fmt(run.mean_abs_delta, '.4f')}, "
+               f"p95 {fmt(run.p95_abs_delta)}, max {fmt(run.max_abs_delta, '.4f')}")
+
+
+@shadow_cli.command('run')
+@click.option('--label', default=None, help='Name of the candidate; defaults to a description of the options.')
+@click.option('--engine', 'factory', default=None, help='Candidate engine as "module:attribute".')
+@click.option('--snapshot', default=None, help='Engine snapshot version the candidate loads.')
+@click.option('--skills-backend', default=None, help='Candidate skills backend.')
+@click.option('--profile', default=None, help='Candidate weight profile.')
+@click.option('--weights', default=None, help='Candidate "skills=0.4,academic=0.2,..." weights.')
+@click.option('--top-k', default=10, show_default=True, help='K for the top-K overlap.')
+@click.option('--batch-size', default=500, show_default=True, help='Students scored per batch.')
+@click.option('--pause', default=0.0, show_default=True, help='Seconds to sleep between batches.')
+@click.option('--keep', default=3, show_default=True, help='Shadow runs whose scores are retained.')
+def shadow_run(label, factory, snapshot, skills_backend, profile, weights, top_k, batch_size, pause, keep):
+    """Score live matches with a candidate engine into shadow_scores and compare with production"""
+    from shadow import candidate_engine, largest_deltas, run_shadow
+    from weights import resolve_weights
+
+    resolved = None
+    if profile or weights:
+        resolved = resolve_weights(profile, weights, current_app.config["MATCH_WEIGHT_PROFILES"])
+    label = label or ", ".join(f"{name}={value}" for name, value in (
+        ('engine', factory), ('snapshot', snapshot), ('skills_backend', skills_backend),
+        ('profile', profile), ('weights', weights)) if value) or 'production settings'
+    engine = candidate_engine(factory, snapshot, skills_backend, resolved)
+    run = run_shadow(engine, label, top_k=top_k, batch_size=batch_size, pause=pause, keep=keep)
+    _echo_shadow_run(run)
+    for score in largest_deltas(run.id, limit=5):
+        click.echo(f"  student {score.student_id} / internship {score.internship_id}: "
+                   f"{score.production_score:.3f} -> {score.overall_score:.3f}")
+
+
+@shadow_cli.command('report')
+@click.argument('run_id', type=int, required=False)
+@click.option('--limit', default=5, show_default=True, help='Runs listed when no run ID is given.')
+def shadow_report(run_id, limit):
+    """Show a shadow run's comparison with production, or the latest runs"""
+    from models import ShadowRun
+
+    if run_id is not None:
+        runs = [ShadowRun.query.get_or_404(run_id)]
+    else:
+        runs = ShadowRun.query.order_by(ShadowRun.id.desc()).limit(limit).all()
+    if not runs:
+        click.echo("No shadow runs yet")
+    for run in runs:
+        _echo_shadow_run(run)
+
+
+@replica_cli.command('sync')
+def replica_sync():
+    """Copy a SQLite primary into every SQLite replica (local stand-in for replication)"""
+    from replicas import sync_sqlite_replica
+
+    primary = current_app.config["SQLALCHEMY_DATABASE_URI"]
+    binds = current_app.extensions.get('replica_binds')
+    if not binds:
+        raise click.ClickException("No replicas configured; set DATABASE_REPLICA_URLS")
+    for key in binds:
+        url = current_app.config["SQLALCHEMY_BINDS"][key]
+        try:
+            seconds = sync_sqlite_replica(primary, url)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        click.echo(f"Synced {key} ({url}) in {seconds:.2f}s")
+
+
+@perf_cli.command('worker-rss')
+@click.option('--workers', default=4, show_default=True)
+@click.option('--requests', 'warmup_requests', default=200, show_default=True,
+              help='Requests sent before sampling so every worker has served traffic.')
+def perf_worker_rss(workers, warmup_requests):
+    """Compare per-worker memory of gunicorn with and without preload"""
+    from perf import measure_worker_memory, summarise_worker_memory
+
+    click.echo(f"{'mode':<12}{'workers':>8}{'RSS/worker':>14}{'PSS/worker':>14}"
+               f"{'private/worker':>16}{'total PSS':>12}")
+    for preload in (False, True):
+        summary = summarise_worker_memory(
+            measure_worker_memory(workers=workers, preload=preload, warmup_requests=warmup_requests)
+        )
+        click.echo(f"{'preload' if preload else 'per-worker':<12}{summary['workers']:>8}"
+                   f"{summary['Rss'] / 1024:>11.1f} MB{summary['Pss'] / 1024:>11.1f} MB"
+                   f"{summary['Private'] / 1024:>13.1f} MB{summary['total_pss'] / 1024:>9.1f} MB")
+
+
+@perf_cli.command('import-time')
+@click.option('--top', default=15, show_default=True, help='Number of slowest imports to list.')
+@click.option('--budget-ms', type=float, default=None,
+              help='Fail with exit code 1 if the cold start takes longer than this.')
+@click.option('--fast-boot/--no-fast-boot', default=True, show_default=True)
+def perf_import_time(top, budget_ms, fast_boot):
+    """Report cold-start time of the app and its slowest imports"""
+    from perf import measure_cold_start
+
+    wall, modules = measure_cold_start({"FAST_BOOT": "1" if fast_boot else "0"})
+    click.echo(f"Cold start (import main, FAST_BOOT={int(fast_boot)}): {wall * 1000:.0f} ms")
+    click.echo(f"{'cumulative':>12}{'self':>10}  module")
+    for name, self_us, cumulative_us, depth in sorted(modules, key=lambda m: m[2], reverse=True)[:top]:
+        click.echo(f"{cumulative_us / 1000:>9.1f} ms{self_us / 1000:>7.1f} ms  {'  ' * depth}{name}")
+
+    heavy = sorted({name.split('.')[0] for name, _, _, _ in modules} & {'sklearn', 'scipy', 'pandas', 'numpy'})
+    if heavy:
+        click.echo(f"Heavy packages imported at boot: {', '.join(heavy)}")
+
+    if budget_ms is not None and wall * 1000 > budget_ms:
+        click.echo(f"FAIL: cold start {wall * 1000:.0f} ms exceeds budget of {budget_ms:.0f} ms", err=True)
+        raise SystemExit(1)
+
+
+@perf_cli.command('skills-backends')
+@click.option('--students', default=200, show_default=True)
+@click.option('--internships', default=500, show_default=True)
+@click.option('--pairs', default=500, show_default=True, help='Pairs timed on the per-pair path.')
+@click.option('--variant-rate', default=0.5, show_default=True,
+              help='Share of skills written with a variant spelling (ML, Postgres, ...).')
+@click.option('--seed', default=0, show_default=True)
+def perf_skills_backends(students, internships, pairs, variant_rate, seed):
+    """Compare speed and match quality of the tfidf and hashing skills backends"""
+    from perf import compare_skills_backends
+
+    results, correlation = compare_skills_backends(students, internships, pairs, seed, variant_rate)
+    click.echo(f"{'backend':<10}{'pairs/s':>10}{'build':>10}{'students/s':>12}{'AUC':>8}{'P@5':>8}{'recall':>8}")
+    for backend, r in results.items():
+        click.echo(f"{backend:<10}{r['pairs_per_second']:>10.0f}{r['build_seconds'] * 1000:>8.0f}ms"
+                   f"{r['students_per_second']:>12.0f}{r['auc']:>8.3f}{r['precision_at_5']:>8.3f}"
+                   f"{r['relevant_recall']:>8.3f}")
+    click.echo(f"Spearman correlation between backends: {correlation:.3f}")
+
+
+@perf_cli.command('oauth-callback')
+@click.option('--users', default=200, show_default=True)
+@click.option('--concurrency', default=20, show_default=True)
+@click.option('--workers', default=4, show_default=True)
+@click.option('--latency-ms', default=50.0, show_default=True, help='Latency added by the stub per Google call.')
+@click.option('--error-rate', default=0.0, show_default=True, help='Share of stub calls answered with 503.')
+def perf_oauth_callback(users, concurrency, workers, latency_ms, error_rate):
+    """Load-test Google login end to end against a local OAuth stub"""
+    from perf import measure_oauth_callback, percentile
+
+    elapsed, latencies, errors = measure_oauth_callback(users, concurrency, workers, latency_ms, error_rate)
+    click.echo(f"{users} logins in {elapsed:.2f}s ({users / elapsed:.1f}/s), {errors} failed")
+    click.echo(f"latency p50 {percentile(latencies, 50) * 1000:.0f} ms, "
+               f"p95 {percentile(latencies, 95) * 1000:.0f} ms, p99 {percentile(latencies, 99) * 1000:.0f} ms")
+
+
+@perf_cli.command('login-throughput')
+@click.option('--accounts', default=50, show_default=True, help='Synthetic student accounts to log in as.')
+@click.option('--logins', default=500, show_default=True)
+@click.option('--concurrency', default=8, show_default=True)
+@click.option('--workers', type=int, default=None, help='Gunicorn workers (default: one per core).')
+@click.option('--method', default=None, help='PASSWORD_HASH_METHOD for the accounts and the server.')
+def perf_login_throughput(accounts, logins, concurrency, workers, method):
+    """Measure password logins per second (and per core) through gunicorn"""
+    import os
+
+    import passwords
+    from perf import measure_login_throughput, percentile
+    from synthetic import SYNTHETIC_PASSWORD, populate_students
+
+    method = method or current_app.config["PASSWORD_HASH_METHOD"]
+    passwords.configure(method=method)
+    # A separate index range keeps these accounts apart from other synthetic data
+    emails = populate_students(accounts, start=900000)
+    workers = workers or os.cpu_count() or 1
+
+    extra_env = {"PASSWORD_HASH_METHOD": method}
+    elapsed, latencies, accepted, busy, failed = measure_login_throughput(
+        emails, SYNTHETIC_PASSWORD, logins, concurrency, workers, extra_env)
+    cores = min(workers, os.cpu_count() or 1)
+    click.echo(f"method {method}, {workers} workers on {cores} core(s)")
+    click.echo(f"{accepted} logins in {elapsed:.2f}s: {accepted / elapsed:.1f}/s, "
+               f"{accepted / elapsed / cores:.1f}/s per core; {busy} shed (503), {failed} failed")
+    click.echo(f"latency p50 {percentile(latencies, 50) * 1000:.0f} ms, "
+               f"p95 {percentile(latencies, 95) * 1000:.0f} ms, p99 {percentile(latencies, 99) * 1000:.0f} ms")
+
+
+@perf_cli.command('search')
+@click.option('--internships', default=100000, show_default=True)
+@click.option('--queries', default=200, show_default=True)
+@click.option('--seed', default=0, show_default=True)
+def perf_search(internships, queries, seed):
+    """Time full-text search over synthetic internships in a scratch SQLite database"""
+    from perf import measure_search, percentile
+
+    build_seconds, latencies, mean_hits = measure_search(internships, queries, seed)
+    click.echo(f"Indexed {internships} internships in {build_seconds:.1f}s")
+    click.echo(f"{queries} queries (count + top 20), {mean_hits:.0f} hits on average: "
+               f"p50 {percentile(latencies, 50) * 1000:.1f} ms, p95 {percentile(latencies, 95) * 1000:.1f} ms, "
+               f"p99 {percentile(latencies, 99) * 1000:.1f} ms")
+
+
+@perf_cli.command('facets')
+@click.option('--internships', default=100000, show_default=True)
+@click.option('--queries', default=200, show_default=True)
+@click.option('--seed', default=0, show_default=True)
+def perf_facets(internships, queries, seed):
+    """Compare bitmap facet counts with GROUP BY over synthetic internships"""
+    from perf import measure_facets, percentile
+
+    build_seconds, bitmap, group_by = measure_facets(internships, queries, seed)
+    click.echo(f"Built facet index over {internships} internships in {build_seconds:.2f}s")
+    for name, latencies in (('bitmap index', bitmap), ('GROUP BY', group_by)):
+        click.echo(f"{name:>12}: p50 {percentile(latencies, 50) * 1000:.2f} ms, "
+                   f"p95 {percentile(latencies, 95) * 1000:.2f} ms")
+
+
+@perf_cli.command('seat-stress')
+@click.option('--applicants', default=200, show_default=True)
+@click.option('--seats', default=10, show_default=True)
+@click.option('--requests', 'n_requests', default=2000, show_default=True)
+@click.option('--concurrency', default=32, show_default=True)
+@click.option('--workers', default=4, show_default=True)
+@click.option('--threads', default=4, show_default=True, help='Threads per gunicorn worker.')
+def perf_seat_stress(applicants, seats, n_requests, concurrency, workers, threads):
+    """Race concurrent accept/reject requests for one internship and check its seat count"""
+    from extensions import db
+    from models import Application, Internship
+    from perf import measure_seat_stress, percentile
+    from synthetic import SYNTHETIC_PASSWORD, populate_applications, populate_department, populate_students
+
+    department = populate_department()
+    emails = populate_students(applicants, start=800000)
+    internship = Internship(department_id=department.id, title='Seat stress test', description='Seat stress test',
+                            sector='Technology', total_positions=seats, filled_positions=0)
+    db.session.add(internship)
+    db.session.commit()
+    internship_id = internship.id
+    application_ids = populate_applications(internship_id, emails)
+
+    try:
+        elapsed, latencies, codes = measure_seat_stress(department.email, SYNTHETIC_PASSWORD, application_ids,
+                                                        n_requests, concurrency, workers, threads)
+        db.session.expire_all()
+        filled = db.session.get(Internship, internship_id).filled_positions
+        accepted = Application.query.filter_by(internship_id=internship_id, status='accepted').count()
+    finally:
+        Application.query.filter_by(internship_id=internship_id).delete()
+        Internship.query.filter_by(id=internship_id).delete()
+        db.session.commit()
+
+    click.echo(f"{n_requests} status changes in {elapsed:.2f}s: {n_requests / elapsed:.1f}/s; "
+               f"responses {dict(codes)}")
+    click.echo(f"latency p50 {percentile(latencies, 50) * 1000:.0f} ms, "
+               f"p95 {percentile(latencies, 95) * 1000:.0f} ms, p99 {percentile(latencies, 99) * 1000:.0f} ms")
+    click.echo(f"seats: {filled} filled of {seats}, {accepted} accepted applications")
+    if filled != accepted or filled > seats:
+        raise click.ClickException("seat count is inconsistent with accepted applications")
+
+
+@perf_cli.command('apply-throughput')
+@click.option('--students', default=200, show_default=True)
+@click.option('--internships', default=50, show_default=True)
+@click.option('--submissions', 'n_submissions', default=2000, show_default=True)
+@click.option('--retry-rate', default=0.2, show_default=True, help='Share of forms posted twice.')
+@click.option('--concurrency', default=32, show_default=True)
+@click.option('--workers', default=4, show_default=True)
+@click.option('--threads', default=4, show_default=True, help='Threads per gunicorn worker.')
+def perf_apply_throughput(students, internships, n_submissions, retry_rate, concurrency, workers, threads):
+    """Measure application submissions per second through gunicorn"""
+    from extensions import db
+    from models import Application, Internship
+    from perf import measure_apply_throughput, percentile
+    from synthetic import SYNTHETIC_PASSWORD, make_internships, populate_department, populate_students
+
+    department = populate_department()
+    emails = populate_students(students, start=800000)
+    created = [internship for internship, _ in make_internships(internships, department.id, start=800000)]
+    db.session.add_all(created)
+    db.session.commit()
+    internship_ids = [internship.id for internship in created]
+
+    try:
+        elapsed, latencies, outcomes = measure_apply_throughput(
+            emails, SYNTHETIC_PASSWORD, internship_ids, n_submissions, concurrency, workers, threads, retry_rate)
+        stored = Application.query.filter(Application.internship_id.in_(internship_ids)).count()
+    finally:
+        Application.query.filter(Application.internship_id.in_(internship_ids)).delete(synchronize_session=False)
+        Internship.query.filter(Internship.id.in_(internship_ids)).delete(synchronize_session=False)
+        db.session.commit()
+
+    posts = len(latencies)
+    click.echo(f"{posts} posts ({n_submissions} forms) in {elapsed:.2f}s: {posts / elapsed:.1f}/s; {dict(outcomes)}")
+    click.echo(f"latency p50 {percentile(latencies, 50) * 1000:.0f} ms, "
+               f"p95 {percentile(latencies, 95) * 1000:.0f} ms, p99 {percentile(latencies, 99) * 1000:.0f} ms")
+    click.echo(f"{stored} applications stored")
+
+
+@perf_cli.command('load')
+@click.option('--mix', default='student=80,department=15,admin=5', show_default=True,
+              help='Relative share of virtual users per role.')
+@click.option('--users', default=20, show_default=True, help='Concurrent virtual users.')
+@click.option('--duration', default=30.0, show_default=True, help='Seconds to run.')
+@click.option('--students', default=100, show_default=True, help='Synthetic student accounts.')
+@click.option('--departments', default=5, show_default=True, help='Synthetic department accounts.')
+@click.option('--internships', default=10, show_default=True, help='Internships per department.')
+@click.option('--think-time', default=0.0, show_default=True, help='Mean pause between scenario loops.')
+@click.option('--workers', default=4, show_default=True)
+@click.option('--threads', default=4, show_default=True, help='Threads per gunicorn worker.')
+@click.option('--seed', default=0, show_default=True)
+def perf_load(mix, users, duration, students, departments, internships, think_time, workers, threads, seed):
+    """Drive a mix of student, department and admin sessions through gunicorn"""
+    from extensions import db
+    from loadtest import parse_mix, run_load
+    from models import Internship
+    from synthetic import SYNTHETIC_PASSWORD, make_internships, populate_department, populate_students
+
+    try:
+        mix = parse_mix(mix)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint='--mix')
+
+    # Accounts in their own index range; re-running reuses them
+    accounts = {'student': populate_students(students, seed=seed, start=700000), 'department': [], 'admin': []}
+    for index in range(departments):
+        department = populate_department(700000 + index)
+        accounts['department'].append(department.email)
+        missing = internships - Internship.query.filter_by(department_id=department.id).count()
+        if missing > 0:
+            db.session.add_all(internship for internship, _ in
+                               make_internships(missing, department.id, seed=seed + index, start=700000 + index * 1000))
+    db.session.commit()
+    accounts['admin'] = ['admin@synthetic.test']
+
+    elapsed, stats, roles = run_load(accounts, SYNTHETIC_PASSWORD, mix, users, duration, workers, threads,
+                                     think_time, seed)
+    total = sum(len(latencies) for latencies in stats.latencies.values())
+    errors = sum(stats.errors.values())
+    click.echo(f"{users} virtual users ({', '.join(f'{n} {role}' for role, n in roles.items())}) "
+               f"for {elapsed:.1f}s on {workers} workers x {threads} threads")
+    click.echo(f"{total} requests, {total / elapsed:.1f}/s, {errors} errors ({errors / max(total, 1):.1%})")
+    click.echo(f"{'route':<40} {'count':>7} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for label, count, rate, p50, p95, p99, error_rate in stats.summary(elapsed):
+        click.echo(f"{label:<40} {count:>7} {rate:>7.1f} {p50 * 1000:>8.0f} {p95 * 1000:>8.0f} "
+                   f"{p99 * 1000:>8.0f} {error_rate:>7.1%}")
+
+
+@perf_cli.command('rematch-memory')
+@click.option('--students', default=1000000, show_default=True)
+@click.option('--internships', default=10, show_default=True)
+@click.option('--batch-size', default=1000, show_default=True)
+@click.option('--memory-limit', default=512, show_default=True, help='RSS ceiling in MB the run must stay under.')
+@click.option('--tile-budget', default=64.0, show_default=True, help='MB per score tile.')
+@click.option('--top-k', default=0, show_default=True, help='Matches kept per student (0 = all above threshold).')
+@click.option('--seed', default=0, show_default=True)
+def perf_rematch_memory(students, internships, batch_size, memory_limit, tile_budget, top_k, seed):
+    """Verify a full rematch over synthetic students stays under a memory ceiling"""
+    from perf import measure_rematch_memory
+
+    try:
+        build_seconds, baseline, stats = measure_rematch_memory(students, internships, batch_size, memory_limit, seed,
+                                                                tile_budget, top_k)
+    except RuntimeError as e:
+        click.echo(f"FAIL: {e}", err=True)
+        raise SystemExit(1)
+    click.echo(f"Built {students} students x {internships} internships in {build_seconds:.1f}s")
+    click.echo(f"Rematched {stats['students_done']} students in {stats['batches_done']} batches of {batch_size}: "
+               f"{stats['matches_created']} matches in {stats['seconds']:.1f}s "
+               f"({stats['students_per_second']:.0f} students/s)")
+    click.echo(f"RSS {baseline:.0f} MB after boot, peak {stats['peak_rss_mb']:.0f} MB "
+               f"(ceiling {memory_limit} MB)")
+
+
+def register_commands(app):
+    """Attach all CLI command groups to the app"""
+    app.cli.add_command(engine_cli)
+    app.cli.add_command(perf_cli)
+    app.cli.add_command(internships_cli)
+    app.cli.add_command(replica_cli)
+    app.cli.add_command(matches_cli)
+    app.cli.add_command(analytics_cli)
+    app.cli.add_command(shadow_cli)
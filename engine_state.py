@@ -0,0 +1,288 @@
+import json
+import logging
+import os
+import shutil
+import zlib
+from datetime import datetime
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from skill_vectors import hashing_preprocess, hashing_vectors, preprocess_skills
+
+# Bump whenever the on-disk layout changes; older snapshots are then ignored
+SNAPSHOT_FORMAT = 1
+CURRENT_POINTER = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+
+# Internship text columns encoded as integer codes into a per-column category list
+CATEGORICAL_FIELDS = ['sector', 'location', 'preferred_course', 'year_of_study_requirement']
+
+# Internship numeric columns stored as dense arrays aligned with the matrix rows
+NUMERIC_FIELDS = {
+    'min_cgpa': np.float32,
+    'total_positions': np.int32,
+    'filled_positions': np.int32,
+    'rural_quota': np.int32,
+    'sc_quota': np.int32,
+    'st_quota': np.int32,
+    'obc_quota': np.int32,
+}
+
+
+def skills_fingerprint(skills_text):
+    """Cheap checksum used to detect internships edited after the state was built"""
+    return zlib.crc32((skills_text or "").encode("utf-8"))
+
+
+def encode_categories(values):
+    """Encode strings as int32 codes; -1 marks a missing value"""
+    categories = []
+    lookup = {}
+    codes = np.full(len(values), -1, dtype=np.int32)
+    for row, value in enumerate(values):
+        if not value:
+            continue
+        key = value.strip().lower()
+        if key not in lookup:
+            lookup[key] = len(categories)
+            categories.append(key)
+        codes[row] = lookup[key]
+    return codes, categories
+
+
+class EngineState:
+    """Fitted, read-only feature state for the matching engine.
+
+    Holds the skills vocabulary, the internship skills matrix (TF-IDF or
+    hashed, depending on ``backend``), encoded categorical/numeric internship
+    columns and the internship ID map. All arrays are row-aligned with
+    ``internship_ids``.
+    """
+
+    def __init__(self, vectorizer, skills_matrix, internship_ids, fingerprints,
+                 categorical, categories, numeric, version=None, created_at=None, backend='tfidf'):
+        self.backend = backend
+        self.vectorizer = vectorizer
+        self.skills_matrix = skills_matrix
+        self.internship_ids = internship_ids
+        self.fingerprints = fingerprints
+        self.categorical = categorical
+        self.categories = categories
+        self.numeric = numeric
+        self.version = version
+        self.created_at = created_at
+        self.id_to_row = {int(internship_id): row for row, internship_id in enumerate(internship_ids)}
+
+    def __len__(self):
+        return len(self.internship_ids)
+
+    @classmethod
+    def build(cls, internships, backend='tfidf'):
+        """Vectorize skills and encode all columns for the given internships"""
+        internships = list(internships)
+
+        vectorizer = None
+        if backend == 'hashing':
+            # Nothing to fit: rows are identical to what any other process would compute
+            skills_matrix = hashing_vectors([hashing_preprocess(i.required_skills) for i in internships])
+        else:
+            texts = [preprocess_skills(internship.required_skills) for internship in internships]
+            if any(texts):
+                vectorizer = TfidfVectorizer(stop_words='english')
+                skills_matrix = vectorizer.fit_transform(texts).tocsr()
+            else:
+                skills_matrix = sparse.csr_matrix((len(internships), 0))
+        skills_matrix.sort_indices()
+
+        internship_ids = np.array([internship.id for internship in internships], dtype=np.int64)
+        fingerprints = np.array([skills_fingerprint(internship.required_skills) for internship in internships],
+                                dtype=np.uint32)
+
+        categorical = {}
+        categories = {}
+        for field in CATEGORICAL_FIELDS:
+            categorical[field], categories[field] = encode_categories(
+                [getattr(internship, field) for internship in internships]
+            )
+
+        numeric = {}
+        for field, dtype in NUMERIC_FIELDS.items():
+            missing = np.nan if np.issubdtype(dtype, np.floating) else 0
+            numeric[field] = np.array(
+                [getattr(internship, field) if getattr(internship, field) is not None else missing
+                 for internship in internships],
+                dtype=dtype,
+            )
+
+        return cls(vectorizer, skills_matrix, internship_ids, fingerprints,
+                   categorical, categories, numeric, created_at=datetime.utcnow().isoformat(),
+                   backend=backend)
+
+    def row_for(self, internship):
+        """Matrix row for an internship, or None if it is unknown or edited since the build"""
+        row = self.id_to_row.get(internship.id)
+        if row is None or self.fingerprints[row] != skills_fingerprint(internship.required_skills):
+            return None
+        return row
+
+    def skills_vectors(self, skills_texts):
+        """Vectorize raw comma-separated skill texts into this state's feature space"""
+        if self.backend == 'hashing':
+            return hashing_vectors([hashing_preprocess(text) for text in skills_texts])
+        texts = [preprocess_skills(text) for text in skills_texts]
+        if self.vectorizer is None:
+            return sparse.csr_matrix((len(texts), self.skills_matrix.shape[1]))
+        return self.vectorizer.transform(texts).tocsr()
+
+    def internship_vectors(self, internships):
+        """Skills vectors row-aligned with ``internships``: the fitted row where it is current,
+        otherwise the internship's text transformed into this state's feature space"""
+        rows = [self.row_for(internship) for internship in internships]
+        fitted = [n for n, row in enumerate(rows) if row is not None]
+        fresh = [n for n, row in enumerate(rows) if row is None]
+        blocks = [self.skills_matrix[[rows[n] for n in fitted]]]
+        if fresh:
+            blocks.append(self.skills_vectors([internships[n].required_skills or "" for n in fresh]))
+        return sparse.vstack(blocks).tocsr()[np.argsort(fitted + fresh)]
+
+    def skills_similarities(self, student_skills):
+        """Cosine similarity of one student's raw skills text against every internship row"""
+        if not preprocess_skills(student_skills):
+            return np.zeros(len(self), dtype=np.float32)
+        student_vector = self.skills_vectors([student_skills])
+        # Rows are L2-normalised by the vectorizer, so the dot product is the cosine
+        similarities = self.skills_matrix.dot(student_vector.T).toarray().ravel()
+        return np.minimum(similarities, 1.0).astype(np.float32)
+
+    # Snapshot persistence
+
+    def save(self, root, keep=3):
+        """Write the state to a new versioned directory under ``root`` and publish it"""
+        os.makedirs(root, exist_ok=True)
+        version = _next_version(root)
+        staging = os.path.join(root, f".{version}.tmp")
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+
+        # scipy copies index arrays whose dtypes disagree, which would defeat mmap on load
+        index_dtype = np.int64 if self.skills_matrix.nnz >= np.iinfo(np.int32).max else np.int32
+        arrays = {
+            'internship_ids': self.internship_ids,
+            'fingerprints': self.fingerprints,
+            'skills_data': self.skills_matrix.data.astype(np.float32),
+            'skills_indices': self.skills_matrix.indices.astype(index_dtype),
+            'skills_indptr': self.skills_matrix.indptr.astype(index_dtype),
+        }
+        if self.vectorizer is not None:
+            arrays['idf'] = np.asarray(self.vectorizer.idf_, dtype=np.float64)
+        for field, codes in self.categorical.items():
+            arrays[f'cat_{field}'] = codes
+        for field, values in self.numeric.items():
+            arrays[f'num_{field}'] = values
+        for name, array in arrays.items():
+            np.save(os.path.join(staging, f"{name}.npy"), np.ascontiguousarray(array))
+
+        vocabulary = {}
+        if self.vectorizer is not None:
+            vocabulary = {term: int(index) for term, index in self.vectorizer.vocabulary_.items()}
+        with open(os.path.join(staging, "vocabulary.json"), "w") as f:
+            json.dump(vocabulary, f)
+
+        manifest = {
+            'format': SNAPSHOT_FORMAT,
+            'version': version,
+            'backend': self.backend,
+            'created_at': self.created_at or datetime.utcnow().isoformat(),
+            'n_internships': len(self),
+            'skills_shape': list(self.skills_matrix.shape),
+            'categories': self.categories,
+            'arrays': sorted(arrays),
+        }
+        with open(os.path.join(staging, MANIFEST_FILE), "w") as f:
+            json.dump(manifest, f, indent=2)
+
+        # Publish: rename the finished directory, then atomically swap the pointer
+        os.rename(staging, os.path.join(root, version))
+        pointer_tmp = os.path.join(root, f".{CURRENT_POINTER}.tmp")
+        with open(pointer_tmp, "w") as f:
+            f.write(version)
+        os.replace(pointer_tmp, os.path.join(root, CURRENT_POINTER))
+
+        self.version = version
+        prune_snapshots(root, keep=keep)
+        logging.info(f"Saved engine snapshot {version} with {len(self)} internships to {root}")
+        return version
+
+    @classmethod
+    def load(cls, root, version=None):
+        """Load a snapshot with every array memory-mapped read-only; returns None if absent"""
+        version = version or current_version(root)
+        if not version:
+            return None
+        directory = os.path.join(root, version)
+        with open(os.path.join(directory, MANIFEST_FILE)) as f:
+            manifest = json.load(f)
+        if manifest.get('format') != SNAPSHOT_FORMAT:
+            logging.warning(f"Ignoring engine snapshot {version}: format {manifest.get('format')} "
+                            f"!= {SNAPSHOT_FORMAT}")
+            return None
+
+        def array(name):
+            return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r')
+
+        skills_matrix = sparse.csr_matrix(
+            (array('skills_data'), array('skills_indices'), array('skills_indptr')),
+            shape=tuple(manifest['skills_shape']),
+            copy=False,
+        )
+
+        with open(os.path.join(directory, "vocabulary.json")) as f:
+            vocabulary = json.load(f)
+        vectorizer = None
+        if vocabulary:
+            vectorizer = TfidfVectorizer(stop_words='english', vocabulary=vocabulary)
+            vectorizer.idf_ = array('idf')
+
+        categorical = {field: array(f'cat_{field}') for field in CATEGORICAL_FIELDS}
+        numeric = {field: array(f'num_{field}') for field in NUMERIC_FIELDS}
+
+        return cls(vectorizer, skills_matrix, array('internship_ids'), array('fingerprints'),
+                   categorical, manifest['categories'], numeric,
+                   version=version, created_at=manifest.get('created_at'),
+                   backend=manifest.get('backend', 'tfidf'))
+
+
+def list_snapshots(root):
+    """Published snapshot versions under ``root``, oldest first"""
+    if not os.path.isdir(root):
+        return []
+    return sorted(name for name in os.listdir(root)
+                  if name.startswith('v') and os.path.isdir(os.path.join(root, name)))
+
+
+def current_version(root):
+    """Version named by the CURRENT pointer, if it still exists"""
+    try:
+        with open(os.path.join(root, CURRENT_POINTER)) as f:
+            version = f.read().strip()
+    except FileNotFoundError:
+        return None
+    return version if os.path.isdir(os.path.join(root, version)) else None
+
+
+def prune_snapshots(root, keep=3):
+    """Delete all but the newest ``keep`` versions, never removing the current one"""
+    current = current_version(root)
+    versions = list_snapshots(root)
+    for version in versions[:-keep] if keep > 0 else versions:
+        if version != current:
+            # Workers still mapping the old files keep their pages until they reload
+            shutil.rmtree(os.path.join(root, version), ignore_errors=True)
+
+
+def _next_version(root):
+    versions = list_snapshots(root)
+    last = int(versions[-1][1:]) if versions else 0
+    return f"v{last + 1:04d}"
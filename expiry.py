@@ -0,0 +1,132 @@
+import logging
+import os
+import threading
+from datetime import datetime
+
+from sqlalchemy import update
+
+from extensions import db
+
+# What happens to pending matches of an expired internship
+PRUNE_MODES = ('flag', 'delete')
+EXPIRED_STATUS = 'expired'
+
+
+def expire_internships(now=None, prune='flag', batch_size=500):
+    """Deactivate active internships whose application deadline has passed.
+
+    Candidates come from the (is_active, application_deadline) index. Each batch
+    is one UPDATE of the internships plus one UPDATE (prune='flag', status becomes
+    'expired') or DELETE (prune='delete') of their pending matches, so the work
+    does not grow with the number of students. Accepted or rejected matches are
+    left alone.
+
+    Returns (internship IDs expired, pending matches flagged or deleted).
+    """
+    from models import Internship, Match
+
+    if prune not in PRUNE_MODES:
+        raise ValueError(f"prune must be one of {PRUNE_MODES}")
+    now = now or datetime.utcnow()
+
+    candidates = [internship_id for (internship_id,) in
+                  db.session.query(Internship.id)
+                  .filter(Internship.is_active.is_(True),
+                          Internship.application_deadline.isnot(None),
+                          Internship.application_deadline <= now)
+                  .order_by(Internship.id)]
+    expired_ids = []
+    pruned = 0
+    for start in range(0, len(candidates), batch_size):
+        # Re-checking the deadline keeps a concurrent edit that extended it from being undone;
+        # only the internships this UPDATE actually deactivated have their matches pruned
+        batch = [internship_id for (internship_id,) in db.session.execute(
+            update(Internship)
+            .where(Internship.id.in_(candidates[start:start + batch_size]),
+                   Internship.is_active.is_(True),
+                   Internship.application_deadline <= now)
+            .values(is_active=False, updated_at=now)
+            .returning(Internship.id)
+            .execution_options(synchronize_session=False))]
+        if batch:
+            pending = Match.query.filter(Match.internship_id.in_(batch), Match.status == 'pending')
+            if prune == 'delete':
+                pruned += pending.delete(synchronize_session=False)
+            else:
+                pruned += pending.update({Match.status: EXPIRED_STATUS}, synchronize_session=False)
+        db.session.commit()
+        expired_ids.extend(batch)
+
+    if expired_ids:
+        _forget_in_process(expired_ids)
+        logging.info(f"Expired {len(expired_ids)} internships past their deadline, "
+                     f"{'deleted' if prune == 'delete' else 'flagged'} {pruned} pending matches")
+    return expired_ids, pruned
+
+
+def _forget_in_process(internship_ids):
+    """Drop expired internships from this process's in-memory indexes.
+
+    Other workers catch up by themselves: the ANN candidates are re-filtered by
+    is_active, and the facet index and page cache notice the new updated_at.
+    """
+    import facets
+    from response_cache import page_cache
+    from routes import matching_engine
+
+    for internship_id in internship_ids:
+        matching_engine.forget_internship(internship_id)
+        page_cache.invalidate('main.view_internship', internship_id=internship_id)
+    facets.facet_index.remove(*internship_ids)
+
+
+class ExpiryScheduler:
+    """Runs expire_internships every ``interval`` seconds on a daemon thread.
+
+    Started lazily on the first request of each process, so a preloading gunicorn
+    master never forks with the thread running. Several workers expiring at once is
+    harmless: the conditional UPDATE makes a second run a no-op.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.interval = 0
+        self.prune = 'flag'
+        self._pid = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def ensure_started(self):
+        if not self.interval or self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            threading.Thread(target=self._run, name="deadline-expiry", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            with self.app.app_context():
+                try:
+                    expire_internships(prune=self.prune)
+                except Exception as e:
+                    logging.error(f"Error expiring internships: {e}")
+                    db.session.rollback()
+                finally:
+                    db.session.remove()
+
+
+scheduler = ExpiryScheduler()
+
+
+def init_app(app):
+    scheduler.app = app
+    scheduler.interval = app.config.get("EXPIRY_INTERVAL", 0)
+    scheduler.prune = app.config.get("EXPIRY_PRUNE", 'flag')
+    if scheduler.interval:
+        app.before_request(scheduler.ensure_started)
@@ -0,0 +1,212 @@
+import csv
+import io
+import re
+import zipfile
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+from sqlalchemy import select
+from sqlalchemy.orm import Bundle
+
+from extensions import db
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+# Rows fetched, scored and written per round trip
+EXPORT_CHUNK = 500
+
+# Leading characters that make a spreadsheet read a CSV cell as a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+# Control characters XML 1.0 forbids; one of them in sheet1.xml makes Excel reject the workbook
+_XML_ILLEGAL = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+# An underscore that would otherwise read as the start of such an escape
+_ESCAPE_LIKE = re.compile('_(?=x[0-9A-Fa-f]{4}_)')
+
+HEADER = [
+    'Application ID', 'Status', 'Applied At', 'Internship ID', 'Internship',
+    'Student ID', 'Name', 'Email', 'Phone', 'Institution', 'Course', 'Year of Study', 'CGPA',
+    'Technical Skills', 'Soft Skills', 'Current Location', 'Preferred Locations', 'Sector Interests',
+    'Social Category', 'District Type', 'Previous Internships',
+    'Match %', 'Skills Score', 'Academic Score', 'Location Score', 'Sector Score', 'Affirmative Action Score',
+]
+
+
+def _application_query(department_id, internship_id=None):
+    from models import Application, Internship, Student
+
+    # Plain column bundles rather than entities, so nothing piles up in the identity map
+    student = Bundle('student', Student.id, Student.name, Student.email, Student.phone, Student.institution,
+                     Student.course, Student.year_of_study, Student.cgpa, Student.technical_skills,
+                     Student.soft_skills, Student.current_location, Student.preferred_locations,
+                     Student.sector_interests, Student.social_category, Student.district_type,
+                     Student.previous_internships, Student.pm_scheme_participant)
+    internship = Bundle('internship', Internship.id, Internship.title, Internship.required_skills,
+                        Internship.location, Internship.sector, Internship.min_cgpa, Internship.preferred_course,
+                        Internship.year_of_study_requirement, Internship.rural_quota, Internship.sc_quota,
+                        Internship.st_quota, Internship.obc_quota)
+    query = select(Application.id, Application.status, Application.applied_at, student, internship)\
+        .join(Student, Application.student_id == Student.id)\
+        .join(Internship, Application.internship_id == Internship.id)\
+        .where(Internship.department_id == department_id)\
+        .order_by(Application.id)
+    if internship_id is not None:
+        query = query.where(Internship.id == internship_id)
+    # Server-side cursor where the driver has one (PostgreSQL); fetched in chunks either way
+    return query.execution_options(yield_per=EXPORT_CHUNK)
+
+
+def application_rows(engine, department_id, internship_id=None):
+    """Export rows (HEADER order) for a department's applications, in chunks.
+
+    Match components are computed for each chunk at once with engine.score_pairs.
+    Yields lists of rows, one list per chunk.
+    """
+    result = db.session.execute(_application_query(department_id, internship_id))
+    for chunk in result.partitions():
+        scores = engine.score_pairs([(row.student, row.internship) for row in chunk])
+        rows = []
+        for row, score in zip(chunk, scores):
+            student = row.student
+            rows.append([
+                row.id, row.status, row.applied_at, row.internship.id, row.internship.title,
+                student.id, student.name, student.email, student.phone, student.institution, student.course,
+                student.year_of_study, student.cgpa, student.technical_skills, student.soft_skills,
+                student.current_location, student.preferred_locations, student.sector_interests,
+                student.social_category, student.district_type, student.previous_internships,
+                round(score['overall'] * 100, 1), round(score['skills'], 3), round(score['academic'], 3),
+                round(score['location'], 3), round(score['sector'], 3), round(score['affirmative_action'], 3),
+            ])
+        yield rows
+
+
+def _cell_text(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M')
+    return value
+
+
+def _csv_cell(value):
+    """Cell text with student-entered values defused, so a name like "=HYPERLINK(...)"
+    opens as text rather than as a formula"""
+    value = _cell_text(value)
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def stream_csv(chunks):
+    """CSV bytes, one piece per chunk of rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(HEADER)
+    for rows in chunks:
+        writer.writerows([_csv_cell(value) for value in row] for row in rows)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+class _Sink:
+    """Write-only file object whose contents are drained after each chunk"""
+
+    def __init__(self):
+        self.parts = []
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+
+_XLSX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="xl/workbook.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+        '</Relationships>'),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Applications" sheetId="1" r:id="rId1"/></sheets></workbook>'),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="worksheets/sheet1.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+        '</Relationships>'),
+}
+
+
+def _xml_text(value):
+    """Escaped cell text, with XML-illegal control characters written as _xHHHH_ escapes"""
+    text = _ESCAPE_LIKE.sub('_x005F_', str(value))
+    return escape(_XML_ILLEGAL.sub(lambda match: f"_x{ord(match.group()):04X}_", text))
+
+
+def _xlsx_row(values):
+    cells = []
+    for value in values:
+        value = _cell_text(value)
+        if isinstance(value, bool):
+            cells.append(f'<c t="b"><v>{int(value)}</v></c>')
+        elif isinstance(value, (int, float)):
+            cells.append(f'<c><v>{value}</v></c>')
+        elif value != '':
+            # Inline strings are shown as text, never evaluated, so no prefix is needed
+            cells.append(f'<c t="inlineStr"><is><t>{_xml_text(value)}</t></is></c>')
+        else:
+            cells.append('<c/>')
+    return '<row>' + ''.join(cells) + '</row>'
+
+
+def stream_xlsx(chunks):
+    """A one-sheet XLSX workbook written straight into a streamed zip.
+
+    The worksheet uses inline strings, so no shared-strings table has to be
+    held in memory, and zipfile writes data descriptors because the output
+    cannot seek. Yields bytes once per chunk of rows.
+    """
+    sink = _Sink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_PARTS.items():
+            archive.writestr(name, content)
+        yield sink.drain()
+        with archive.open('xl/worksheets/sheet1.xml', 'w') as sheet:
+            sheet.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                        b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>')
+            sheet.write(_xlsx_row(HEADER).encode('utf-8'))
+            for rows in chunks:
+                sheet.write(''.join(_xlsx_row(row) for row in rows).encode('utf-8'))
+                yield sink.drain()
+            sheet.write(b'</sheetData></worksheet>')
+    yield sink.drain()
+
+
+def stream_export(fmt, chunks):
+    return stream_xlsx(chunks) if fmt == 'xlsx' else stream_csv(chunks)
@@ -0,0 +1,296 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import func
+
+from extensions import db
+
+# Facet name -> label shown above its values
+FACETS = {
+    'sector': 'Sector',
+    'location': 'Location',
+    'stipend': 'Stipend',
+    'duration': 'Duration',
+    'min_cgpa': 'Minimum CGPA',
+    'department_type': 'Department Type',
+}
+
+NOT_SPECIFIED = 'Not specified'
+
+# Banded facets list their values in this order; the others by count
+BAND_ORDER = {
+    'stipend': ['Unpaid', 'Under ₹5,000', '₹5,000 – 9,999', '₹10,000 – 14,999', '₹15,000+'],
+    'duration': ['1 – 2 months', '3 – 4 months', '5 – 6 months', 'Over 6 months', NOT_SPECIFIED],
+    'min_cgpa': ['No minimum', 'Below 6.0', '6.0 – 6.9', '7.0 – 7.9', '8.0+'],
+}
+
+
+def stipend_band(stipend):
+    if not stipend:
+        return 'Unpaid'
+    if stipend < 5000:
+        return 'Under ₹5,000'
+    if stipend < 10000:
+        return '₹5,000 – 9,999'
+    if stipend < 15000:
+        return '₹10,000 – 14,999'
+    return '₹15,000+'
+
+
+def duration_band(months):
+    if not months:
+        return NOT_SPECIFIED
+    if months <= 2:
+        return '1 – 2 months'
+    if months <= 4:
+        return '3 – 4 months'
+    if months <= 6:
+        return '5 – 6 months'
+    return 'Over 6 months'
+
+
+def cgpa_band(min_cgpa):
+    if not min_cgpa:
+        return 'No minimum'
+    if min_cgpa < 6:
+        return 'Below 6.0'
+    if min_cgpa < 7:
+        return '6.0 – 6.9'
+    if min_cgpa < 8:
+        return '7.0 – 7.9'
+    return '8.0+'
+
+
+def facet_values(sector, location, stipend, duration_months, min_cgpa, department_type):
+    """Facet value of every facet for one internship"""
+    return {
+        'sector': (sector or '').strip() or NOT_SPECIFIED,
+        'location': (location or '').strip() or NOT_SPECIFIED,
+        'stipend': stipend_band(stipend),
+        'duration': duration_band(duration_months),
+        'min_cgpa': cgpa_band(min_cgpa),
+        'department_type': (department_type or '').strip() or NOT_SPECIFIED,
+    }
+
+
+def parse_filters(args):
+    """{facet: set of selected values} from request args; a facet may repeat"""
+    filters = {}
+    for facet in FACETS:
+        values = {value for value in args.getlist(facet) if value}
+        if values:
+            filters[facet] = values
+    return filters
+
+
+class FacetIndex:
+    """Per-value bitmaps over active internships, held in memory.
+
+    Every internship gets a slot; each facet value keeps a Python int with the
+    slot bits of its internships set. Filters OR values within a facet and AND
+    across facets, so a selection and the count of every facet value are a few
+    big-int ANDs and bit_count() calls. The index is updated in place when this
+    process changes an internship. It is rebuilt when the table changes underneath
+    it (checked at most every ``check_interval`` seconds) or after ``max_age``
+    seconds in any case.
+
+    Readers and writers share one lock. Bitmaps are only meaningful against the
+    slots they were computed with, so callers combining several reads (a mask
+    from mask_of or select, then ids) hold reading() around all of them.
+    """
+
+    def __init__(self, check_interval=5.0, max_age=300.0):
+        self.check_interval = check_interval
+        self.max_age = max_age
+        self._lock = threading.RLock()
+        self._reset()
+        self._built_at = None
+        self._checked_at = 0.0
+        self._stamp = None
+
+    def _reset(self):
+        self.postings = {facet: {} for facet in FACETS}
+        self.live = 0
+        self._ids = []
+        self._slot_of = {}
+        self._values_of = {}
+
+    @staticmethod
+    def _read_stamp():
+        from models import Internship
+
+        return tuple(db.session.query(func.count(Internship.id), func.max(Internship.updated_at)).one())
+
+    def build(self):
+        """Rebuild from the database: one query over active internships"""
+        from models import Internship, Department
+
+        rows = db.session.query(Internship.id, Internship.sector, Internship.location, Internship.stipend,
+                                Internship.duration_months, Internship.min_cgpa, Department.department_type)\
+                         .join(Department, Internship.department_id == Department.id)\
+                         .filter(Internship.is_active.is_(True))\
+                         .order_by(Internship.id)
+        with self._lock:
+            self.load(rows)
+            self._stamp = self._read_stamp()
+
+    def load(self, rows):
+        """Replace the index with (id, sector, location, stipend, duration_months,
+        min_cgpa, department_type) rows"""
+        with self._lock:
+            self._reset()
+            for internship_id, *fields in rows:
+                self._insert(internship_id, facet_values(*fields))
+            self._built_at = self._checked_at = time.monotonic()
+
+    def ensure_fresh(self):
+        """Build on first use; rebuild when stale"""
+        now = time.monotonic()
+        if self._built_at is None or now - self._built_at > self.max_age:
+            self.build()
+        elif now - self._checked_at > self.check_interval:
+            self._checked_at = now
+            if self._read_stamp() != self._stamp:
+                self.build()
+        return self
+
+    def _insert(self, internship_id, values):
+        slot = len(self._ids)
+        self._ids.append(internship_id)
+        self._slot_of[internship_id] = slot
+        self._values_of[internship_id] = values
+        bit = 1 << slot
+        for facet, value in values.items():
+            postings = self.postings[facet]
+            postings[value] = postings.get(value, 0) | bit
+        self.live |= bit
+
+    def _delete(self, internship_id):
+        slot = self._slot_of.pop(internship_id, None)
+        if slot is None:
+            return
+        bit = 1 << slot
+        for facet, value in self._values_of.pop(internship_id).items():
+            postings = self.postings[facet]
+            postings[value] &= ~bit
+            if not postings[value]:
+                del postings[value]
+        self.live &= ~bit
+        self._ids[slot] = None
+
+    def _compact(self):
+        """Renumber slots once edits have left too many dead ones behind"""
+        values_of = self._values_of
+        live_ids = [internship_id for internship_id in self._ids if internship_id in values_of]
+        self._reset()
+        for internship_id in live_ids:
+            self._insert(internship_id, values_of[internship_id])
+
+    def update(self, *internships):
+        """Reflect created or edited internships (dropping inactive ones)"""
+        if self._built_at is None:
+            return
+        with self._lock:
+            for internship in internships:
+                self._delete(internship.id)
+                if internship.is_active is not False:
+                    department_type = internship.department.department_type if internship.department else None
+                    self._insert(internship.id, facet_values(internship.sector, internship.location,
+                                                             internship.stipend, internship.duration_months,
+                                                             internship.min_cgpa, department_type))
+            if len(self._ids) > 2 * len(self._slot_of) + 1024:
+                self._compact()
+            self._stamp = self._read_stamp()
+
+    def update_department(self, department):
+        """Reflect a change to a department's own fields in all of its internships"""
+        self.update(*department.internships)
+
+    def remove(self, *internship_ids):
+        if self._built_at is None:
+            return
+        with self._lock:
+            for internship_id in internship_ids:
+                self._delete(internship_id)
+            self._stamp = self._read_stamp()
+
+    @contextmanager
+    def reading(self):
+        """Keep edits and compaction out while several reads share slot numbers"""
+        with self._lock:
+            yield self
+
+    def mask_of(self, internship_ids):
+        """Bitmap of the given IDs (unknown or inactive IDs are ignored)"""
+        mask = 0
+        with self._lock:
+            for internship_id in internship_ids:
+                slot = self._slot_of.get(internship_id)
+                if slot is not None:
+                    mask |= 1 << slot
+        return mask
+
+    def _facet_mask(self, facet, values):
+        postings = self.postings[facet]
+        mask = 0
+        for value in values:
+            mask |= postings.get(value, 0)
+        return mask
+
+    def select(self, filters, base=None):
+        """Bitmap of internships passing every filter, within ``base`` if given"""
+        with self._lock:
+            mask = self.live if base is None else base & self.live
+            for facet, values in filters.items():
+                mask &= self._facet_mask(facet, values)
+        return mask
+
+    def counts(self, filters, base=None):
+        """{facet: [(value, count, selected)]} for every facet value.
+
+        Counts are disjunctive: a facet's own selection is left out when counting
+        its values, so choosing "Mumbai" still shows how many are in "Pune".
+        """
+        with self._lock:
+            base = self.live if base is None else base & self.live
+            facet_masks = {facet: self._facet_mask(facet, values) for facet, values in filters.items()}
+            result = {}
+            for facet in FACETS:
+                mask = base
+                for other, other_mask in facet_masks.items():
+                    if other != facet:
+                        mask &= other_mask
+                selected = filters.get(facet, set())
+                counts = [(value, (bits & mask).bit_count(), value in selected)
+                          for value, bits in self.postings[facet].items()]
+                counts = [entry for entry in counts if entry[1] or entry[2]]
+                if facet in BAND_ORDER:
+                    order = BAND_ORDER[facet]
+                    counts.sort(key=lambda entry: order.index(entry[0]) if entry[0] in order else len(order))
+                else:
+                    counts.sort(key=lambda entry: (-entry[1], entry[0]))
+                result[facet] = counts
+        return result
+
+    def ids(self, mask, newest_first=True):
+        """Internship IDs of the set bits of ``mask``, by slot (creation or last edit)"""
+        import numpy as np
+
+        if not mask:
+            return []
+        bits = np.unpackbits(np.frombuffer(mask.to_bytes((mask.bit_length() + 7) // 8, 'little'), dtype=np.uint8),
+                             bitorder='little')
+        slots = np.flatnonzero(bits)
+        if newest_first:
+            slots = slots[::-1]
+        with self._lock:
+            return [self._ids[slot] for slot in slots.tolist()]
+
+
+facet_index = FacetIndex()
+
+
+def init_app(app):
+    facet_index.check_interval = app.config.get("FACET_CHECK_INTERVAL", 5.0)
+    facet_index.max_age = app.config.get("FACET_MAX_AGE", 300.0)
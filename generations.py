@@ -0,0 +1,111 @@
+import logging
+from datetime import datetime, timedelta
+
+from flask import g, has_request_context
+from sqlalchemy import delete, select
+
+from extensions import db
+
+# Generation of the matches made before the first full rematch was published
+BASE_GENERATION = 0
+
+# Rows deleted per garbage-collection statement
+GC_CHUNK = 5000
+
+
+def current_generation():
+    """Run ID of the published match generation (BASE_GENERATION before any publish).
+
+    Looked up once per request, so every query in a request reads the same
+    generation even if a run is published meanwhile.
+    """
+    if has_request_context() and 'match_generation' in g:
+        return g.match_generation
+    from models import MatchRun
+
+    generation = db.session.execute(
+        select(MatchRun.id).where(MatchRun.status == 'published').order_by(MatchRun.id.desc()).limit(1)
+    ).scalar() or BASE_GENERATION
+    if has_request_context():
+        g.match_generation = generation
+    return generation
+
+
+def live_matches():
+    """Filter criterion selecting the matches of the published generation"""
+    from models import Match
+
+    return Match.run_id == current_generation()
+
+
+def unfinished_run():
+    """The full rematch still being built (running, or failed and waiting to be resumed), or None"""
+    from models import MatchRun
+    from rematch import UNFINISHED
+
+    return MatchRun.query.filter(MatchRun.status.in_(UNFINISHED)).order_by(MatchRun.id.desc()).first()
+
+
+def publish(run_id):
+    """Switch readers to a finished run's generation in one transaction.
+
+    The previously published run is marked superseded; its rows stay until
+    garbage_collect removes them after the grace period, so requests that read
+    the old pointer just before the switch still find their matches.
+    """
+    from models import MatchRun
+
+    now = datetime.utcnow()
+    try:
+        db.session.execute(MatchRun.__table__.update().where(MatchRun.status == 'published')
+                           .values(status='superseded', superseded_at=now, updated_at=now))
+        db.session.execute(MatchRun.__table__.update().where(MatchRun.id == run_id)
+                           .values(status='published', published_at=now, finished_at=now, updated_at=now))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    logging.info(f"Published match generation {run_id}")
+
+
+def garbage_generations(grace_seconds, now=None):
+    """Generations whose rows can be deleted: abandoned runs, and generations superseded
+    more than ``grace_seconds`` ago (the base generation counts as superseded by the
+    first publish). The published generation and unfinished runs are never included."""
+    from models import MatchRun
+
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(seconds=grace_seconds)
+    garbage = [run_id for (run_id,) in db.session.query(MatchRun.id).filter(db.or_(
+        MatchRun.status == 'abandoned',
+        db.and_(MatchRun.status == 'superseded', MatchRun.superseded_at <= cutoff),
+    ))]
+    first_published = db.session.query(db.func.min(MatchRun.published_at)).scalar()
+    if first_published is not None and first_published <= cutoff:
+        garbage.append(BASE_GENERATION)
+    return garbage
+
+
+def garbage_collect(grace_seconds=600):
+    """Delete the rows of garbage generations in chunks, one short transaction each.
+
+    Returns the number of rows deleted.
+    """
+    from models import Match
+
+    generations = garbage_generations(grace_seconds)
+    deleted = 0
+    while generations:
+        chunk = [match_id for (match_id,) in db.session.execute(
+            select(Match.id).where(Match.run_id.in_(generations)).limit(GC_CHUNK))]
+        if not chunk:
+            break
+        try:
+            deleted += db.session.execute(delete(Match).where(Match.id.in_(chunk))).rowcount
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+    if deleted:
+        logging.info(f"Deleted {deleted} matches of superseded generations {generations}")
+    return deleted
@@ -0,0 +1,53 @@
+import gc
+import os
+
+# Gunicorn configuration: gunicorn -c gunicorn.conf.py main:app
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("GUNICORN_WORKERS", "4"))
+# Threads per worker; with more than one, logins wait on the password-hash pool
+# (passwords.py) concurrently instead of one request at a time
+threads = int(os.environ.get("GUNICORN_THREADS", "1"))
+worker_class = "gthread" if threads > 1 else "sync"
+reuse_port = True
+
+# Preload: the master imports the app and builds the engine's read-only state once,
+# forked workers then share those pages copy-on-write instead of each rebuilding them
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") == "1"
+
+
+def _dispose_engines(app, close):
+    from extensions import db
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=close)
+
+
+def when_ready(server):
+    """Finish building shared state in the master, just before the first fork"""
+    if not server.cfg.preload_app:
+        return
+
+    from routes import matching_engine
+
+    app = server.app.wsgi()
+    with app.app_context():
+        matching_engine.warm_up()
+        if matching_engine.state is None:
+            server.log.info("No engine snapshot mapped; fitting engine state in master")
+            matching_engine.fit()
+
+    # The master must not hand open connections to its children
+    _dispose_engines(app, close=True)
+
+    # Exclude everything built so far from GC traversals in the workers, which would
+    # otherwise touch (and so copy) most of the inherited object pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """Give each worker its own connection pool"""
+    if not server.cfg.preload_app:
+        return
+    # close=False drops any inherited pool without closing sockets owned by the parent
+    _dispose_engines(server.app.wsgi(), close=False)
@@ -0,0 +1,180 @@
+"""Closed-loop load generator for a locally started gunicorn.
+
+Each virtual user signs in as a student, department or admin (picked by the
+mix weights) and repeats that role's scenario until the run ends. Every request
+is timed under a route label such as "GET /student/dashboard" or
+"POST /student/apply/<id>", so results can be read per route.
+"""
+import random
+import re
+import threading
+import time
+from collections import defaultdict
+
+from perf import free_port, logged_in_session, percentile, start_gunicorn, stop_process, wait_for_port
+
+ROLES = ('student', 'department', 'admin')
+DEFAULT_MIX = {'student': 80, 'department': 15, 'admin': 5}
+
+_APPLY_TARGET = re.compile(r"openApplicationModal\((\d+),")
+_SUBMISSION_TOKEN = re.compile(r"value = '(\w+)-'")
+_INTERNSHIP_APPLICATIONS = re.compile(r"/internship/(\d+)/applications")
+_STUDENT_PROFILE = re.compile(r"/department/student/(\d+)")
+
+
+def parse_mix(text):
+    """'student=80,department=15,admin=5' -> {role: weight}"""
+    mix = {}
+    for part in filter(None, (part.strip() for part in text.split(','))):
+        role, _, weight = part.partition('=')
+        if role not in ROLES:
+            raise ValueError(f"unknown role {role!r}; expected one of {ROLES}")
+        mix[role] = float(weight or 1)
+    if not any(mix.values()):
+        raise ValueError("the mix needs at least one role with a positive weight")
+    return mix
+
+
+class RouteStats:
+    """Latencies and error counts per route label, shared by all virtual users"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, label, seconds, ok):
+        with self._lock:
+            self.latencies[label].append(seconds)
+            if not ok:
+                self.errors[label] += 1
+
+    def summary(self, elapsed):
+        """[(label, requests, per second, p50, p95, p99, error rate)], busiest route first"""
+        rows = []
+        for label, latencies in self.latencies.items():
+            rows.append((label, len(latencies), len(latencies) / elapsed,
+                         percentile(latencies, 50), percentile(latencies, 95), percentile(latencies, 99),
+                         self.errors[label] / len(latencies)))
+        return sorted(rows, key=lambda row: -row[1])
+
+
+class VirtualUser:
+    """One signed-in browser session running its role's scenario in a loop"""
+
+    def __init__(self, base_url, role, email, password, stats, rng, think_time=0.0):
+        self.base_url = base_url
+        self.role = role
+        self.email = email
+        self.password = password
+        self.stats = stats
+        self.rng = rng
+        self.think_time = think_time
+        self.client = None
+
+    def request(self, method, path, label=None, **kwargs):
+        """Time one request; redirects are not followed so each route is measured on its own"""
+        import requests
+
+        label = f"{method} {label or path}"
+        start = time.perf_counter()
+        try:
+            response = self.client.request(method, f"{self.base_url}{path}",
+                                           allow_redirects=False, timeout=60, **kwargs)
+        except requests.RequestException:
+            self.stats.record(label, time.perf_counter() - start, False)
+            return None
+        self.stats.record(label, time.perf_counter() - start, response.status_code < 400)
+        return response
+
+    def sign_in(self):
+        start = time.perf_counter()
+        try:
+            self.client = logged_in_session(self.base_url, self.email, self.password, self.role)
+        except Exception:
+            self.stats.record("POST /login", time.perf_counter() - start, False)
+            return False
+        self.stats.record("POST /login", time.perf_counter() - start, True)
+        return True
+
+    def run(self, deadline):
+        if not self.sign_in():
+            return
+        scenario = getattr(self, f"{self.role}_scenario")
+        while time.monotonic() < deadline:
+            scenario()
+            if self.think_time:
+                time.sleep(self.rng.uniform(0, 2 * self.think_time))
+
+    def student_scenario(self):
+        self.request("GET", "/student/dashboard")
+        if self.rng.random() < 0.2:
+            self.request("GET", "/student/generate-matches")
+        page = self.request("GET", "/student/matches")
+        if page is not None and page.status_code == 200:
+            targets = _APPLY_TARGET.findall(page.text)
+            token = _SUBMISSION_TOKEN.search(page.text)
+            if targets and token:
+                internship_id = self.rng.choice(targets)
+                self.request("POST", f"/student/apply/{internship_id}", "/student/apply/<id>", data={
+                    'cover_letter': 'Load test', 'submission_token': f"{token.group(1)}-{internship_id}",
+                })
+        self.request("GET", "/student/applications")
+
+    def department_scenario(self):
+        # The review pages have no status form to post to, so reviewing is reading them
+        page = self.request("GET", "/department/dashboard")
+        if page is None or page.status_code != 200:
+            return
+        self.request("GET", "/department/applications")
+        internships = _INTERNSHIP_APPLICATIONS.findall(page.text)
+        if not internships:
+            return
+        internship_id = self.rng.choice(internships)
+        page = self.request("GET", f"/internship/{internship_id}/applications", "/internship/<id>/applications")
+        if page is None or page.status_code != 200:
+            return
+        students = _STUDENT_PROFILE.findall(page.text)
+        if students:
+            self.request("GET", f"/department/student/{self.rng.choice(students)}", "/department/student/<id>")
+
+    def admin_scenario(self):
+        self.request("GET", "/admin/dashboard")
+        self.request("GET", "/admin/departments")
+
+
+def run_load(accounts, password, mix=None, users=20, duration=30.0, workers=4, threads=4,
+             think_time=0.0, seed=0, extra_env=None):
+    """Start gunicorn and run ``users`` virtual users for ``duration`` seconds.
+
+    ``accounts`` maps each role to the emails its virtual users sign in with.
+    Returns (elapsed seconds, RouteStats, {role: virtual users}).
+    """
+    mix = {role: weight for role, weight in (mix or DEFAULT_MIX).items() if weight and accounts.get(role)}
+    if not mix:
+        raise ValueError("no accounts for any role in the mix")
+    rng = random.Random(seed)
+    roles = rng.choices(list(mix), weights=list(mix.values()), k=users)
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = start_gunicorn(port, workers, preload=True,
+                            extra_env=dict(extra_env or {}, GUNICORN_THREADS=str(threads)))
+    stats = RouteStats()
+    try:
+        if not wait_for_port(port):
+            raise RuntimeError("gunicorn did not start listening in time")
+        virtual_users = [VirtualUser(base_url, role, accounts[role][n % len(accounts[role])], password,
+                                     stats, random.Random(seed * 1000003 + n), think_time)
+                         for n, role in enumerate(roles)]
+        start = time.perf_counter()
+        deadline = time.monotonic() + duration
+        runners = [threading.Thread(target=user.run, args=(deadline,), daemon=True) for user in virtual_users]
+        for thread in runners:
+            thread.start()
+        for thread in runners:
+            thread.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        stop_process(server)
+    return elapsed, stats, {role: roles.count(role) for role in mix}
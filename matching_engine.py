@@ -1,26 +1,204 @@
-import numpy as np
-import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.preprocessing import StandardScaler
 import logging
+import time
+from datetime import datetime
+from flask import has_app_context
 from extensions import db
 from models import Student, Internship, Match
+from skill_vectors import SKILLS_BACKENDS, preprocess_skills, hashing_preprocess
+from weights import WEIGHT_PROFILES, stored_weights, weighted_score
+from generations import current_generation, unfinished_run
+
+# Lowest overall score a pair needs to be stored as a match
+MATCH_THRESHOLD = 0.3
+
+# numpy, scikit-learn and the fitted state are imported on first use so that
+# importing this module (and therefore booting the app) stays cheap
+
+def scoring_bundles():
+    """(student, internship) column bundles carrying exactly what score_pairs and match_rows read.
+
+    Selecting these instead of the entities keeps batch jobs clear of the
+    identity map and of the text columns the scorer never looks at.
+    """
+    from sqlalchemy.orm import Bundle
+
+    student = Bundle('student', Student.id, Student.technical_skills, Student.soft_skills, Student.cgpa,
+                     Student.course, Student.year_of_study, Student.current_location, Student.preferred_locations,
+                     Student.sector_interests, Student.social_category, Student.district_type,
+                     Student.previous_internships, Student.pm_scheme_participant)
+    internship = Bundle('internship', Internship.id, Internship.required_skills, Internship.location,
+                        Internship.sector, Internship.min_cgpa, Internship.preferred_course,
+                        Internship.year_of_study_requirement, Internship.rural_quota, Internship.sc_quota,
+                        Internship.st_quota, Internship.obc_quota, Internship.filled_positions,
+                        Internship.total_positions)
+    return student, internship
+
 
 class InternshipMatchingEngine:
     def __init__(self):
-        self.scaler = StandardScaler()
+        self._scaler = None
+        # Fitted internship feature state, built with fit() or loaded from a snapshot
+        self.state = None
+        self.snapshot_dir = None
+        self.skills_backend = 'tfidf'
+        # Approximate nearest-neighbour candidate selection (0 disables it)
+        self.ann_candidates = 0
+        self.ann_options = {}
+        self.ann_index = None
+        # Weight of each component score in the overall match score: the configured weights,
+        # or those switched to with `flask matches reweight`, looked up at most every
+        # weights_check_interval seconds (None keeps the configured ones)
+        self.weights = dict(WEIGHT_PROFILES['default'])
+        self.configured_weights = dict(self.weights)
+        self.weights_check_interval = None
+        self._weights_checked_at = None
+        # Matches kept per student, best first (0 = all above threshold)
+        self.match_top_k = 0
+        # Full rematch: students per batch, RSS ceiling in MB (0 = unchecked) and score tile budget in MB
+        self.rematch_batch_size = 1000
+        self.rematch_memory_limit_mb = 0
+        self.rematch_tile_budget_mb = 64
+        self.ann_high_water = 0
+        self._warmed_up = False
+
+    @property
+    def scaler(self):
+        if self._scaler is None:
+            from sklearn.preprocessing import StandardScaler
+            self._scaler = StandardScaler()
+        return self._scaler
+
+    def configure(self, snapshot_dir=None, skills_backend='tfidf', ann_candidates=0, ann_tables=8, ann_bits=12,
+                  weights=None, rematch_batch_size=1000, rematch_memory_limit_mb=0, rematch_tile_budget_mb=64,
+                  match_top_k=0, weights_check_interval=None):
+        """Record deployment settings without loading anything yet"""
+        if skills_backend not in SKILLS_BACKENDS:
+            raise ValueError(f"Unknown skills backend {skills_backend!r}; expected one of {SKILLS_BACKENDS}")
+        self.snapshot_dir = snapshot_dir
+        self.skills_backend = skills_backend
+        self.ann_candidates = ann_candidates
+        self.ann_options = {'n_tables': ann_tables, 'n_bits': ann_bits}
+        if weights is not None:
+            self.weights = dict(weights)
+            self.configured_weights = dict(weights)
+        self.weights_check_interval = weights_check_interval
+        self._weights_checked_at = None
+        self.rematch_batch_size = rematch_batch_size
+        self.rematch_memory_limit_mb = rematch_memory_limit_mb
+        self.rematch_tile_budget_mb = rematch_tile_budget_mb
+        self.match_top_k = match_top_k
+        self._warmed_up = False
+
+    def refresh_weights(self):
+        """Follow weights switched with `flask matches reweight`"""
+        if self.weights_check_interval is None or not has_app_context():
+            return
+        now = time.monotonic()
+        if self._weights_checked_at is not None and now - self._weights_checked_at < self.weights_check_interval:
+            return
+        self._weights_checked_at = now
+        self.weights = stored_weights() or dict(self.configured_weights)
+
+    def warm_up(self):
+        """Pay the heavy import and snapshot-mapping cost now instead of on the first request"""
+        if self._warmed_up:
+            return
+        self._warmed_up = True
+        import numpy  # noqa: F401
+        import engine_state  # noqa: F401  (pulls in scipy and scikit-learn)
+        if self.state is None and self.snapshot_dir:
+            self.load_snapshot(self.snapshot_dir)
+        if self.ann_candidates and self.ann_index is None:
+            self.build_ann_index()
+
+    def fit(self, internships=None):
+        """Build the fitted feature state from active internships"""
+        from engine_state import EngineState
+
+        if internships is None:
+            internships = Internship.query.filter_by(is_active=True).order_by(Internship.id).all()
+        self._set_state(EngineState.build(internships, backend=self.skills_backend))
+        return self.state
+
+    def _set_state(self, state):
+        self.state = state
+        # An index over the previous state would point at stale vectors
+        if self.ann_candidates:
+            self.build_ann_index()
+
+    def build_ann_index(self):
+        """Index the fitted internship skill vectors for sublinear candidate lookup"""
+        from ann_index import SkillsLSHIndex
+
+        if self.state is None:
+            logging.warning("ANN candidate selection needs a fitted engine state; scoring all internships")
+            self.ann_index = None
+            return None
+        index = SkillsLSHIndex(**self.ann_options)
+        index.add_many(self.state.internship_ids, self.state.skills_matrix)
+        self.ann_high_water = int(self.state.internship_ids.max()) if len(self.state) else 0
+        self.ann_index = index
+        logging.info(f"Built ANN index over {len(index)} internships")
+        return index
+
+    def index_internship(self, internship):
+        """Insert or refresh one internship in the ANN index after it is created or edited"""
+        if self.ann_index is None or self.state is None:
+            return
+        try:
+            self.ann_index.add(internship.id, self.state.skills_vectors([internship.required_skills]))
+        except Exception as e:
+            logging.error(f"Error indexing internship {internship.id}: {e}")
+
+    def forget_internship(self, internship_id):
+        """Tombstone a deleted internship in the ANN index"""
+        if self.ann_index is not None:
+            self.ann_index.remove(internship_id)
+
+    def save_snapshot(self, root, keep=3):
+        """Persist the fitted state as a new versioned snapshot under root"""
+        if self.state is None:
+            self.fit()
+        return self.state.save(root, keep=keep)
+
+    def load_snapshot(self, root, version=None):
+        """Memory-map a snapshot; returns False and keeps the current state if none exists"""
+        from engine_state import EngineState
+
+        try:
+            state = EngineState.load(root, version)
+        except Exception as e:
+            logging.error(f"Error loading engine snapshot from {root}: {e}")
+            return False
+        if state is None:
+            return False
+        if state.backend != self.skills_backend:
+            logging.warning(f"Ignoring engine snapshot {state.version}: built for the {state.backend} "
+                            f"skills backend, engine uses {self.skills_backend}")
+            return False
+        self._set_state(state)
+        logging.info(f"Loaded engine snapshot {state.version} ({len(state)} internships)")
+        return True
         
     def preprocess_skills(self, skills_text):
         """Convert comma-separated skills to clean text"""
-        if not skills_text:
-            return ""
-        return " ".join([skill.strip().lower() for skill in skills_text.split(",")])
+        return preprocess_skills(skills_text)
     
     def calculate_skills_similarity(self, student_skills, internship_skills):
-        """Calculate cosine similarity between student and internship skills"""
+        """Calculate cosine similarity between student and internship skills.
+
+        Uses the fitted state's vector space when there is one, so pairs scored
+        here agree with the batch paths; otherwise fits a vectorizer on the pair.
+        """
         if not student_skills or not internship_skills:
             return 0.0
+        
+        if self.state is not None:
+            vectors = self.state.skills_vectors([student_skills, internship_skills])
+            return float(min(vectors[0].multiply(vectors[1]).sum(), 1.0))
+        
+        if self.skills_backend == 'hashing':
+            return self.calculate_hashing_similarity(student_skills, internship_skills)
             
         try:
             # Combine student technical and soft skills
@@ -30,6 +208,9 @@ class InternshipMatchingEngine:
             if not student_text or not internship_text:
                 return 0.0
             
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            from sklearn.metrics.pairwise import cosine_similarity
+
             # Create TF-IDF vectors - use fresh vectorizer each time to avoid fitting conflicts
             texts = [student_text, internship_text]
             vectorizer = TfidfVectorizer(stop_words='english', max_features=1000)
@@ -43,6 +224,24 @@ class InternshipMatchingEngine:
             logging.error(f"Error calculating skills similarity: {e}")
             return 0.0
     
+    def calculate_hashing_similarity(self, student_skills, internship_skills):
+        """Cosine similarity of fit-free hashed word and character n-gram vectors"""
+        student_text = hashing_preprocess(student_skills)
+        internship_text = hashing_preprocess(internship_skills)
+        if not student_text or not internship_text:
+            return 0.0
+        
+        try:
+            from skill_vectors import hashing_vectors
+
+            vectors = hashing_vectors([student_text, internship_text])
+            similarity = vectors[0].multiply(vectors[1]).sum()
+            return float(min(similarity, 1.0))
+            
+        except Exception as e:
+            logging.error(f"Error calculating hashing skills similarity: {e}")
+            return 0.0
+    
     def calculate_location_score(self, student_preferred, student_current, internship_location):
         """Calculate location matching score"""
         if not internship_location:
@@ -85,24 +284,33 @@ class InternshipMatchingEngine:
             score += min(student.cgpa / 10.0 * 0.4, 0.4)
             
         # Course relevance
-        if student.course and internship.preferred_course:
-            if student.course.lower() in internship.preferred_course.lower() or \
-               internship.preferred_course.lower() in student.course.lower():
-                score += 0.3
+        score += self.calculate_course_score(student.course, internship.preferred_course)
                 
         # Year of study compatibility
-        if student.year_of_study and internship.year_of_study_requirement:
-            year_req = internship.year_of_study_requirement.lower()
-            student_year = student.year_of_study
+        score += self.calculate_year_score(student.year_of_study, internship.year_of_study_requirement)
+                
+        return max(0.0, min(score, 1.0))
+    
+    def calculate_course_score(self, student_course, preferred_course):
+        """Academic score bonus for a relevant course"""
+        if student_course and preferred_course:
+            if student_course.lower() in preferred_course.lower() or \
+               preferred_course.lower() in student_course.lower():
+                return 0.3
+        return 0.0
+    
+    def calculate_year_score(self, student_year, year_requirement):
+        """Academic score bonus for a compatible year of study"""
+        if student_year and year_requirement:
+            year_req = year_requirement.lower()
             
             if 'any' in year_req or str(student_year) in year_req:
-                score += 0.2
+                return 0.2
             elif 'final' in year_req and student_year >= 3:
-                score += 0.2
+                return 0.2
             elif 'junior' in year_req and student_year <= 2:
-                score += 0.2
-                
-        return max(0.0, min(score, 1.0))
+                return 0.2
+        return 0.0
     
     def calculate_affirmative_action_score(self, student, internship):
         """Calculate affirmative action bonus score"""
@@ -166,86 +374,148 @@ class InternshipMatchingEngine:
                     
         return 0.3
     
+    def _fitted_skills_score(self, internship, catalog_scores, ann_scores):
+        """Skills score taken from the fitted state, or None if the pair must be scored directly"""
+        if self.state is None or not internship.required_skills:
+            return None
+        row = self.state.row_for(internship)
+        if row is None:
+            return None
+        if ann_scores is not None:
+            return ann_scores.get(internship.id, 0.0)
+        if catalog_scores is not None:
+            return float(catalog_scores[row])
+        return None
+    
+    def match_rows(self, student, internships, existing_ids, fitted_skills_score):
+        """Column values of new matches for a student: open, not yet matched internships scoring above threshold.
+
+        ``fitted_skills_score(internship)`` returns the skills score from the fitted
+        state, or None to score the pair directly.
+        """
+        self.refresh_weights()
+        student_skills = (student.technical_skills or "") + " " + (student.soft_skills or "")
+        rows = []
+        for internship in internships:
+            # Skip if internship is full
+            if internship.filled_positions >= internship.total_positions:
+                continue
+
+            # Skip if match already exists
+            if internship.id in existing_ids:
+                continue
+
+            # Calculate individual scores
+            skills_score = fitted_skills_score(internship)
+            if skills_score is None:
+                skills_score = self.calculate_skills_similarity(student_skills, internship.required_skills)
+
+            location_score = self.calculate_location_score(
+                student.preferred_locations,
+                student.current_location,
+                internship.location
+            )
+
+            academic_score = self.calculate_academic_score(student, internship)
+
+            affirmative_action_score = self.calculate_affirmative_action_score(student, internship)
+
+            sector_score = self.calculate_sector_interest_score(
+                student.sector_interests,
+                internship.sector
+            )
+
+            # Weighted overall score
+            overall_score = weighted_score({
+                'skills': skills_score,
+                'academic': academic_score,
+                'location': location_score,
+                'sector': sector_score,
+                'affirmative_action': affirmative_action_score
+            }, self.weights)
+
+            # Only create matches above threshold
+            if overall_score >= MATCH_THRESHOLD:
+                rows.append(dict(
+                    student_id=student.id,
+                    internship_id=internship.id,
+                    overall_score=float(overall_score),
+                    skills_score=float(skills_score),
+                    location_score=float(location_score),
+                    academic_score=float(academic_score),
+                    sector_score=float(sector_score),
+                    affirmative_action_score=float(affirmative_action_score)
+                ))
+        return rows
+    
+    def within_top_k(self, rows, existing_scores=()):
+        """The new match rows that rank in the student's top ``match_top_k`` alongside their existing scores"""
+        if not self.match_top_k:
+            return rows
+        rows = sorted(rows, key=lambda row: row['overall_score'], reverse=True)
+        ranked = sorted([*existing_scores, *(row['overall_score'] for row in rows)], reverse=True)
+        if len(ranked) <= self.match_top_k:
+            return rows
+        cutoff = ranked[self.match_top_k - 1]
+        return [row for row in rows if row['overall_score'] >= cutoff][:self.match_top_k]
+    
     def generate_matches_for_student(self, student_id):
         """Generate matches for a specific student"""
         try:
+            self.warm_up()
             student = Student.query.get(student_id)
             if not student:
                 logging.error(f"Student with ID {student_id} not found")
                 return []
                 
-            # Get all active internships
-            internships = Internship.query.filter_by(is_active=True).all()
+            # Get all active internships still open for applications (the expiry job may lag)
+            query = Internship.query.filter_by(is_active=True).filter(db.or_(
+                Internship.application_deadline.is_(None),
+                Internship.application_deadline > datetime.utcnow(),
+            ))
             
-            matches = []
-            for internship in internships:
-                # Skip if internship is full
-                if internship.filled_positions >= internship.total_positions:
-                    continue
-                    
-                # Check if match already exists
-                existing_match = Match.query.filter_by(
-                    student_id=student_id, 
-                    internship_id=internship.id
-                ).first()
-                
-                if existing_match:
-                    continue
-                
-                # Calculate individual scores
-                skills_score = self.calculate_skills_similarity(
-                    (student.technical_skills or "") + " " + (student.soft_skills or ""),
-                    internship.required_skills
+            student_skills = (student.technical_skills or "") + " " + (student.soft_skills or "")
+            catalog_scores = None
+            ann_scores = None
+            if self.ann_index is not None:
+                # Only the skill-nearest internships, plus any posted after the index was built
+                ann_scores = self.ann_index.query(
+                    self.state.skills_vectors([student_skills]), top_n=self.ann_candidates
                 )
-                
-                location_score = self.calculate_location_score(
-                    student.preferred_locations,
-                    student.current_location,
-                    internship.location
-                )
-                
-                academic_score = self.calculate_academic_score(student, internship)
-                
-                affirmative_action_score = self.calculate_affirmative_action_score(student, internship)
-                
-                sector_score = self.calculate_sector_interest_score(
-                    student.sector_interests,
-                    internship.sector
-                )
-                
-                # Weighted overall score
-                weights = {
-                    'skills': 0.35,
-                    'academic': 0.25,
-                    'location': 0.20,
-                    'sector': 0.15,
-                    'affirmative_action': 0.05
-                }
-                
-                overall_score = float(
-                    skills_score * weights['skills'] +
-                    academic_score * weights['academic'] +
-                    location_score * weights['location'] +
-                    sector_score * weights['sector'] +
-                    affirmative_action_score * weights['affirmative_action']
-                )
-                
-                # Only create matches above threshold
-                if overall_score >= 0.3:
-                    match = Match(
-                        student_id=student_id,
-                        internship_id=internship.id,
-                        overall_score=float(overall_score),
-                        skills_score=float(skills_score),
-                        location_score=float(location_score),
-                        academic_score=float(academic_score),
-                        affirmative_action_score=float(affirmative_action_score)
-                    )
-                    matches.append(match)
+                query = query.filter(db.or_(
+                    Internship.id.in_(list(ann_scores)),
+                    Internship.id > self.ann_high_water,
+                ))
+            elif self.state is not None:
+                # One sparse product against the whole fitted catalog
+                catalog_scores = self.state.skills_similarities(student_skills)
+            internships = query.all()
+            
+            # Matches go into the published generation, and also into a rematch being built
+            # that has already committed this student: its rows replace the published ones
+            # when it is published, so matches written only there would disappear
+            generations = [current_generation()]
+            run = unfinished_run()
+            if run is not None and student_id <= (run.last_student_id or 0):
+                generations.append(run.id)
+            
+            # Existing matches for this student in each generation, fetched once
+            existing = {generation: dict(db.session.query(Match.internship_id, Match.overall_score)
+                                         .filter_by(student_id=student_id, run_id=generation))
+                        for generation in generations}
+            
+            candidates = self.match_rows(
+                student, internships, set.intersection(*(set(scores) for scores in existing.values())),
+                lambda internship: self._fitted_skills_score(internship, catalog_scores, ann_scores),
+            )
+            new_matches = {generation: [Match(run_id=generation, **row) for row in self.within_top_k(
+                [row for row in candidates if row['internship_id'] not in scores], scores.values())]
+                for generation, scores in existing.items()}
+            matches = new_matches[generations[0]]
             
             # Save matches to database
-            for match in matches:
-                db.session.add(match)
+            for generation_matches in new_matches.values():
+                db.session.add_all(generation_matches)
             
             db.session.commit()
             
@@ -259,67 +529,68 @@ class InternshipMatchingEngine:
             return []
     
     def calculate_match_percentage(self, student, internship):
-        """Calculate match percentage between a student and internship (on-demand)"""
+        """Calculate match percentage between a student and internship (on-demand).
+
+        Scored through score_pairs, so it agrees with the stored overall_score.
+        """
         try:
-            # Calculate individual scores using existing methods
-            skills_score = self.calculate_skills_similarity(
-                (student.technical_skills or "") + " " + (student.soft_skills or ""),
-                internship.required_skills
-            )
-            
-            location_score = self.calculate_location_score(
-                student.preferred_locations,
-                student.current_location,
-                internship.location
-            )
-            
-            academic_score = self.calculate_academic_score(student, internship)
-            
-            affirmative_action_score = self.calculate_affirmative_action_score(student, internship)
-            
-            sector_score = self.calculate_sector_interest_score(
-                student.sector_interests,
-                internship.sector
-            )
-            
-            # Weighted overall score (same weights as in generate_matches_for_student)
-            weights = {
-                'skills': 0.35,
-                'academic': 0.25,
-                'location': 0.20,
-                'sector': 0.15,
-                'affirmative_action': 0.05
-            }
-            
-            overall_score = float(
-                skills_score * weights['skills'] +
-                academic_score * weights['academic'] +
-                location_score * weights['location'] +
-                sector_score * weights['sector'] +
-                affirmative_action_score * weights['affirmative_action']
-            )
-            
             # Return percentage (0-100)
-            return round(overall_score * 100, 1)
+            return round(self.score_pairs([(student, internship)])[0]['overall'] * 100, 1)
             
         except Exception as e:
             logging.error(f"Error calculating match percentage: {e}")
             return 0.0
 
+    def score_pairs(self, pairs):
+        """Component and overall scores for many (student, internship) pairs at once.
+        
+        Works on any objects carrying the model attributes (e.g. query rows). With a
+        fitted state, skills similarities come from one vectorizer transform and a
+        row-wise sparse product for the whole batch (internships missing from the
+        state are projected into its vector space); without one, pairs are scored
+        one at a time. Returns a list of dicts, in the order of ``pairs``.
+        """
+        self.warm_up()
+        self.refresh_weights()
+        student_texts = [(student.technical_skills or "") + " " + (student.soft_skills or "")
+                         for student, _ in pairs]
+        skills_scores = [None] * len(pairs)
+        if self.state is not None and pairs:
+            import numpy as np
+
+            student_vectors = self.state.skills_vectors(student_texts)
+            internship_vectors = self.state.internship_vectors([internship for _, internship in pairs])
+            similarities = np.asarray(student_vectors.multiply(internship_vectors).sum(axis=1)).ravel()
+            skills_scores = [float(min(similarity, 1.0)) for similarity in similarities]
+        
+        results = []
+        for (student, internship), student_skills, skills_score in zip(pairs, student_texts, skills_scores):
+            if skills_score is None:
+                skills_score = self.calculate_skills_similarity(student_skills, internship.required_skills)
+            scores = {
+                'skills': skills_score,
+                'academic': self.calculate_academic_score(student, internship),
+                'location': self.calculate_location_score(
+                    student.preferred_locations, student.current_location, internship.location),
+                'sector': self.calculate_sector_interest_score(student.sector_interests, internship.sector),
+                'affirmative_action': self.calculate_affirmative_action_score(student, internship),
+            }
+            scores['overall'] = weighted_score(scores, self.weights)
+            results.append(scores)
+        return results
+    
     def generate_all_matches(self):
-        """Generate matches for all students"""
+        """Generate matches for all students, streaming them in batches (see rematch.py)"""
+        from rematch import rematch_all
+
         try:
-            students = Student.query.all()
-            total_matches = 0
-            
-            for student in students:
-                matches = self.generate_matches_for_student(student.id)
-                total_matches += len(matches)
-                logging.info(f"Generated {len(matches)} matches for student {student.name}")
-            
-            logging.info(f"Total matches generated: {total_matches}")
-            return total_matches
+            stats = rematch_all(self, batch_size=self.rematch_batch_size,
+                                memory_limit_mb=self.rematch_memory_limit_mb,
+                                tile_budget_mb=self.rematch_tile_budget_mb, top_k=self.match_top_k)
+            logging.info(f"Total matches generated: {stats['matches_created']}")
+            return stats['matches_created']
             
         except Exception as e:
             logging.error(f"Error generating all matches: {e}")
+            db.session.rollback()
             return 0
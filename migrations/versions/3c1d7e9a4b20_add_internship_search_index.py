@@ -0,0 +1,33 @@
+"""add internship full-text search index
+
+Revision ID: 3c1d7e9a4b20
+Revises: fbe90cc340f8
+Create Date: 2026-10-19 10:03:41.227610
+
+"""
+from alembic import op
+
+from search import ensure_search_index
+
+
+# revision identifiers, used by Alembic.
+revision = '3c1d7e9a4b20'
+down_revision = 'fbe90cc340f8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # SQLite: FTS5 table plus sync triggers; PostgreSQL: generated tsvector column plus GIN index
+    ensure_search_index(op.get_bind())
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        for trigger in ('internships_fts_ai', 'internships_fts_ad', 'internships_fts_au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS internships_fts")
+    elif bind.dialect.name == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_internships_search_vector")
+        op.execute("ALTER TABLE internships DROP COLUMN IF EXISTS search_vector")
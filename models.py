@@ -1,13 +1,14 @@
 from extensions import db
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from passwords import PasswordMixin
 
-class Student(db.Model):
+class Student(PasswordMixin, db.Model):
     __tablename__ = 'students'
     
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(256), nullable=True)  # Optional for Google auth
+    password_changed_at = db.Column(db.DateTime, nullable=True)  # Set by set_password, not by rehashing
     google_id = db.Column(db.String(100), unique=True, nullable=True)  # Google OAuth ID
     profile_picture = db.Column(db.String(255), nullable=True)  # Google profile picture
     name = db.Column(db.String(100), nullable=False)
@@ -43,14 +44,6 @@ class Student(db.Model):
     matches = db.relationship('Match', backref='student', lazy=True)
     applications = db.relationship('Application', backref='student', lazy=True)
     
-    def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
-    
-    def check_password(self, password):
-        if self.password_hash is None:
-            return False
-        return check_password_hash(self.password_hash, password)
-
     def calculate_profile_completeness(self):
         fields = {
             'name': 10,
@@ -122,12 +115,13 @@ class Student(db.Model):
         return completeness_score, missing_fields
 
 
-class Department(db.Model):
+class Department(PasswordMixin, db.Model):
     __tablename__ = 'departments'
     
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(256), nullable=False)
+    password_changed_at = db.Column(db.DateTime, nullable=True)  # Set by set_password, not by rehashing
     name = db.Column(db.String(200), nullable=False)
     
     # Department Information
@@ -148,14 +142,6 @@ class Department(db.Model):
     # Relationships
     internships = db.relationship('Internship', backref='department', lazy=True)
     
-    def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
-    
-    def check_password(self, password):
-        if self.password_hash is None:
-            return False
-        return check_password_hash(self.password_hash, password)
-
     def calculate_profile_completeness(self):
         fields = {
             'name': 20,
@@ -196,12 +182,13 @@ class Department(db.Model):
         return completeness_score, missing_fields
 
 
-class Admin(db.Model):
+class Admin(PasswordMixin, db.Model):
     __tablename__ = 'admins'
     
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(256), nullable=False)
+    password_changed_at = db.Column(db.DateTime, nullable=True)  # Set by set_password, not by rehashing
     name = db.Column(db.String(100), nullable=False)
     
     # Admin Information
@@ -213,14 +200,6 @@ class Admin(db.Model):
     # Relationships
     created_departments = db.relationship('Department', backref='admin_creator', lazy=True)
     
-    def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
-    
-    def check_password(self, password):
-        if self.password_hash is None:
-            return False
-        return check_password_hash(self.password_hash, password)
-
 class Internship(db.Model):
     __tablename__ = 'internships'
     
@@ -255,10 +234,14 @@ class Internship(db.Model):
     is_active = db.Column(db.Boolean, default=True)
     application_deadline = db.Column(db.DateTime)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     matches = db.relationship('Match', backref='internship', lazy=True)
     applications = db.relationship('Application', backref='internship', lazy=True)
+    
+    # Finds active internships whose deadline has passed without a table scan
+    __table_args__ = (db.Index('ix_internships_active_deadline', 'is_active', 'application_deadline'),)
 
 class Match(db.Model):
     __tablename__ = 'matches'
@@ -272,14 +255,165 @@ class Match(db.Model):
     skills_score = db.Column(db.Float)
     location_score = db.Column(db.Float)
     academic_score = db.Column(db.Float)
+    sector_score = db.Column(db.Float)
     affirmative_action_score = db.Column(db.Float)
     
     # Match Status
-    status = db.Column(db.String(50), default='pending')  # pending, accepted, rejected
+    status = db.Column(db.String(50), default='pending')  # pending, accepted, rejected, expired
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
-    # Ensure unique student-internship pairs
-    __table_args__ = (db.UniqueConstraint('student_id', 'internship_id'),)
+    # Generation: the full rematch (MatchRun) that wrote the row, 0 for earlier matches.
+    # Readers only see the published generation (see generations.py)
+    run_id = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    
+    # Ensure unique student-internship pairs within a generation
+    __table_args__ = (db.UniqueConstraint('run_id', 'student_id', 'internship_id',
+                                          name='uq_matches_run_student_internship'),)
+
+class MatchArchive(db.Model):
+    """Matches moved out of the hot table by the retention job (see retention.py)"""
+    __tablename__ = 'match_archive'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.Integer, nullable=False, index=True)
+    internship_id = db.Column(db.Integer, nullable=False)
+    overall_score = db.Column(db.Float, nullable=False)
+    status = db.Column(db.String(50))
+    created_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+    reason = db.Column(db.String(20))  # stale, rank
+
+class MatchScoreStat(db.Model):
+    """Match score distribution per sector, location or social category (see analytics.py)"""
+    __tablename__ = 'match_score_stats'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    dimension = db.Column(db.String(50), nullable=False)  # sector, location, social_category
+    value = db.Column(db.String(200), nullable=False)
+    matches = db.Column(db.Integer, default=0)
+    mean_score = db.Column(db.Float)
+    p25 = db.Column(db.Float)
+    p50 = db.Column(db.Float)
+    p75 = db.Column(db.Float)
+    applied = db.Column(db.Integer, default=0)
+    accepted = db.Column(db.Integer, default=0)
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class MatchConversion(db.Model):
+    """Matches, applications and acceptances per 10-point match score band"""
+    __tablename__ = 'match_conversion'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    band = db.Column(db.Integer, nullable=False)  # lower bound in percent: 0, 10, ... 90
+    matches = db.Column(db.Integer, default=0)
+    applied = db.Column(db.Integer, default=0)
+    accepted = db.Column(db.Integer, default=0)
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class QuotaFill(db.Model):
+    """Reserved seats across active internships and how many are filled by eligible students"""
+    __tablename__ = 'quota_fill'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    category = db.Column(db.String(20), nullable=False)  # SC, ST, OBC, RURAL
+    reserved_seats = db.Column(db.Integer, default=0)
+    filled = db.Column(db.Integer, default=0)
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class AppSetting(db.Model):
+    """A setting switched at runtime by a CLI command and followed by every worker (see weights.py)"""
+    __tablename__ = 'app_settings'
+    
+    key = db.Column(db.String(64), primary_key=True)
+    value = db.Column(db.Text, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class MatchRun(db.Model):
+    """A full rematch with its per-batch checkpoint, so an interrupted run can resume (see rematch.py)"""
+    __tablename__ = 'match_runs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    status = db.Column(db.String(20), default='running')  # running, failed, abandoned, published, superseded
+    batch_size = db.Column(db.Integer)
+    total_students = db.Column(db.Integer, default=0)  # student count when the run started
+    attempts = db.Column(db.Integer, default=1)
+    
+    # Checkpoint, committed with each batch's matches
+    last_student_id = db.Column(db.Integer, default=0)
+    students_done = db.Column(db.Integer, default=0)
+    matches_created = db.Column(db.Integer, default=0)
+    batches_done = db.Column(db.Integer, default=0)
+    seconds = db.Column(db.Float, default=0.0)  # working time summed over attempts
+    peak_rss_mb = db.Column(db.Float)  # highest RSS sampled after a score tile, over attempts
+    
+    error = db.Column(db.Text)
+    started_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+    published_at = db.Column(db.DateTime)
+    superseded_at = db.Column(db.DateTime)
+    
+    def progress(self):
+        """JSON-ready summary for the admin dashboard"""
+        done = self.students_done or 0
+        rate = done / self.seconds if self.seconds else None
+        remaining = max((self.total_students or 0) - done, 0)
+        return {
+            'id': self.id,
+            'status': self.status,
+            'students_done': done,
+            'total_students': self.total_students,
+            'percent': min(100.0, 100.0 * done / self.total_students) if self.total_students else 100.0,
+            'matches_created': self.matches_created,
+            'batches_done': self.batches_done,
+            'seconds': self.seconds,
+            'peak_rss_mb': self.peak_rss_mb,
+            'attempts': self.attempts,
+            'students_per_second': rate,
+            'eta_seconds': remaining / rate if rate and self.status == 'running' else None,
+            'error': self.error,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'published_at': self.published_at.isoformat() if self.published_at else None,
+        }
+
+class ShadowRun(db.Model):
+    """A candidate engine scored in shadow against production matches (see shadow.py)"""
+    __tablename__ = 'shadow_runs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    label = db.Column(db.String(200), nullable=False)
+    status = db.Column(db.String(20), default='running')  # running, completed, failed
+    started_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+    
+    # Comparison with production, filled in when the run completes
+    students = db.Column(db.Integer, default=0)
+    pairs = db.Column(db.Integer, default=0)
+    top_k = db.Column(db.Integer)
+    rank_correlation = db.Column(db.Float)  # mean per-student Spearman correlation
+    top_k_overlap = db.Column(db.Float)  # mean per-student share of the production top K kept
+    mean_delta = db.Column(db.Float)  # shadow minus production overall score
+    mean_abs_delta = db.Column(db.Float)
+    p95_abs_delta = db.Column(db.Float)
+    max_abs_delta = db.Column(db.Float)
+
+class ShadowScore(db.Model):
+    """One production match rescored by a shadow run's candidate engine"""
+    __tablename__ = 'shadow_scores'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    run_id = db.Column(db.Integer, db.ForeignKey('shadow_runs.id'), nullable=False, index=True)
+    student_id = db.Column(db.Integer, nullable=False)
+    internship_id = db.Column(db.Integer, nullable=False)
+    production_score = db.Column(db.Float, nullable=False)
+    overall_score = db.Column(db.Float, nullable=False)
+    skills_score = db.Column(db.Float)
+    location_score = db.Column(db.Float)
+    academic_score = db.Column(db.Float)
+    sector_score = db.Column(db.Float)
+    affirmative_action_score = db.Column(db.Float)
 
 class Application(db.Model):
     __tablename__ = 'applications'
@@ -303,5 +437,8 @@ class Application(db.Model):
     interview_date = db.Column(db.DateTime)
     response_date = db.Column(db.DateTime)
     
+    # Idempotency token from the application form, so a resubmitted form is recognised
+    submission_token = db.Column(db.String(64), unique=True, index=True)
+    
     # Ensure unique student-internship applications
     __table_args__ = (db.UniqueConstraint('student_id', 'internship_id'),)
@@ -1,8 +1,13 @@
 import json
+import logging
 import os
+import threading
+import time
+from functools import lru_cache
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from flask import session, request, redirect, url_for
-from google_auth_oauthlib.flow import Flow
 from flask import current_app
 from extensions import db
 from models import Student, Department
@@ -11,9 +16,144 @@ from models import Student, Department
 GOOGLE_CLIENT_ID = ""
 GOOGLE_CLIENT_SECRET = ""
 
-def load_google_secrets():
-    """Load Google OAuth secrets from environment"""
-    global GOOGLE_CLIENT_ID, GOOGLE_CLIENT_SECRET
+# Endpoints are overridable so load tests can point them at oauth_stub.py
+GOOGLE_AUTH_URI = os.environ.get("GOOGLE_AUTH_URI", "https://accounts.google.com/o/oauth2/auth")
+GOOGLE_TOKEN_URI = os.environ.get("GOOGLE_TOKEN_URI", "https://oauth2.googleapis.com/token")
+GOOGLE_USERINFO_URL = os.environ.get("GOOGLE_USERINFO_URL", "https://www.googleapis.com/oauth2/v2/userinfo")
+
+GOOGLE_SCOPES = [
+    "openid",
+    "https://www.googleapis.com/auth/userinfo.email",
+    "https://www.googleapis.com/auth/userinfo.profile"
+]
+
+# (connect, read) timeouts in seconds for every call to Google
+OAUTH_TIMEOUT = (
+    float(os.environ.get("OAUTH_CONNECT_TIMEOUT", "3.05")),
+    float(os.environ.get("OAUTH_READ_TIMEOUT", "5")),
+)
+OAUTH_POOL_SIZE = int(os.environ.get("OAUTH_POOL_SIZE", "10"))
+OAUTH_MAX_RETRIES = int(os.environ.get("OAUTH_MAX_RETRIES", "2"))
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling Google while the circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """Stop calling a failing dependency for a cool-down period.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    calls fail fast. Once ``reset_timeout`` seconds have passed a single trial
+    call is let through (half-open); success closes the breaker again. Only
+    exceptions of ``failure_types`` count as failures.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, failure_types=(Exception,)):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failure_types = failure_types
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+    def call(self, func, *args, **kwargs):
+        if not self.allow():
+            raise CircuitOpenError("Google OAuth circuit is open")
+        try:
+            result = func(*args, **kwargs)
+        except self.failure_types:
+            self.record_failure()
+            raise
+        except Exception:
+            # The dependency answered (e.g. rejected a bad code); that is not an outage
+            self.record_success()
+            raise
+        self.record_success()
+        return result
+
+
+google_breaker = CircuitBreaker(
+    failure_threshold=int(os.environ.get("OAUTH_BREAKER_THRESHOLD", "5")),
+    reset_timeout=float(os.environ.get("OAUTH_BREAKER_RESET", "30")),
+    failure_types=(requests.RequestException,),
+)
+
+_adapter = None
+_http = None
+_http_pid = None
+
+
+def get_http_adapter():
+    """Process-wide keep-alive connection pool with bounded retries"""
+    global _adapter, _http, _http_pid
+    # Pools must not cross a fork: rebuild them in each worker process
+    if _adapter is None or _http_pid != os.getpid():
+        retry = Retry(
+            total=OAUTH_MAX_RETRIES,
+            connect=OAUTH_MAX_RETRIES,
+            read=OAUTH_MAX_RETRIES,
+            status_forcelist=(429, 500, 502, 503, 504),
+            # Connection failures are retried for any method, but a token POST that
+            # reached Google must not be replayed: authorization codes are single-use
+            allowed_methods=frozenset(["GET"]),
+            backoff_factor=0.2,
+            respect_retry_after_header=False,
+        )
+        _adapter = HTTPAdapter(pool_connections=4, pool_maxsize=OAUTH_POOL_SIZE, max_retries=retry)
+        _http = None
+        _http_pid = os.getpid()
+    return _adapter
+
+
+def get_http_session():
+    """Shared requests.Session for Google API calls"""
+    global _http
+    adapter = get_http_adapter()
+    if _http is None:
+        _http = requests.Session()
+        _http.mount("https://", adapter)
+        _http.mount("http://", adapter)
+    return _http
+
+
+@lru_cache(maxsize=1)
+def get_google_config():
+    """Parse Google OAuth client ID and secret from the environment once per process"""
+    client_id = ""
+    client_secret = ""
 
     # Try JSON secrets format
     secrets_json = os.environ.get("GOOGLE_OAUTH_SECRETS")
@@ -21,19 +161,28 @@ def load_google_secrets():
         try:
             secrets = json.loads(secrets_json)
             web_config = secrets.get("web", {})
-            GOOGLE_CLIENT_ID = web_config.get("client_id", "")
-            GOOGLE_CLIENT_SECRET = web_config.get("client_secret", "")
+            client_id = web_config.get("client_id", "")
+            client_secret = web_config.get("client_secret", "")
         except json.JSONDecodeError:
-            print("Error: Invalid JSON in GOOGLE_OAUTH_SECRETS")
+            logging.error("Invalid JSON in GOOGLE_OAUTH_SECRETS")
 
     # Fallback to individual env variables
-    if not GOOGLE_CLIENT_ID:
-        GOOGLE_CLIENT_ID = os.environ.get("GOOGLE_CLIENT_ID", "")
-    if not GOOGLE_CLIENT_SECRET:
-        GOOGLE_CLIENT_SECRET = os.environ.get("GOOGLE_CLIENT_SECRET", "")
+    if not client_id:
+        client_id = os.environ.get("GOOGLE_CLIENT_ID", "")
+    if not client_secret:
+        client_secret = os.environ.get("GOOGLE_CLIENT_SECRET", "")
+    return client_id, client_secret
+
+
+def load_google_secrets():
+    """Load Google OAuth secrets from environment"""
+    global GOOGLE_CLIENT_ID, GOOGLE_CLIENT_SECRET
+    GOOGLE_CLIENT_ID, GOOGLE_CLIENT_SECRET = get_google_config()
 
 def create_google_flow():
     """Create Google OAuth flow"""
+    from google_auth_oauthlib.flow import Flow
+
     load_google_secrets()
 
     if not GOOGLE_CLIENT_ID or not GOOGLE_CLIENT_SECRET:
@@ -43,37 +192,60 @@ def create_google_flow():
         "web": {
             "client_id": GOOGLE_CLIENT_ID,
             "client_secret": GOOGLE_CLIENT_SECRET,
-            "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-            "token_uri": "https://oauth2.googleapis.com/token",
+            "auth_uri": GOOGLE_AUTH_URI,
+            "token_uri": GOOGLE_TOKEN_URI,
             "redirect_uris": [get_redirect_uri()],
         }
     }
 
-    flow = Flow.from_client_config(
-        client_config,     
-        scopes=[
-        "openid",
-        "https://www.googleapis.com/auth/userinfo.email",
-        "https://www.googleapis.com/auth/userinfo.profile"
-    ]
-    )
+    flow = Flow.from_client_config(client_config, scopes=GOOGLE_SCOPES)
+    # Token exchange goes through the shared keep-alive pool too
+    adapter = get_http_adapter()
+    flow.oauth2session.mount("https://", adapter)
+    flow.oauth2session.mount("http://", adapter)
+    flow.oauth2session.register_compliance_hook("access_token_response", _raise_for_server_error)
     flow.redirect_uri = get_redirect_uri()
     return flow
 
+def _raise_for_server_error(response):
+    """Surface token endpoint 5xx as HTTPError so the circuit breaker counts it"""
+    if response.status_code >= 500:
+        response.raise_for_status()
+    return response
+
 def get_redirect_uri():
     """Get OAuth redirect URI (works for local + deployment)"""
     return url_for("main.oauth_callback", _external=True)
 
+def fetch_google_token(flow, authorization_response):
+    """Exchange the authorization code, bounded by timeouts and the circuit breaker"""
+    return google_breaker.call(
+        flow.fetch_token,
+        authorization_response=authorization_response,
+        timeout=OAUTH_TIMEOUT,
+    )
+
 def get_google_user_info(access_token):
     """Fetch user info from Google API"""
-    try:
-        response = requests.get(
-            "https://www.googleapis.com/oauth2/v2/userinfo",
+    def fetch():
+        response = get_http_session().get(
+            GOOGLE_USERINFO_URL,
             headers={"Authorization": f"Bearer {access_token}"},
+            timeout=OAUTH_TIMEOUT,
         )
+        # Only server-side failures count against the breaker; a bad token is the caller's problem
+        if response.status_code >= 500:
+            response.raise_for_status()
+        return response
+
+    try:
+        response = google_breaker.call(fetch)
         return response.json() if response.status_code == 200 else None
+    except CircuitOpenError:
+        logging.warning("Skipping Google user info request: circuit breaker open")
+        return None
     except Exception as e:
-        print(f"Error fetching Google user info: {e}")
+        logging.error(f"Error fetching Google user info: {e}")
         return None
 
 def handle_google_login(user_info, user_type):
@@ -0,0 +1,112 @@
+import argparse
+import itertools
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+from oauth import GOOGLE_SCOPES
+
+# Local stand-in for Google's authorization, token and userinfo endpoints, for
+# load testing /auth/google -> /oauth2callback without touching Google. Run the
+# app with:
+#   OAUTHLIB_INSECURE_TRANSPORT=1 GOOGLE_CLIENT_ID=stub GOOGLE_CLIENT_SECRET=stub
+#   GOOGLE_AUTH_URI=http://127.0.0.1:8765/auth
+#   GOOGLE_TOKEN_URI=http://127.0.0.1:8765/token
+#   GOOGLE_USERINFO_URL=http://127.0.0.1:8765/userinfo
+
+
+class StubOAuthHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    codes = itertools.count(1)
+    latency = 0.0
+    error_rate = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _delay_or_fail(self):
+        if self.latency:
+            time.sleep(self.latency)
+        if self.error_rate and random.random() < self.error_rate:
+            self._send_json({"error": "backend_error"}, status=503)
+            return True
+        return False
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/auth":
+            # Consent is instant: bounce straight back with a fresh code
+            params = parse_qs(url.query)
+            query = urlencode({"state": params.get("state", [""])[0], "code": f"stub-code-{next(self.codes)}"})
+            self.send_response(302)
+            self.send_header("Location", f"{params['redirect_uri'][0]}?{query}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        elif url.path == "/userinfo":
+            if self._delay_or_fail():
+                return
+            token = self.headers.get("Authorization", "").removeprefix("Bearer ")
+            user = token.removeprefix("stub-token-")
+            self._send_json({
+                "id": f"stub-{user}",
+                "email": f"{user}@oauth-stub.test",
+                "name": f"Stub User {user}",
+                "picture": "",
+            })
+        else:
+            self._send_json({"error": "not_found"}, status=404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        form = parse_qs(self.rfile.read(length).decode("utf-8"))
+        if urlparse(self.path).path != "/token":
+            self._send_json({"error": "not_found"}, status=404)
+            return
+        if self._delay_or_fail():
+            return
+        code = form.get("code", ["unknown"])[0]
+        self._send_json({
+            "access_token": f"stub-token-{code.removeprefix('stub-code-')}",
+            "token_type": "Bearer",
+            "expires_in": 3600,
+            "scope": " ".join(GOOGLE_SCOPES),
+        })
+
+
+def serve(host="127.0.0.1", port=8765, latency_ms=0.0, error_rate=0.0, background=False):
+    """Start the stub; with background=True it runs in a daemon thread and the server is returned"""
+    handler = type("ConfiguredStubOAuthHandler", (StubOAuthHandler,), {
+        "latency": latency_ms / 1000.0,
+        "error_rate": error_rate,
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    if background:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+    print(f"Stub Google OAuth listening on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stub of Google's OAuth endpoints")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay added to token/userinfo calls")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of token/userinfo calls answered 503")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.latency_ms, args.error_rate)
@@ -0,0 +1,145 @@
+import os
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from functools import lru_cache
+
+from flask import current_app, has_app_context
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# Settings in effect, read from the app config (see app.py) the first time a hash is
+# made or checked, or set with configure. Stored hashes made with another
+# PASSWORD_HASH_METHOD are upgraded the next time the user logs in.
+PASSWORD_HASH_METHOD = "scrypt"
+
+# Hash checks run on a small per-process pool. hashlib's scrypt and pbkdf2 release the
+# GIL, so threads give real parallelism. At most workers + queue checks are admitted
+# at once; a login that cannot get a slot within PASSWORD_CHECK_WAIT seconds is
+# turned away instead of piling more CPU work onto a saturated worker.
+PASSWORD_HASH_WORKERS = os.cpu_count() or 1
+PASSWORD_HASH_QUEUE = 2 * PASSWORD_HASH_WORKERS
+PASSWORD_CHECK_WAIT = 1.0
+
+
+class PasswordCheckBusy(Exception):
+    """Raised when every password-check slot is taken"""
+
+
+_pool = None
+_pool_pid = None
+_slots = threading.BoundedSemaphore(PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE)
+_pool_lock = threading.Lock()
+_config_lock = threading.Lock()
+_configured = False
+
+
+def _load_config():
+    """Take the PASSWORD_* settings from the app config on first use"""
+    if not _configured and has_app_context():
+        config = current_app.config
+        with _config_lock:
+            if not _configured:
+                configure(method=config["PASSWORD_HASH_METHOD"], workers=config["PASSWORD_HASH_WORKERS"],
+                          queue=config["PASSWORD_HASH_QUEUE"] or None, wait=config["PASSWORD_CHECK_WAIT"])
+
+
+def _executor():
+    """The hashing pool of this process (rebuilt after a fork)"""
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def configure(method=None, workers=None, queue=None, wait=None):
+    """Override the settings; the app config is then no longer read"""
+    global PASSWORD_HASH_METHOD, PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE, PASSWORD_CHECK_WAIT
+    global _pool, _slots, _configured
+    if method is not None:
+        PASSWORD_HASH_METHOD = method
+    if wait is not None:
+        PASSWORD_CHECK_WAIT = wait
+    if workers is not None or queue is not None:
+        PASSWORD_HASH_WORKERS = workers or PASSWORD_HASH_WORKERS
+        PASSWORD_HASH_QUEUE = queue if queue is not None else 2 * PASSWORD_HASH_WORKERS
+        with _pool_lock:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = None
+            _slots = threading.BoundedSemaphore(PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE)
+    _configured = True
+
+
+@lru_cache(maxsize=8)
+def _hash_prefix(method):
+    """Parameter prefix werkzeug writes for ``method``, with its defaults filled in"""
+    return generate_password_hash("", method).split("$", 1)[0]
+
+
+def hash_password(password):
+    _load_config()
+    return generate_password_hash(password, PASSWORD_HASH_METHOD)
+
+
+def needs_rehash(password_hash):
+    """True when a stored hash was made with parameters other than the configured ones"""
+    _load_config()
+    return password_hash.split("$", 1)[0] != _hash_prefix(PASSWORD_HASH_METHOD)
+
+
+def _on_pool(function, *args):
+    """Run ``function`` on the hashing pool once a slot is free.
+
+    Raises PasswordCheckBusy when no slot frees up within PASSWORD_CHECK_WAIT.
+    """
+    _load_config()
+    slots = _slots
+    if not slots.acquire(timeout=PASSWORD_CHECK_WAIT):
+        raise PasswordCheckBusy()
+    try:
+        future = _executor().submit(function, *args)
+        try:
+            return future.result(timeout=30)
+        except FutureTimeoutError:
+            raise PasswordCheckBusy()
+    finally:
+        slots.release()
+
+
+def verify_password(password_hash, password):
+    """check_password_hash on the hashing pool, with admission control"""
+    return _on_pool(check_password_hash, password_hash, password)
+
+
+class PasswordMixin:
+    """set_password/check_password for models with ``password_hash`` and ``password_changed_at`` columns.
+
+    password_changed_at marks real credential changes only (it is the sessions'
+    identity stamp, see auth.py); upgrading a hash leaves it alone.
+    """
+
+    def set_password(self, password):
+        self.password_hash = hash_password(password)
+        self.password_changed_at = datetime.utcnow()
+
+    def check_password(self, password):
+        """Verify a password, upgrading the stored hash if its parameters are outdated.
+
+        An upgraded hash is left on the instance for the caller to commit. It is
+        made on the hashing pool too, and skipped when the pool is saturated: the
+        next login retries it. The password itself is unchanged, so
+        password_changed_at (and every signed-in session) is kept.
+        """
+        if self.password_hash is None:
+            return False
+        if not verify_password(self.password_hash, password):
+            return False
+        if needs_rehash(self.password_hash):
+            try:
+                self.password_hash = _on_pool(generate_password_hash, password, PASSWORD_HASH_METHOD)
+            except PasswordCheckBusy:
+                pass
+        return True
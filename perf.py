@@ -0,0 +1,616 @@
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from contextlib import contextmanager
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+GUNICORN_CONFIG = os.path.join(PROJECT_DIR, "gunicorn.conf.py")
+
+COLD_START_SNIPPET = (
+    "import time; t = time.perf_counter(); import main; "
+    "print(f'COLD_START {time.perf_counter() - t:.6f}')"
+)
+
+REMATCH_SNIPPET = (
+    "import json, sys; from app import create_app; app = create_app(); ctx = app.app_context(); ctx.push(); "
+    "from routes import matching_engine; from rematch import rematch_all, rss_mb; "
+    "print('REMATCH_START', json.dumps({'rss_mb': rss_mb()})); "
+    "stats = rematch_all(matching_engine, batch_size=int(sys.argv[1]), memory_limit_mb=int(sys.argv[2]), "
+    "tile_budget_mb=float(sys.argv[3]), top_k=int(sys.argv[4])); "
+    "print('REMATCH', json.dumps(stats))"
+)
+
+SMAPS_FIELDS = ('Rss', 'Pss', 'Shared_Clean', 'Shared_Dirty', 'Private_Clean', 'Private_Dirty')
+
+
+def free_port():
+    """Ask the OS for an unused local TCP port"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def process_memory(pid):
+    """Memory counters in kB from /proc/<pid>/smaps_rollup (Linux only)"""
+    counters = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            name, _, rest = line.partition(':')
+            if name in SMAPS_FIELDS:
+                counters[name] = int(rest.split()[0])
+    counters['Private'] = counters.get('Private_Clean', 0) + counters.get('Private_Dirty', 0)
+    return counters
+
+
+def child_pids(pid):
+    """Direct children of a process"""
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(child) for child in f.read().split()]
+
+
+def wait_for_port(port, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def start_gunicorn(port, workers, preload, extra_env=None):
+    """Start gunicorn for main:app with the project config on a local port"""
+    env = dict(os.environ)
+    env.update({
+        "GUNICORN_BIND": f"127.0.0.1:{port}",
+        "GUNICORN_WORKERS": str(workers),
+        "GUNICORN_PRELOAD": "1" if preload else "0",
+    })
+    env.update(extra_env or {})
+    return subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", GUNICORN_CONFIG, "main:app"],
+        cwd=PROJECT_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def stop_process(process, timeout=30):
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def measure_worker_memory(workers=4, preload=True, warmup_requests=200, paths=('/',)):
+    """Start gunicorn, drive some traffic through every worker and sample per-process memory"""
+    port = free_port()
+    master = start_gunicorn(port, workers, preload)
+    try:
+        if not wait_for_port(port):
+            raise RuntimeError("gunicorn did not start listening in time")
+        deadline = time.monotonic() + 30
+        while len(child_pids(master.pid)) < workers and time.monotonic() < deadline:
+            time.sleep(0.2)
+
+        for i in range(warmup_requests):
+            path = paths[i % len(paths)]
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}{path}", timeout=10).read()
+            except Exception:
+                pass
+        time.sleep(1.0)
+
+        return {
+            'master': process_memory(master.pid),
+            'workers': [process_memory(pid) for pid in child_pids(master.pid)],
+        }
+    finally:
+        stop_process(master)
+
+
+def summarise_worker_memory(sample):
+    """Average per-worker counters plus the total PSS of the whole process group"""
+    workers = sample['workers']
+    summary = {field: sum(w.get(field, 0) for w in workers) / max(len(workers), 1)
+               for field in ('Rss', 'Pss', 'Private')}
+    summary['workers'] = len(workers)
+    summary['total_pss'] = sample['master'].get('Pss', 0) + sum(w.get('Pss', 0) for w in workers)
+    return summary
+
+
+def measure_cold_start(extra_env=None):
+    """Import main (and so create the app) in a fresh interpreter under -X importtime.
+
+    Returns the wall-clock seconds for the import and the per-module timings as
+    (module, self_us, cumulative_us, depth) tuples.
+    """
+    env = dict(os.environ)
+    env.update(extra_env or {})
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", COLD_START_SNIPPET],
+        cwd=PROJECT_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Cold start failed:\n{result.stderr[-2000:]}")
+
+    wall = None
+    for line in result.stdout.splitlines():
+        if line.startswith("COLD_START "):
+            wall = float(line.split()[1])
+
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        modules.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return wall, modules
+
+
+def compare_skills_backends(n_students=200, n_internships=500, pair_samples=500, seed=0, variant_rate=0.5):
+    """Benchmark and score the quality of each skills backend on synthetic data.
+
+    Relevance is ground truth from the generator: a pair is relevant when the
+    student and internship share a canonical skill, whatever spelling each used.
+    """
+    import random
+
+    import numpy as np
+    from scipy.stats import spearmanr
+    from sklearn.metrics import roc_auc_score
+
+    from engine_state import EngineState
+    from matching_engine import InternshipMatchingEngine
+    from skill_vectors import SKILLS_BACKENDS
+    from synthetic import make_internships, make_students
+
+    students = make_students(n_students, seed=seed, variant_rate=variant_rate)
+    internships = make_internships(n_internships, seed=seed + 1, variant_rate=variant_rate)
+    for row, (internship, _) in enumerate(internships, start=1):
+        internship.id = row
+    relevant = np.array([[bool(s_skills & i_skills) for _, i_skills in internships]
+                         for _, s_skills in students])
+
+    rng = random.Random(seed)
+    sample = [(rng.randrange(n_students), rng.randrange(n_internships)) for _ in range(pair_samples)]
+
+    results = {}
+    for backend in SKILLS_BACKENDS:
+        engine = InternshipMatchingEngine()
+        engine.configure(skills_backend=backend)
+
+        start = time.perf_counter()
+        for s, i in sample:
+            engine.calculate_skills_similarity(students[s][0].technical_skills, internships[i][0].required_skills)
+        pair_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        state = EngineState.build([internship for internship, _ in internships], backend=backend)
+        build_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        scores = np.vstack([state.skills_similarities(student.technical_skills) for student, _ in students])
+        catalog_seconds = time.perf_counter() - start
+
+        top5 = np.argsort(-scores, axis=1)[:, :5]
+        results[backend] = {
+            'pairs_per_second': pair_samples / pair_seconds,
+            'build_seconds': build_seconds,
+            'students_per_second': n_students / catalog_seconds,
+            'auc': roc_auc_score(relevant.ravel(), scores.ravel()),
+            'precision_at_5': float(np.take_along_axis(relevant, top5, axis=1).mean()),
+            'relevant_recall': float((scores[relevant] > 0).mean()),
+            'scores': scores,
+        }
+
+    correlation = spearmanr(results['tfidf']['scores'].ravel(), results['hashing']['scores'].ravel())[0]
+    for result in results.values():
+        del result['scores']
+    return results, float(correlation)
+
+
+def percentile(values, q):
+    """q-th percentile (0-100) of a list of numbers, nearest-rank"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q / 100.0 * len(ordered))) - 1))]
+
+
+def drive_oauth_logins(base_url, users=200, concurrency=20):
+    """Run full /auth/google -> stub -> /oauth2callback logins concurrently.
+
+    Returns (elapsed seconds, list of per-login latencies, error count).
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    import requests
+
+    def login(_):
+        client = requests.Session()
+        start = time.perf_counter()
+        try:
+            response = client.get(f"{base_url}/auth/google?type=student", timeout=60)
+            ok = response.status_code == 200 and "/complete_student_profile" in response.url
+        except requests.RequestException:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(login, range(users)))
+    elapsed = time.perf_counter() - start
+    return elapsed, [latency for latency, _ in results], sum(1 for _, ok in results if not ok)
+
+
+def measure_oauth_callback(users=200, concurrency=20, workers=4, latency_ms=50.0, error_rate=0.0):
+    """Start the OAuth stub and gunicorn wired to it, then drive concurrent Google logins"""
+    import oauth_stub
+
+    stub_port = free_port()
+    stub = oauth_stub.serve(port=stub_port, latency_ms=latency_ms, error_rate=error_rate, background=True)
+    stub_url = f"http://127.0.0.1:{stub_port}"
+    port = free_port()
+    server = start_gunicorn(port, workers, preload=True, extra_env={
+        "OAUTHLIB_INSECURE_TRANSPORT": "1",
+        "GOOGLE_CLIENT_ID": "stub-client",
+        "GOOGLE_CLIENT_SECRET": "stub-secret",
+        "GOOGLE_AUTH_URI": f"{stub_url}/auth",
+        "GOOGLE_TOKEN_URI": f"{stub_url}/token",
+        "GOOGLE_USERINFO_URL": f"{stub_url}/userinfo",
+    })
+    try:
+        if not wait_for_port(port):
+            raise RuntimeError("gunicorn did not start listening in time")
+        return drive_oauth_logins(f"http://127.0.0.1:{port}", users, concurrency)
+    finally:
+        stop_process(server)
+        stub.shutdown()
+
+
+def measure_login_throughput(emails, password, logins=500, concurrency=8, workers=None, extra_env=None):
+    """Drive password logins through gunicorn and time them.
+
+    Returns (elapsed seconds, latencies, accepted, busy, failed); ``busy`` counts
+    503s from password-check admission control.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    import requests
+
+    workers = workers or os.cpu_count() or 1
+    port = free_port()
+    server = start_gunicorn(port, workers, preload=True, extra_env=extra_env)
+    url = f"http://127.0.0.1:{port}/login"
+
+    def login(i):
+        start = time.perf_counter()
+        try:
+            response = requests.post(url, data={
+                'email': emails[i % len(emails)],
+                'password': password,
+                'user_type': 'student',
+            }, allow_redirects=False, timeout=60)
+            status = response.status_code
+            if status == 302 and "/student/dashboard" not in response.headers.get("Location", ""):
+                status = 401
+        except requests.RequestException:
+            status = None
+        return time.perf_counter() - start, status
+
+    try:
+        if not wait_for_port(port):
+            raise RuntimeError("gunicorn did not start listening in time")
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(login, range(logins)))
+        elapsed = time.perf_counter() - start
+    finally:
+        stop_process(server)
+
+    statuses = [status for _, status in results]
+    accepted = statuses.count(302)
+    busy = statuses.count(503)
+    return elapsed, [latency for latency, _ in results], accepted, busy, len(results) - accepted - busy
+
+
+@contextmanager
+def scratch_catalog(n_internships, seed=0):
+    """A throwaway SQLite database holding ``n_internships`` synthetic internships
+    (with the search index), as (engine, seconds spent building it)"""
+    import random
+    import tempfile
+
+    from sqlalchemy import create_engine
+
+    from extensions import db
+    from search import ensure_search_index
+    from synthetic import internship_fields
+
+    scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    scratch.close()
+    engine = create_engine(f"sqlite:///{scratch.name}")
+    rng = random.Random(seed)
+    try:
+        start = time.perf_counter()
+        db.metadata.create_all(engine)
+        with engine.begin() as connection:
+            ensure_search_index(connection)
+            internships = db.metadata.tables['internships']
+            batch = []
+            for index in range(n_internships):
+                batch.append(internship_fields(rng, index, department_id=1)[1])
+                if len(batch) == 5000:
+                    connection.execute(internships.insert(), batch)
+                    batch = []
+            if batch:
+                connection.execute(internships.insert(), batch)
+        yield engine, time.perf_counter() - start
+    finally:
+        engine.dispose()
+        os.unlink(scratch.name)
+
+
+def measure_search(n_internships=100000, n_queries=200, seed=0):
+    """Time full-text search on a scratch database filled with synthetic internships.
+
+    Returns (build seconds, per-query latencies in seconds, mean hits per query).
+    """
+    import random
+
+    from search import count_matches, ranked_ids
+    from synthetic import SKILL_VARIANTS, SECTORS
+
+    rng = random.Random(seed)
+    with scratch_catalog(n_internships, seed) as (engine, build_seconds):
+        vocabulary = [variant for variants in SKILL_VARIANTS.values() for variant in variants] + SECTORS
+        latencies, hits = [], 0
+        with engine.connect() as connection:
+            for _ in range(n_queries):
+                query = " ".join(rng.sample(vocabulary, rng.randint(1, 2)))
+                start = time.perf_counter()
+                total = count_matches(connection, query)
+                ranked_ids(connection, query, limit=20)
+                latencies.append(time.perf_counter() - start)
+                hits += total
+    return build_seconds, latencies, hits / max(n_queries, 1)
+
+
+def measure_facets(n_internships=100000, n_queries=200, seed=0):
+    """Compare facet counting on the in-memory bitmap index with per-request GROUP BY.
+
+    Returns (index build seconds, bitmap latencies, GROUP BY latencies), in seconds.
+    """
+    import random
+
+    from sqlalchemy import text
+
+    from facets import FacetIndex
+    from synthetic import LOCATIONS, SECTORS
+
+    rng = random.Random(seed)
+    with scratch_catalog(n_internships, seed) as (engine, _):
+        with engine.connect() as connection:
+            start = time.perf_counter()
+            index = FacetIndex()
+            index.load(connection.execute(text(
+                "SELECT id, sector, location, stipend, duration_months, min_cgpa, 'Central' "
+                "FROM internships WHERE is_active ORDER BY id")))
+            build_seconds = time.perf_counter() - start
+
+            bitmap, group_by = [], []
+            for _ in range(n_queries):
+                sectors = rng.sample(SECTORS, rng.randint(1, 2))
+                locations = rng.sample(LOCATIONS, rng.randint(0, 2))
+                filters = {'sector': set(sectors)}
+                if locations:
+                    filters['location'] = set(locations)
+
+                start = time.perf_counter()
+                index.counts(filters)
+                index.ids(index.select(filters))[:20]
+                bitmap.append(time.perf_counter() - start)
+
+                # The same disjunctive counts as one GROUP BY per filtered facet
+                start = time.perf_counter()
+                for facet, column in (('sector', 'sector'), ('location', 'location')):
+                    clauses, params = ["is_active"], {}
+                    for other, values in filters.items():
+                        if other != facet:
+                            names = [f"{other}{n}" for n in range(len(values))]
+                            clauses.append(f"{other} IN ({', '.join(':' + name for name in names)})")
+                            params.update(zip(names, values))
+                    connection.execute(text(f"SELECT {column}, count(*) FROM internships "
+                                            f"WHERE {' AND '.join(clauses)} GROUP BY {column}"), params).all()
+                group_by.append(time.perf_counter() - start)
+    return build_seconds, bitmap, group_by
+
+
+def logged_in_session(base_url, email, password, user_type):
+    """A requests session signed in through the login form"""
+    import requests
+
+    client = requests.Session()
+    response = client.post(f"{base_url}/login", data={
+        'email': email, 'password': password, 'user_type': user_type,
+    }, allow_redirects=False, timeout=60)
+    if response.status_code != 302 or f"/{user_type}/dashboard" not in response.headers.get("Location", ""):
+        raise RuntimeError(f"Could not log in as {email} ({response.status_code})")
+    return client
+
+
+def measure_seat_stress(email, password, application_ids, n_requests=2000, concurrency=32,
+                        workers=4, threads=4, seed=0, extra_env=None):
+    """Drive concurrent accept/reject requests for the given applications through gunicorn.
+
+    Every client thread signs in as the department once and then posts random
+    status changes, so many reviewers race for the same seats.
+    Returns (elapsed seconds, latencies, {HTTP status or None: count}).
+    """
+    import random
+    import threading
+    from collections import Counter
+    from concurrent.futures import ThreadPoolExecutor
+
+    import requests
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = start_gunicorn(port, workers, preload=True,
+                            extra_env=dict(extra_env or {}, GUNICORN_THREADS=str(threads)))
+    local = threading.local()
+
+    def review(i):
+        rng = random.Random(seed * 1000003 + i)
+        if not hasattr(local, 'client'):
+            local.client = logged_in_session(base_url, email, password, 'department')
+        application_id = rng.choice(application_ids)
+        status = rng.choice(('accepted', 'accepted', 'rejected', 'pending'))
+        start = time.perf_counter()
+        try:
+            code = local.client.post(f"{base_url}/application/{application_id}/update",
+                                     data={'status': status}, allow_redirects=False, timeout=60).status_code
+        except requests.RequestException:
+            code = None
+        return time.perf_counter() - start, code
+
+    try:
+        if not wait_for_port(port):
+            raise RuntimeError("gunicorn did not start listening in time")
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(review, range(n_requests)))
+        elapsed = time.perf_counter() - start
+    finally:
+        stop_process(server)
+    return elapsed, [latency for latency, _ in results], Counter(code for _, code in results)
+
+
+def measure_apply_throughput(emails, password, internship_ids, n_submissions=2000, concurrency=32,
+                             workers=4, threads=4, retry_rate=0.2, seed=0, extra_env=None):
+    """Drive application submissions through gunicorn, replaying some forms as a retry would.
+
+    Students sign in before the clock starts. Returns (elapsed seconds,
+    latencies, {outcome: count}) where the outcome is 'submitted' (redirect to
+    the applications page), 'refused' (back to the matches page) or 'error'.
+    """
+    import random
+    import uuid
+    from collections import Counter
+    from concurrent.futures import ThreadPoolExecutor
+
+    import requests
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = start_gunicorn(port, workers, preload=True,
+                            extra_env=dict(extra_env or {}, GUNICORN_THREADS=str(threads)))
+
+    def submit(client, internship_id, token):
+        start = time.perf_counter()
+        try:
+            response = client.post(f"{base_url}/student/apply/{internship_id}", data={
+                'cover_letter': 'Load test', 'submission_token': token,
+            }, allow_redirects=False, timeout=60)
+            location = response.headers.get("Location", "")
+            outcome = ('submitted' if "/student/applications" in location
+                       else 'refused' if response.status_code == 302 else 'error')
+        except requests.RequestException:
+            outcome = 'error'
+        return time.perf_counter() - start, outcome
+
+    def apply(i):
+        rng = random.Random(seed * 1000003 + i)
+        client = clients[i % len(clients)]
+        internship_id = rng.choice(internship_ids)
+        token = f"{uuid.UUID(int=rng.getrandbits(128)).hex}-{internship_id}"
+        results = [submit(client, internship_id, token)]
+        if rng.random() < retry_rate:
+            results.append(submit(client, internship_id, token))
+        return results
+
+    try:
+        if not wait_for_port(port):
+            raise RuntimeError("gunicorn did not start listening in time")
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            clients = list(pool.map(lambda email: logged_in_session(base_url, email, password, 'student'), emails))
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = [result for batch in pool.map(apply, range(n_submissions)) for result in batch]
+        elapsed = time.perf_counter() - start
+    finally:
+        stop_process(server)
+    return elapsed, [latency for latency, _ in results], Counter(outcome for _, outcome in results)
+
+
+def scratch_population(path, n_students, n_internships, seed=0):
+    """Fill a SQLite file with synthetic students and internships; returns seconds taken"""
+    import random
+
+    from sqlalchemy import create_engine
+
+    from extensions import db
+    from synthetic import internship_fields, student_fields
+
+    rng = random.Random(seed)
+    engine = create_engine(f"sqlite:///{path}")
+    try:
+        start = time.perf_counter()
+        db.metadata.create_all(engine)
+        with engine.begin() as connection:
+            for table, count, fields in (('internships', n_internships, lambda i: internship_fields(rng, i, 1)),
+                                         ('students', n_students, lambda i: student_fields(rng, i))):
+                batch = []
+                for index in range(count):
+                    batch.append(fields(index)[1])
+                    if len(batch) == 5000:
+                        connection.execute(db.metadata.tables[table].insert(), batch)
+                        batch = []
+                if batch:
+                    connection.execute(db.metadata.tables[table].insert(), batch)
+        return time.perf_counter() - start
+    finally:
+        engine.dispose()
+
+
+def measure_rematch_memory(n_students=1000000, n_internships=10, batch_size=1000, memory_limit_mb=512, seed=0,
+                           tile_budget_mb=64, top_k=0):
+    """Run a full rematch over a scratch population in a fresh interpreter.
+
+    Returns (build seconds, RSS in MB once the app is up, rematch stats including
+    peak RSS); raises RuntimeError if the run fails, e.g. on the memory ceiling.
+    """
+    import json
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as scratch:
+        path = os.path.join(scratch, "rematch.db")
+        build_seconds = scratch_population(path, n_students, n_internships, seed)
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{path}", FAST_BOOT="1",
+                   ENGINE_SNAPSHOT_DIR=os.path.join(scratch, "snapshots"))
+        result = subprocess.run(
+            [sys.executable, "-c", REMATCH_SNIPPET, str(batch_size), str(memory_limit_mb), str(tile_budget_mb),
+             str(top_k)],
+            cwd=PROJECT_DIR, env=env, capture_output=True, text=True,
+        )
+    if result.returncode != 0:
+        raise RuntimeError(f"Rematch failed:\n{result.stderr[-2000:]}")
+    outputs = {}
+    for line in result.stdout.splitlines():
+        name, _, payload = line.partition(' ')
+        if name in ('REMATCH_START', 'REMATCH'):
+            outputs[name] = json.loads(payload)
+    return build_seconds, outputs['REMATCH_START']['rss_mb'], outputs['REMATCH']
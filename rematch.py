@@ -0,0 +1,254 @@
+import logging
+import os
+import resource
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, literal, or_, select, update
+
+from extensions import db
+from generations import current_generation, garbage_collect, publish
+
+
+# Statuses of runs that have not finished; a resumed run picks up where they stopped
+UNFINISHED = ('running', 'failed')
+
+
+class MemoryCeilingExceeded(RuntimeError):
+    """The rematch process grew past its configured memory ceiling"""
+
+
+class RematchInProgress(RuntimeError):
+    """Another full rematch is running and checkpointed recently"""
+
+
+def rss_mb():
+    """Current resident set size of this process in MB"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except OSError:
+        return peak_rss_mb()
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kB on Linux, bytes on macOS
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 1024
+
+
+def student_batches(batch_size, after_id=0):
+    """Students in ID order, ``batch_size`` at a time, as scoring column bundles.
+
+    Each batch is its own keyset query (``id > last seen ORDER BY id LIMIT n``)
+    rather than one long cursor, so the caller can commit between batches on
+    any database, and nothing but the current batch is held.
+    """
+    from matching_engine import scoring_bundles
+    from models import Student
+
+    student, _ = scoring_bundles()
+    while True:
+        batch = [row.student for row in db.session.execute(
+            select(student).where(Student.id > after_id).order_by(Student.id).limit(batch_size))]
+        if not batch:
+            return
+        yield batch
+        after_id = batch[-1].id
+
+
+def open_internships(now=None):
+    """Active internships still taking applications and not full, as scoring column bundles"""
+    from matching_engine import scoring_bundles
+    from models import Internship
+
+    now = now or datetime.utcnow()
+    _, internship = scoring_bundles()
+    return [row.internship for row in db.session.execute(
+        select(internship).where(
+            Internship.is_active.is_(True),
+            or_(Internship.application_deadline.is_(None), Internship.application_deadline > now),
+            func.coalesce(Internship.filled_positions, 0) < Internship.total_positions,
+        ).order_by(Internship.id))]
+
+
+def _acted_on(first_id, last_id, generation):
+    """{(student ID, internship ID): (match ID, status)} of the published matches someone
+    acted on in a student ID range; the new generation keeps them"""
+    from models import Match
+
+    return {(student_id, internship_id): (match_id, status)
+            for match_id, student_id, internship_id, status in db.session.execute(
+                select(Match.id, Match.student_id, Match.internship_id, Match.status).where(
+                    Match.run_id == generation, Match.student_id.between(first_id, last_id),
+                    Match.status.notin_(('pending', 'expired'))))}
+
+
+def _copy_matches(match_ids, run_id):
+    """Copy matches into generation ``run_id`` as they are; returns rows copied"""
+    from models import Match
+
+    if not match_ids:
+        return 0
+    columns = ['student_id', 'internship_id', 'overall_score', 'skills_score', 'location_score', 'academic_score',
+               'sector_score', 'affirmative_action_score', 'status', 'created_at']
+    return db.session.execute(insert(Match).from_select(
+        columns + ['run_id'],
+        select(*(getattr(Match, column) for column in columns), literal(run_id)).where(Match.id.in_(match_ids)),
+    )).rowcount
+
+
+def claim_run(batch_size=1000, resume=True, stale_after=300):
+    """The MatchRun to work on: the latest unfinished run, or a new one.
+
+    A run still marked running whose checkpoint is younger than ``stale_after``
+    seconds belongs to a live process and raises RematchInProgress; an older
+    one is presumed dead. The heartbeat check and the claim are one conditional
+    UPDATE, so two processes cannot both take over the same run, and a new
+    run created at the same moment as another is deleted again. With
+    ``resume`` False an unfinished run is abandoned and a new one started from
+    the first student.
+    """
+    from models import MatchRun, Student
+
+    now = datetime.utcnow()
+    unfinished = MatchRun.status.in_(UNFINISHED)
+    latest = select(func.max(MatchRun.id)).where(unfinished).scalar_subquery()
+    claimable = (MatchRun.id == latest) & or_(
+        MatchRun.status == 'failed',
+        MatchRun.updated_at < now - timedelta(seconds=stale_after))
+    values = dict(status='running', attempts=MatchRun.attempts + 1, error=None, updated_at=now) if resume \
+        else dict(status='abandoned', finished_at=now)
+    claimed = db.session.execute(update(MatchRun).where(claimable).values(**values)
+                                 .returning(MatchRun.id)).scalar()
+    db.session.commit()
+    if claimed is not None and resume:
+        run = db.session.get(MatchRun, claimed)
+        db.session.refresh(run)
+        logging.info(f"Resuming match run {run.id} after student {run.last_student_id}")
+        return run
+
+    live = MatchRun.query.filter(unfinished).order_by(MatchRun.id.desc()).first()
+    if live is None:
+        run = MatchRun(status='running', batch_size=batch_size, total_students=Student.query.count(),
+                       started_at=now, updated_at=now)
+        db.session.add(run)
+        db.session.commit()
+        # Another process may have started a run at the same moment; the older one keeps the work
+        live = MatchRun.query.filter(unfinished, MatchRun.id < run.id).order_by(MatchRun.id.desc()).first()
+        if live is None:
+            return run
+        db.session.delete(run)
+        db.session.commit()
+    raise RematchInProgress(f"match run {live.id} is in progress "
+                            f"({live.students_done} of {live.total_students} students)")
+
+
+def rematch_all(engine, batch_size=1000, memory_limit_mb=0, run=None, resume=True, stale_after=300,
+                gc_grace=600, tile_budget_mb=64, top_k=0):
+    """Build a complete new match generation for every student, then publish it.
+
+    Students are read ``batch_size`` at a time with only the columns the scorer
+    needs (no ORM entities, so nothing accumulates in the session); the batch's
+    matches are inserted and committed before the next batch is read. The open
+    internships are loaded once. Published matches someone acted on are always
+    kept: with their status if rescored, else copied as they were. After each
+    batch the process RSS is checked against ``memory_limit_mb`` (0 disables the
+    check), raising MemoryCeilingExceeded rather than letting the worker be killed.
+
+    Each batch is scored in float32 tiles of at most ``tile_budget_mb`` (see
+    score_tiles.py), reduced as they are produced to the pairs above the match
+    threshold, and to each student's best ``top_k`` of those (0 keeps them all),
+    the same cap the retention job keeps the table at.
+    The RSS is sampled after every tile and its peak recorded on the run.
+
+    Rows are tagged with the run's ID, a generation readers ignore until it is
+    published in one transaction at the end (see generations.py), so nobody sees
+    a half-built match set. Generations superseded more than ``gc_grace``
+    seconds ago are deleted first.
+
+    Progress is checkpointed in a MatchRun (``run``, or one from claim_run) in
+    the same transaction as each batch's matches, so after a crash the next
+    run resumes right after the last committed batch. A failure marks the run
+    failed before re-raising.
+
+    Returns the run's progress().
+    """
+    from matching_engine import MATCH_THRESHOLD
+    from models import Match, MatchRun
+    from score_tiles import SurvivorReducer, TileScorer, survivor_rows
+
+    run = run or claim_run(batch_size, resume, stale_after)
+    try:
+        garbage_collect(gc_grace)
+        published = current_generation()
+        scorer = TileScorer(engine, open_internships(), tile_budget_mb)
+        peak = run.peak_rss_mb or 0.0
+
+        for students in student_batches(batch_size, after_id=run.last_student_id or 0):
+            start = time.perf_counter()
+            acted_on = _acted_on(students[0].id, students[-1].id, published)
+            batch = scorer.batch(students)
+            reducer = SurvivorReducer(len(batch), MATCH_THRESHOLD, top_k)
+            for rows, columns in scorer.tiles(batch):
+                reducer.add(rows, columns, scorer.score_tile(batch, rows, columns))
+                peak = max(peak, rss_mb())
+            new_rows = survivor_rows(scorer, batch, *reducer.pairs())
+            for row in new_rows:
+                row['run_id'] = run.id
+                _, row['status'] = acted_on.pop((row['student_id'], row['internship_id']), (None, 'pending'))
+            if new_rows:
+                db.session.execute(insert(Match), new_rows)
+            # Acted-on matches that were not rescored (ranked out, below threshold or closed)
+            copied = _copy_matches([match_id for match_id, _ in acted_on.values()], run.id)
+            db.session.execute(update(MatchRun).where(MatchRun.id == run.id).values(
+                last_student_id=students[-1].id,
+                students_done=MatchRun.students_done + len(students),
+                matches_created=MatchRun.matches_created + len(new_rows) + copied,
+                batches_done=MatchRun.batches_done + 1,
+                seconds=MatchRun.seconds + (time.perf_counter() - start),
+                peak_rss_mb=peak,
+                updated_at=datetime.utcnow(),
+            ))
+            db.session.commit()
+            del students, acted_on, batch, reducer, new_rows
+            current = rss_mb()
+            if memory_limit_mb and current > memory_limit_mb:
+                raise MemoryCeilingExceeded(f"rematch RSS {current:.0f} MB exceeds the {memory_limit_mb} MB "
+                                            f"ceiling; resume with a lower batch size")
+    except Exception as e:
+        db.session.rollback()
+        db.session.execute(update(MatchRun).where(MatchRun.id == run.id).values(
+            status='failed', error=f"{type(e).__name__}: {e}", updated_at=datetime.utcnow()))
+        db.session.commit()
+        raise
+
+    publish(run.id)
+    db.session.refresh(run)
+    logging.info(f"Match run {run.id}: {run.students_done} students in {run.batches_done} batches, "
+                 f"{run.matches_created} matches in {run.seconds:.1f}s, peak RSS {run.peak_rss_mb or 0:.0f} MB")
+    return run.progress()
+
+
+def start_background_rematch(app, engine, batch_size=1000, memory_limit_mb=0, stale_after=300, gc_grace=600,
+                             tile_budget_mb=64, top_k=0):
+    """Claim a run now (so the caller hears about a run in progress) and work it in a daemon thread"""
+    run = claim_run(batch_size, resume=True, stale_after=stale_after)
+
+    def work(run_id):
+        from models import MatchRun
+
+        with app.app_context():
+            try:
+                rematch_all(engine, batch_size, memory_limit_mb, run=db.session.get(MatchRun, run_id),
+                            gc_grace=gc_grace, tile_budget_mb=tile_budget_mb, top_k=top_k)
+            except Exception as e:
+                logging.error(f"Match run {run_id} failed: {e}")
+            finally:
+                db.session.remove()
+
+    threading.Thread(target=work, args=(run.id,), name=f"match-run-{run.id}", daemon=True).start()
+    return run
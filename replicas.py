@@ -0,0 +1,126 @@
+import logging
+import random
+import re
+import time
+from functools import wraps
+from urllib.parse import urlparse
+
+from flask import current_app, g, has_request_context, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.elements import TextClause
+
+# Bind keys of the replica engines are replica0, replica1, ...
+REPLICA_BIND_PREFIX = 'replica'
+
+# Flask session key: reads go to the primary until this Unix time
+READ_PRIMARY_UNTIL = '_read_primary_until'
+
+# Textual SQL that only reads; any other text() statement is routed as a write
+_TEXT_READ = re.compile(r"\s*\(*\s*select\b", re.IGNORECASE)
+
+
+def replica_binds(urls):
+    """{bind key: URL} for a comma-separated list of replica URLs"""
+    return {f"{REPLICA_BIND_PREFIX}{n}": url.strip()
+            for n, url in enumerate(filter(None, (url.strip() for url in (urls or "").split(','))))}
+
+
+def is_write(clause):
+    """True for statements that must run on the primary: INSERT/UPDATE/DELETE built with
+    the ORM or as text(), and SELECT ... FOR UPDATE"""
+    if isinstance(clause, UpdateBase):
+        return True
+    if isinstance(clause, TextClause):
+        return not _TEXT_READ.match(clause.text)
+    return getattr(clause, '_for_update_arg', None) is not None
+
+
+class RoutingSession(Session):
+    """Session that sends a read-only view's SELECTs to a replica engine.
+
+    Inside a view marked with @read_replica, statements go to the replica chosen
+    for the request (``g.replica_bind``). Flushes and writes (see is_write, which
+    covers textual DML too) always go to the primary, and so does everything
+    outside such views, in CLI commands and in background threads. Any write
+    through the primary is noted in ``g.wrote_primary``: the rest of the request
+    then stays on the primary, so it reads its own uncommitted writes, and the
+    user's next reads stay there until the replicas caught up.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is not None or not has_request_context():
+            return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if self._flushing or is_write(clause):
+            g.wrote_primary = True
+        elif not g.get('wrote_primary'):
+            replica = g.get('replica_bind')
+            if replica is not None:
+                return self._db.engines[replica]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _choose_replica():
+    binds = current_app.extensions.get('replica_binds') or ()
+    if not binds:
+        return None
+    # Read-your-writes: recent writers read from the primary until the replicas caught up
+    if session.get(READ_PRIMARY_UNTIL, 0) > time.time():
+        return None
+    return random.choice(binds)
+
+
+def read_replica(view):
+    """Let a view's queries run on a read replica (a no-op when none is configured)"""
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        g.replica_bind = _choose_replica()
+        try:
+            return view(*args, **kwargs)
+        finally:
+            g.replica_bind = None
+    return wrapped
+
+
+def _remember_writes(response):
+    if g.get('wrote_primary') and current_app.extensions.get('replica_binds'):
+        session[READ_PRIMARY_UNTIL] = time.time() + current_app.config["REPLICA_READ_YOUR_WRITES"]
+    return response
+
+
+def sqlite_path(url):
+    """Filesystem path of a sqlite:/// URL, or None for other databases"""
+    parsed = urlparse(url)
+    if parsed.scheme != 'sqlite' or not parsed.path or parsed.path == '/':
+        return None
+    return parsed.path[1:]
+
+
+def sync_sqlite_replica(primary_url, replica_url):
+    """Copy a SQLite primary into a SQLite replica with the online backup API.
+
+    Stands in for streaming replication when trying the read/write split
+    locally. Returns the seconds taken.
+    """
+    import sqlite3
+
+    primary_path, replica_path = sqlite_path(primary_url), sqlite_path(replica_url)
+    if primary_path is None or replica_path is None:
+        raise ValueError("both databases must be sqlite:/// files")
+    start = time.perf_counter()
+    source = sqlite3.connect(primary_path)
+    target = sqlite3.connect(replica_path)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+    return time.perf_counter() - start
+
+
+def init_app(app):
+    binds = sorted(key for key in app.config.get("SQLALCHEMY_BINDS", {}) if key.startswith(REPLICA_BIND_PREFIX))
+    app.extensions['replica_binds'] = binds
+    if binds:
+        logging.info(f"Read-only views use replicas: {', '.join(binds)}")
+        app.after_request(_remember_writes)
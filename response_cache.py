@@ -0,0 +1,219 @@
+import hashlib
+import json
+import logging
+import os
+import struct
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from functools import wraps
+
+from flask import Response, make_response, request, session
+
+
+class CachedPage:
+    """A rendered 200 response, reduced to what is needed to replay it"""
+
+    __slots__ = ('body', 'mimetype', 'etag', 'last_modified')
+
+    def __init__(self, body, mimetype, etag, last_modified):
+        self.body = body
+        self.mimetype = mimetype
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def to_bytes(self):
+        """File form: a 4-byte length, a JSON header, then the raw body"""
+        header = json.dumps({
+            'mimetype': self.mimetype,
+            'etag': self.etag,
+            'last_modified': self.last_modified.isoformat() if self.last_modified is not None else None,
+        }).encode('utf-8')
+        return struct.pack('>I', len(header)) + header + self.body
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Parse to_bytes output; nothing in it is executed, so files from a shared directory are safe"""
+        (length,) = struct.unpack_from('>I', data)
+        header = json.loads(data[4:4 + length].decode('utf-8'))
+        last_modified = header['last_modified']
+        return cls(data[4 + length:], header['mimetype'], header['etag'],
+                   datetime.fromisoformat(last_modified) if last_modified is not None else None)
+
+
+def _digest(value):
+    return hashlib.sha1(repr(value).encode('utf-8')).hexdigest()
+
+
+class PageCache:
+    """Bounded in-memory LRU of rendered pages, optionally backed by a directory.
+
+    Keys are (endpoint, view arguments, stamp). The stamp changes whenever the
+    content behind the page does, so stale entries are simply never asked for
+    again. That also keeps the filesystem tier, which is shared by every worker
+    pointing at the same directory, correct without cross-process invalidation.
+    ``invalidate`` only frees space early.
+    """
+
+    def __init__(self, max_entries=512, max_bytes=32 * 1024 * 1024, directory=None, max_files=5000):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.max_files = max_files
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._disk_writes = 0
+
+    def configure(self, max_entries=None, max_bytes=None, directory=None):
+        if max_entries is not None:
+            self.max_entries = max_entries
+        if max_bytes is not None:
+            self.max_bytes = max_bytes
+        self.directory = directory or None
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+        self.clear()
+
+    def _path(self, page, stamp):
+        # <page>-<stamp> so every version of one page can be found by prefix
+        return os.path.join(self.directory, f"{_digest(page)}-{_digest(stamp)}.page")
+
+    def get(self, page, stamp):
+        key = (page, stamp)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(page, stamp), 'rb') as f:
+                entry = CachedPage.from_bytes(f.read())
+        except (OSError, ValueError, KeyError, TypeError, struct.error):
+            return None
+        self._remember(key, entry)
+        return entry
+
+    def set(self, page, stamp, entry):
+        self._remember((page, stamp), entry)
+        if self.directory:
+            self._write(page, stamp, entry)
+
+    def _remember(self, key, entry):
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous.body)
+            self._entries[key] = entry
+            self._bytes += len(entry.body)
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.body)
+
+    def _write(self, page, stamp, entry):
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(entry.to_bytes())
+            os.replace(tmp_path, self._path(page, stamp))
+        except OSError as e:
+            logging.warning(f"Could not write page cache file: {e}")
+            return
+        self._disk_writes += 1
+        if self._disk_writes % 100 == 0:
+            self._prune_directory()
+
+    def _prune_directory(self):
+        """Keep at most max_files pages on disk, dropping the least recently written"""
+        try:
+            files = [entry for entry in os.scandir(self.directory) if entry.name.endswith('.page')]
+            if len(files) <= self.max_files:
+                return
+            files.sort(key=lambda entry: entry.stat().st_mtime)
+            for entry in files[:len(files) - self.max_files]:
+                os.unlink(entry.path)
+        except OSError:
+            pass
+
+    def invalidate(self, endpoint, **view_args):
+        """Forget every cached version of one page"""
+        page = (endpoint, tuple(sorted(view_args.items())))
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == page]:
+                self._bytes -= len(self._entries.pop(key).body)
+        if self.directory:
+            prefix = _digest(page) + '-'
+            try:
+                for entry in os.scandir(self.directory):
+                    if entry.name.startswith(prefix):
+                        os.unlink(entry.path)
+            except OSError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+page_cache = PageCache()
+
+
+def _anonymous_request():
+    """Only anonymous GETs without pending flash messages see the shared page"""
+    return (request.method in ('GET', 'HEAD')
+            and 'user_type' not in session
+            and '_flashes' not in session)
+
+
+def cached_page(stamp=None):
+    """Serve a view from the page cache, with ETag/Last-Modified and 304 support.
+
+    ``stamp(**view_args)`` returns (last_modified, version) for the content behind
+    the page, or None when there is no such content (the view then runs normally,
+    e.g. to 404). Views without a stamp are cached for the life of the process.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(*args, **kwargs):
+            if not page_cache.max_entries or not _anonymous_request():
+                return view(*args, **kwargs)
+
+            last_modified, version = None, None
+            if stamp is not None:
+                current = stamp(**kwargs)
+                if current is None:
+                    return view(*args, **kwargs)
+                last_modified, version = current
+
+            page = (request.endpoint, tuple(sorted(kwargs.items())))
+            entry = page_cache.get(page, version)
+            if entry is None:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200 or session.modified:
+                    return response
+                body = response.get_data()
+                entry = CachedPage(body, response.mimetype, hashlib.sha1(body).hexdigest(), last_modified)
+                page_cache.set(page, version, entry)
+
+            response = Response(entry.body, mimetype=entry.mimetype)
+            response.set_etag(entry.etag)
+            if entry.last_modified is not None:
+                response.last_modified = entry.last_modified
+            # Browsers may keep the page but must revalidate; logged-in users get another page
+            response.cache_control.no_cache = True
+            response.vary.add('Cookie')
+            return response.make_conditional(request)
+        return wrapped
+    return decorator
+
+
+def init_app(app):
+    page_cache.configure(
+        max_entries=app.config.get("RESPONSE_CACHE_ENTRIES", 512),
+        max_bytes=app.config.get("RESPONSE_CACHE_MAX_BYTES", 32 * 1024 * 1024),
+        directory=app.config.get("RESPONSE_CACHE_DIR"),
+    )
@@ -0,0 +1,95 @@
+import logging
+from datetime import datetime
+
+from sqlalchemy import and_, func, insert, literal, or_, select
+
+from extensions import db
+
+# Only matches nobody has acted on are archived; accepted or rejected ones stay hot
+ARCHIVABLE_STATUSES = ('pending', 'expired')
+
+# Archive reasons
+STALE = 'stale'  # internship inactive, past its deadline or full
+RANK = 'rank'    # outside the student's top K
+
+# Rows moved per INSERT ... SELECT / DELETE pair (well under SQLite's bound-parameter limit)
+ID_CHUNK = 5000
+
+
+def _stale_ids(lo, hi, now):
+    from generations import live_matches
+    from models import Internship, Match
+
+    return [match_id for (match_id,) in db.session.execute(
+        select(Match.id).join(Internship, Match.internship_id == Internship.id).where(
+            Match.student_id.between(lo, hi),
+            live_matches(),
+            Match.status.in_(ARCHIVABLE_STATUSES),
+            or_(Internship.is_active.is_(False),
+                and_(Internship.application_deadline.isnot(None), Internship.application_deadline <= now),
+                func.coalesce(Internship.filled_positions, 0) >= Internship.total_positions),
+        ))]
+
+
+def _beyond_top_k_ids(lo, hi, top_k):
+    from generations import live_matches
+    from models import Match
+
+    ranked = select(
+        Match.id, Match.status,
+        func.row_number().over(partition_by=Match.student_id,
+                               order_by=(Match.overall_score.desc(), Match.id)).label('position'),
+    ).where(Match.student_id.between(lo, hi), live_matches()).subquery()
+    return [match_id for (match_id,) in db.session.execute(
+        select(ranked.c.id).where(ranked.c.position > top_k, ranked.c.status.in_(ARCHIVABLE_STATUSES)))]
+
+
+def _move(match_ids, reason, now):
+    """Copy matches into the archive and delete them, in chunks; returns rows moved"""
+    from models import Match, MatchArchive
+
+    moved = 0
+    for start in range(0, len(match_ids), ID_CHUNK):
+        chunk = match_ids[start:start + ID_CHUNK]
+        db.session.execute(insert(MatchArchive).from_select(
+            ['student_id', 'internship_id', 'overall_score', 'status', 'created_at', 'archived_at', 'reason'],
+            select(Match.student_id, Match.internship_id, Match.overall_score, Match.status, Match.created_at,
+                   literal(now), literal(reason)).where(Match.id.in_(chunk)),
+        ))
+        moved += Match.query.filter(Match.id.in_(chunk)).delete(synchronize_session=False)
+    return moved
+
+
+def archive_matches(top_k=50, batch_size=1000, now=None):
+    """Move stale matches, and matches beyond each student's top K, to match_archive.
+
+    Students are processed in ID ranges of ``batch_size``, one transaction each,
+    so locks stay short and the job can be interrupted at any point. Within a
+    batch, stale matches go first and the top K is ranked among what is left.
+    ``top_k`` 0 only archives stale matches. Only the published match generation
+    is considered; a full rematch in progress is left alone. Archived pairs are
+    not barred from later matching: match generation applies the same top K
+    cap, so a ranked-out pair only returns if it now ranks in the top K.
+
+    Returns {reason: rows archived}.
+    """
+    from models import Student
+
+    now = now or datetime.utcnow()
+    archived = {STALE: 0, RANK: 0}
+    low, high = db.session.query(func.min(Student.id), func.max(Student.id)).one()
+    if low is None:
+        return archived
+    for lo in range(low, high + 1, batch_size):
+        hi = lo + batch_size - 1
+        try:
+            archived[STALE] += _move(_stale_ids(lo, hi, now), STALE, now)
+            if top_k:
+                archived[RANK] += _move(_beyond_top_k_ids(lo, hi, top_k), RANK, now)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+    logging.info(f"Archived {archived[STALE]} stale matches and {archived[RANK]} beyond the top {top_k}")
+    return archived
+
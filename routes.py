@@ -1,8 +1,20 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify, current_app, abort, Response, stream_with_context
 from extensions import db
-from models import Student, Department, Admin, Internship, Match, Application
+from models import Student, Department, Admin, Internship, Match, Application, MatchRun
 from matching_engine import InternshipMatchingEngine
-from oauth import create_google_flow, handle_google_login, get_google_user_info
+from oauth import create_google_flow, handle_google_login, get_google_user_info, fetch_google_token
+from auth import get_current_user, login_required, invalidate_user, csrf_protected, identity_stamp
+from passwords import PasswordCheckBusy
+from seats import APPLICATION_STATUSES, SeatsFull, StatusChanged, change_application_status
+from response_cache import cached_page, page_cache
+from replicas import read_replica
+from generations import live_matches
+import search
+import facets
+import submissions
+import exports
+import analytics
+import rematch
 from datetime import datetime
 import logging
 
@@ -10,26 +22,13 @@ bp = Blueprint('main', __name__)
 matching_engine = InternshipMatchingEngine()
 
 @bp.route('/')
+@cached_page()
 def index():
     """Home page with registration options or redirect to dashboard if already logged in"""
-    # Check if user is already logged in
+    # Check if user is already logged in (and still exists in the database)
     if session.get('user_type') and session.get('user_id'):
-        user_type = session.get('user_type')
-        user_id = session.get('user_id')
-        
-        # Verify the user still exists in the database
-        if user_type == 'student':
-            user = Student.query.get(user_id)
-            if user:
-                return redirect(url_for('main.student_dashboard'))
-        elif user_type == 'department':
-            user = Department.query.get(user_id)
-            if user:
-                return redirect(url_for('main.department_dashboard'))
-        elif user_type == 'admin':
-            user = Admin.query.get(user_id)
-            if user:
-                return redirect(url_for('main.admin_dashboard'))
+        if get_current_user() is not None:
+            return redirect(url_for(f"main.{session['user_type']}_dashboard"))
         
         # If user doesn't exist, clear the session
         session.clear()
@@ -37,15 +36,9 @@ def index():
     return render_template('index.html')
 
 @bp.route('/student/profile')
+@login_required('student', 'Access denied.')
 def profile():
-    if session.get('user_type') != 'student':
-        flash('Access denied.', 'danger')
-        return redirect(url_for('main.index'))
-
-    student = Student.query.get(session.get('user_id'))
-    if not student:
-        flash("Student not found.", "danger")
-        return redirect(url_for('main.index'))
+    student = get_current_user()
 
     completeness_score, missing_fields = student.calculate_profile_completeness()
     
@@ -57,16 +50,10 @@ def profile():
     )
 
 @bp.route('/complete_student_profile', methods=['GET', 'POST'])
+@login_required('student', 'Access denied.')
 def complete_student_profile():
     """Complete or edit student profile - works for both Google OAuth and regular users"""
-    if session.get('user_type') != 'student':
-        flash('Access denied.', 'danger')
-        return redirect(url_for('main.index'))
-
-    student = Student.query.get(session.get('user_id'))
-    if not student:
-        flash("Student not found.", "danger")
-        return redirect(url_for('main.index'))
+    student = get_current_user()
 
     if request.method == 'POST':
         try:
@@ -115,6 +102,7 @@ def complete_student_profile():
             student.pm_scheme_participant = bool(request.form.get('pm_scheme_participant'))
 
             db.session.commit()
+            invalidate_user('student', student.id)
             flash("Profile updated successfully!", "success")
             
             # If user came from Google OAuth and essential fields are now filled, go to dashboard
@@ -148,9 +136,20 @@ def login():
             flash('Invalid user type', 'error')
             return redirect(url_for('main.index'))
         
-        if user and user.check_password(password):
+        try:
+            authenticated = bool(user and user.check_password(password))
+        except PasswordCheckBusy:
+            flash('Too many sign-ins right now. Please try again in a moment.', 'warning')
+            return render_template('index.html'), 503, {'Retry-After': '2'}
+        
+        if authenticated:
+            if user in db.session.dirty:
+                # check_password upgraded an outdated hash
+                db.session.commit()
+                invalidate_user(user_type, user.id)
             session['user_type'] = user_type
             session['user_id'] = user.id
+            session['identity_stamp'] = identity_stamp(user)
             
             if user_type == 'student':
                 return redirect(url_for('main.student_dashboard'))
@@ -171,33 +170,25 @@ def logout():
     return redirect(url_for('main.index'))
 
 @bp.route('/student/dashboard')
+@read_replica
+@login_required('student')
 def student_dashboard():
     """Student dashboard"""
-    if session.get('user_type') != 'student':
-        return redirect(url_for('main.index'))
-    
-    student = Student.query.get(session['user_id'])
-    if not student:
-        return redirect(url_for('main.index'))
+    student = get_current_user()
     
     # Get recent matches
     matches = Match.query.filter_by(student_id=student.id)\
+                        .filter(live_matches(), Match.status != 'expired')\
                         .order_by(Match.overall_score.desc())\
                         .limit(10).all()
     
     return render_template('student_dashboard.html', student=student, matches=matches)
 
 @bp.route('/department/profile')
+@login_required('department', 'Access denied.')
 def department_profile():
     """Department profile view page"""
-    if session.get('user_type') != 'department':
-        flash('Access denied.', 'danger')
-        return redirect(url_for('main.index'))
-
-    department = Department.query.get(session.get('user_id'))
-    if not department:
-        flash("Department not found.", "danger")
-        return redirect(url_for('main.index'))
+    department = get_current_user()
 
     completeness_score, missing_fields = department.calculate_profile_completeness()
 
@@ -209,14 +200,11 @@ def department_profile():
     )
 
 @bp.route('/department/dashboard')
+@read_replica
+@login_required('department')
 def department_dashboard():
     """Department dashboard"""
-    if session.get('user_type') != 'department':
-        return redirect(url_for('main.index'))
-    
-    department = Department.query.get(session['user_id'])
-    if not department:
-        return redirect(url_for('main.index'))
+    department = get_current_user()
     
     # Get department's internships
     internships = Internship.query.filter_by(department_id=department.id).all()
@@ -224,11 +212,9 @@ def department_dashboard():
     return render_template('department_dashboard.html', department=department, internships=internships)
 
 @bp.route('/internship/create', methods=['GET', 'POST'])
+@login_required('department')
 def create_internship():
     """Create new internship"""
-    if session.get('user_type') != 'department':
-        return redirect(url_for('main.index'))
-    
     if request.method == 'POST':
         try:
             # Get form data
@@ -266,7 +252,7 @@ def create_internship():
             
             # Create new internship
             internship = Internship(
-                department_id=session['user_id'],
+                department_id=get_current_user().id,
                 title=title,
                 description=description,
                 sector=sector,
@@ -287,6 +273,8 @@ def create_internship():
             
             db.session.add(internship)
             db.session.commit()
+            matching_engine.index_internship(internship)
+            facets.facet_index.update(internship)
             
             flash('Internship created successfully!', 'success')
             return redirect(url_for('main.department_dashboard'))
@@ -299,14 +287,12 @@ def create_internship():
     return render_template('create_internship.html')
 
 @bp.route('/internship/edit/<int:internship_id>', methods=['GET', 'POST'])
+@login_required('department')
 def edit_internship(internship_id):
     """Edit existing internship"""
-    if session.get('user_type') != 'department':
-        return redirect(url_for('main.index'))
-    
     # Get the internship and verify ownership
     internship = Internship.query.get_or_404(internship_id)
-    if internship.department_id != session['user_id']:
+    if internship.department_id != get_current_user().id:
         flash('Access denied.', 'error')
         return redirect(url_for('main.department_dashboard'))
     
@@ -345,8 +331,11 @@ def edit_internship(internship_id):
                 return render_template('create_internship.html', internship=internship, is_editing=True)
             
             db.session.commit()
+            matching_engine.index_internship(internship)
+            facets.facet_index.update(internship)
+            page_cache.invalidate('main.view_internship', internship_id=internship.id)
             flash('Internship updated successfully!', 'success')
-            return redirect(url_for('view_internship', internship_id=internship.id))
+            return redirect(url_for('main.view_internship', internship_id=internship.id))
             
         except Exception as e:
             logging.error(f"Error updating internship: {e}")
@@ -356,14 +345,12 @@ def edit_internship(internship_id):
     return render_template('create_internship.html', internship=internship, is_editing=True)
 
 @bp.route('/internship/delete/<int:internship_id>', methods=['POST'])
+@login_required('department')
 def delete_internship(internship_id):
     """Delete internship"""
-    if session.get('user_type') != 'department':
-        return redirect(url_for('main.index'))
-    
     # Get the internship and verify ownership
     internship = Internship.query.get_or_404(internship_id)
-    if internship.department_id != session['user_id']:
+    if internship.department_id != get_current_user().id:
         flash('Access denied.', 'error')
         return redirect(url_for('main.department_dashboard'))
     
@@ -373,7 +360,7 @@ def delete_internship(internship_id):
         
         if applications_count > 0:
             flash(f'Cannot delete internship. It has {applications_count} applications.', 'error')
-            return redirect(url_for('edit_internship', internship_id=internship_id))
+            return redirect(url_for('main.edit_internship', internship_id=internship_id))
         
         # Delete related matches first
         Match.query.filter_by(internship_id=internship_id).delete()
@@ -381,6 +368,9 @@ def delete_internship(internship_id):
         # Delete the internship
         db.session.delete(internship)
         db.session.commit()
+        matching_engine.forget_internship(internship_id)
+        facets.facet_index.remove(internship_id)
+        page_cache.invalidate('main.view_internship', internship_id=internship_id)
         
         flash('Internship deleted successfully!', 'success')
         return redirect(url_for('main.department_dashboard'))
@@ -389,16 +379,14 @@ def delete_internship(internship_id):
         logging.error(f"Error deleting internship: {e}")
         flash('Failed to delete internship. Please try again.', 'error')
         db.session.rollback()
-        return redirect(url_for('edit_internship', internship_id=internship_id))
+        return redirect(url_for('main.edit_internship', internship_id=internship_id))
 
 @bp.route('/student/generate-matches')
+@login_required('student')
 def generate_matches():
     """Generate matches for current student"""
-    if session.get('user_type') != 'student':
-        return redirect(url_for('main.index'))
-    
     try:
-        student_id = session['user_id']
+        student_id = get_current_user().id
         matches = matching_engine.generate_matches_for_student(student_id)
         
         flash(f'Generated {len(matches)} new matches!', 'success')
@@ -410,53 +398,40 @@ def generate_matches():
         return redirect(url_for('main.student_dashboard'))
 
 @bp.route('/student/matches')
+@read_replica
+@login_required('student')
 def view_matches():
     """View all matches for current student"""
-    if session.get('user_type') != 'student':
-        return redirect(url_for('main.index'))
-    
-    student_id = session['user_id']
+    student_id = get_current_user().id
     matches = Match.query.filter_by(student_id=student_id)\
+                        .filter(live_matches(), Match.status != 'expired')\
                         .order_by(Match.overall_score.desc()).all()
     
-    return render_template('matches.html', matches=matches)
+    return render_template('matches.html', matches=matches, submission_token=submissions.new_submission_token())
 
 @bp.route('/student/apply/<int:internship_id>', methods=['POST'])
+@login_required('student')
 def apply_internship(internship_id):
     """Apply to an internship"""
-    if session.get('user_type') != 'student':
-        return redirect(url_for('main.index'))
-    
     try:
-        student_id = session['user_id']
-        
-        # Check if already applied
-        existing_application = Application.query.filter_by(
-            student_id=student_id, 
-            internship_id=internship_id
-        ).first()
+        # One conditional INSERT checks the internship and deadline and absorbs duplicates
+        outcome, _ = submissions.submit_application(
+            get_current_user().id,
+            internship_id,
+            cover_letter=request.form.get('cover_letter', ''),
+            portfolio_url=request.form.get('portfolio_url', ''),
+            additional_notes=request.form.get('additional_notes', ''),
+            submission_token=request.form.get('submission_token') or None,
+        )
         
-        if existing_application:
+        if outcome == submissions.CLOSED:
+            flash('This internship is no longer accepting applications', 'warning')
+            return redirect(url_for('main.view_matches'))
+        if outcome == submissions.DUPLICATE:
             flash('You have already applied to this internship', 'warning')
             return redirect(url_for('main.view_matches'))
         
-        # Get form data
-        cover_letter = request.form.get('cover_letter', '')
-        portfolio_url = request.form.get('portfolio_url', '')
-        additional_notes = request.form.get('additional_notes', '')
-        
-        # Create application
-        application = Application(
-            student_id=student_id,
-            internship_id=internship_id,
-            cover_letter=cover_letter,
-            portfolio_url=portfolio_url,
-            additional_notes=additional_notes
-        )
-        
-        db.session.add(application)
-        db.session.commit()
-        
+        # A resubmitted form (double click, retry after a timeout) lands here too
         flash('Application submitted successfully!', 'success')
         return redirect(url_for('main.view_applications'))
         
@@ -467,12 +442,11 @@ def apply_internship(internship_id):
         return redirect(url_for('main.view_matches'))
 
 @bp.route('/student/applications')
+@read_replica
+@login_required('student')
 def view_applications():
     """View all applications for current student"""
-    if session.get('user_type') != 'student':
-        return redirect(url_for('main.index'))
-    
-    student_id = session['user_id']
+    student_id = get_current_user().id
     applications = Application.query.filter_by(student_id=student_id)\
                                   .order_by(Application.applied_at.desc()).all()
     
@@ -537,7 +511,7 @@ def oauth_callback():
     
     try:
         # Get the authorization code and exchange for tokens
-        flow.fetch_token(authorization_response=request.url)
+        fetch_google_token(flow, request.url)
         
         # Get user info from Google
         credentials = flow.credentials
@@ -551,8 +525,10 @@ def oauth_callback():
         success, user_obj = handle_google_login(user_info, user_type)
         
         if success:
+            invalidate_user(user_type, user_obj.id)
             session['user_type'] = user_type
             session['user_id'] = user_obj.id
+            session['identity_stamp'] = identity_stamp(user_obj)
             session['google_auth'] = True  # mark as logged in via Google
         
             # Check if this is a new user or profile is incomplete
@@ -592,16 +568,10 @@ def oauth_callback():
         session.pop('oauth_user_type', None)
 
 @bp.route('/complete-department-profile', methods=['GET', 'POST'])
+@login_required('department', 'Access denied.')
 def complete_department_profile():
     """Complete or edit department profile"""
-    if session.get('user_type') != 'department':
-        flash('Access denied.', 'danger')
-        return redirect(url_for('main.index'))
-    
-    department = Department.query.get(session.get('user_id'))
-    if not department:
-        flash("Department not found.", "danger")
-        return redirect(url_for('main.index'))
+    department = get_current_user()
     
     if request.method == 'POST':
         try:
@@ -615,6 +585,9 @@ def complete_department_profile():
             department.contact_phone = request.form.get('contact_phone') or department.contact_phone
             
             db.session.commit()
+            invalidate_user('department', department.id)
+            invalidate_department_pages(department.id)
+            facets.facet_index.update_department(department)
             flash('Profile updated successfully!', 'success')
             return redirect(url_for('main.department_profile'))
             
@@ -627,42 +600,34 @@ def complete_department_profile():
 
 # Department Application Management Routes
 @bp.route('/department/applications')
+@login_required('department')
 def department_applications():
     """View all applications for department's internships"""
-    if session.get('user_type') != 'department':
-        return redirect(url_for('main.index'))
-    
-    department_id = session['user_id']
+    department_id = get_current_user().id
     
     # Get all applications for this department's internships
     applications = Application.query.join(Internship)\
                                   .filter(Internship.department_id == department_id)\
                                   .order_by(Application.applied_at.desc()).all()
     
-    # Calculate match percentages for each application
-    applications_with_match = []
-    for application in applications:
-        match_percentage = matching_engine.calculate_match_percentage(
-            application.student, 
-            application.internship
-        )
-        applications_with_match.append({
-            'application': application,
-            'match_percentage': match_percentage
-        })
+    # Calculate match percentages for all applications in one batch
+    scores = matching_engine.score_pairs([(application.student, application.internship)
+                                          for application in applications])
+    applications_with_match = [{
+        'application': application,
+        'match_percentage': round(score['overall'] * 100, 1)
+    } for application, score in zip(applications, scores)]
     
     return render_template('department_applications.html', 
                          applications_with_match=applications_with_match)
 
 @bp.route('/internship/<int:internship_id>/applications')
+@login_required('department')
 def internship_applications(internship_id):
     """View applications for a specific internship"""
-    if session.get('user_type') != 'department':
-        return redirect(url_for('main.index'))
-    
     # Get the internship and verify ownership
     internship = Internship.query.get_or_404(internship_id)
-    if internship.department_id != session['user_id']:
+    if internship.department_id != get_current_user().id:
         flash('Access denied.', 'error')
         return redirect(url_for('main.department_dashboard'))
     
@@ -670,33 +635,46 @@ def internship_applications(internship_id):
     applications = Application.query.filter_by(internship_id=internship_id)\
                                   .order_by(Application.applied_at.desc()).all()
     
-    # Calculate match percentages for each application
-    applications_with_match = []
-    for application in applications:
-        match_percentage = matching_engine.calculate_match_percentage(
-            application.student, 
-            internship
-        )
-        applications_with_match.append({
-            'application': application,
-            'match_percentage': match_percentage
-        })
+    # Calculate match percentages for all applications in one batch
+    scores = matching_engine.score_pairs([(application.student, internship) for application in applications])
+    applications_with_match = [{
+        'application': application,
+        'match_percentage': round(score['overall'] * 100, 1)
+    } for application, score in zip(applications, scores)]
     
     return render_template('internship_applications.html', 
                          internship=internship, 
                          applications_with_match=applications_with_match)
 
+@bp.route('/department/applications/export.<fmt>')
+@bp.route('/internship/<int:internship_id>/applications/export.<fmt>')
+@login_required('department')
+def export_applications(fmt, internship_id=None):
+    """Download a department's applications, or one internship's, as CSV or XLSX"""
+    if fmt not in exports.EXPORT_FORMATS:
+        abort(404)
+    department_id = get_current_user().id
+    if internship_id is not None:
+        internship = Internship.query.get_or_404(internship_id)
+        if internship.department_id != department_id:
+            flash('Access denied.', 'error')
+            return redirect(url_for('main.department_dashboard'))
+    
+    # Rows are fetched, scored and written a chunk at a time while the response streams
+    chunks = exports.application_rows(matching_engine, department_id, internship_id)
+    filename = f"applications-{internship_id or 'all'}-{datetime.utcnow():%Y%m%d}.{fmt}"
+    return Response(stream_with_context(exports.stream_export(fmt, chunks)),
+                    mimetype=exports.EXPORT_FORMATS[fmt],
+                    headers={'Content-Disposition': f'attachment; filename="{filename}"'})
+
 @bp.route('/department/student/<int:student_id>')
+@login_required('department', 'Access denied. Only departments can view student profiles.', 'error')
 def view_student_profile(student_id):
     """View a student's profile for application review"""
-    if session.get('user_type') != 'department':
-        flash('Access denied. Only departments can view student profiles.', 'error')
-        return redirect(url_for('main.index'))
-    
     student = Student.query.get_or_404(student_id)
     
     # Verify that the department has applications from this student for their internships
-    department_id = session['user_id']
+    department_id = get_current_user().id
     has_application = Application.query.join(Internship)\
                                      .filter(Internship.department_id == department_id,
                                             Application.student_id == student_id).first()
@@ -715,48 +693,25 @@ def view_student_profile(student_id):
                          from_department=True)
 
 @bp.route('/application/<int:application_id>/update', methods=['POST'])
+@login_required('department', 'Access denied. Only departments can manage applications.', 'error')
 def update_application_status(application_id):
     """Update application status and send message to student"""
-    if session.get('user_type') != 'department':
-        flash('Access denied. Only departments can manage applications.', 'error')
-        return redirect(url_for('main.index'))
-    
     application = Application.query.get_or_404(application_id)
     
     # Verify that this application belongs to the department's internship
-    if application.internship.department_id != session['user_id']:
+    if application.internship.department_id != get_current_user().id:
         flash('Access denied. You can only manage applications for your own internships.', 'error')
         return redirect(url_for('main.department_dashboard'))
     
+    internship_id = application.internship_id
     try:
         # Update application status
         new_status = request.form.get('status')
         department_notes = request.form.get('department_notes', '')
         
-        if new_status in ['pending', 'under_review', 'shortlisted', 'accepted', 'rejected']:
-            # Handle position tracking before changing status
-            old_status = application.status
-            internship = application.internship
-            
-            # Update position count based on status change
-            if old_status == 'accepted' and new_status != 'accepted':
-                # Moving away from accepted - decrement filled positions
-                if internship.filled_positions and internship.filled_positions > 0:
-                    internship.filled_positions -= 1
-            elif old_status != 'accepted' and new_status == 'accepted':
-                # Moving to accepted - increment filled positions (check capacity)
-                current_filled = internship.filled_positions or 0
-                if current_filled >= internship.total_positions:
-                    flash(f'Cannot accept more students. All {internship.total_positions} positions are filled.', 'error')
-                    return redirect(url_for('main.internship_applications', internship_id=internship.id))
-                internship.filled_positions = current_filled + 1
-            
-            # Update application details
-            application.status = new_status
-            application.department_notes = department_notes
-            application.response_date = datetime.utcnow()
-            
-            db.session.commit()
+        if new_status in APPLICATION_STATUSES:
+            # Status and seat count change together in conditional UPDATEs (see seats.py)
+            change_application_status(application, new_status, department_notes)
             
             status_msg = {
                 'pending': 'moved to pending',
@@ -770,24 +725,25 @@ def update_application_status(application_id):
         else:
             flash('Invalid status provided.', 'error')
             
+    except SeatsFull:
+        internship = Internship.query.get(internship_id)
+        flash(f'Cannot accept more students. All {internship.total_positions} positions are filled.', 'error')
+    except StatusChanged:
+        flash('This application was updated by someone else. Please review it again.', 'warning')
     except Exception as e:
         logging.error(f"Error updating application status: {e}")
         flash('Failed to update application status. Please try again.', 'error')
         db.session.rollback()
     
-    return redirect(url_for('main.internship_applications', internship_id=application.internship.id))
+    return redirect(url_for('main.internship_applications', internship_id=internship_id))
 
 # Admin Routes
 @bp.route('/admin/dashboard')
+@read_replica
+@login_required('admin', 'Access denied.')
 def admin_dashboard():
     """Admin dashboard"""
-    if session.get('user_type') != 'admin':
-        flash('Access denied.', 'danger')
-        return redirect(url_for('main.index'))
-    
-    admin = Admin.query.get(session['user_id'])
-    if not admin:
-        return redirect(url_for('main.index'))
+    admin = get_current_user()
     
     # Get statistics
     total_students = Student.query.count()
@@ -798,21 +754,26 @@ def admin_dashboard():
     # Get recent departments
     recent_departments = Department.query.order_by(Department.created_at.desc()).limit(5).all()
     
+    # Match quality, precomputed by `flask analytics refresh`
+    match_analytics = analytics.dashboard_summary()
+    
+    # Latest full rematch, with its checkpointed progress
+    match_run = MatchRun.query.order_by(MatchRun.id.desc()).first()
+    
     return render_template('admin_dashboard.html', 
                          admin=admin,
                          total_students=total_students,
                          total_departments=total_departments,
                          total_internships=total_internships,
                          total_applications=total_applications,
-                         recent_departments=recent_departments)
+                         recent_departments=recent_departments,
+                         analytics=match_analytics,
+                         match_run=match_run)
 
 @bp.route('/admin/departments', methods=['GET', 'POST'])
+@login_required('admin', 'Access denied.')
 def manage_departments():
     """Create and manage departments"""
-    if session.get('user_type') != 'admin':
-        flash('Access denied.', 'danger')
-        return redirect(url_for('main.index'))
-    
     if request.method == 'POST':
         try:
             # Create new department
@@ -842,7 +803,7 @@ def manage_departments():
                 description=description,
                 contact_person=contact_person,
                 contact_phone=contact_phone,
-                created_by=session['user_id']
+                created_by=get_current_user().id
             )
             department.set_password(password)
             
@@ -862,17 +823,16 @@ def manage_departments():
     return render_template('admin_departments.html', departments=departments)
 
 @bp.route('/admin/departments/<int:dept_id>/toggle', methods=['POST'])
+@login_required('admin', 'Access denied.')
 def toggle_department_status(dept_id):
     """Toggle department active status"""
-    if session.get('user_type') != 'admin':
-        flash('Access denied.', 'danger')
-        return redirect(url_for('main.index'))
-    
     department = Department.query.get_or_404(dept_id)
     department.is_active = not department.is_active
     
     try:
         db.session.commit()
+        invalidate_user('department', dept_id)
+        invalidate_department_pages(dept_id)
         status = "activated" if department.is_active else "deactivated"
         flash(f'Department "{department.name}" {status} successfully!', 'success')
     except Exception as e:
@@ -883,12 +843,9 @@ def toggle_department_status(dept_id):
     return redirect(url_for('main.manage_departments'))
 
 @bp.route('/admin/departments/<int:dept_id>/delete', methods=['POST'])
+@login_required('admin', 'Access denied.')
 def delete_department(dept_id):
     """Delete department"""
-    if session.get('user_type') != 'admin':
-        flash('Access denied.', 'danger')
-        return redirect(url_for('main.index'))
-    
     department = Department.query.get_or_404(dept_id)
     
     try:
@@ -900,6 +857,7 @@ def delete_department(dept_id):
         
         db.session.delete(department)
         db.session.commit()
+        invalidate_user('department', dept_id)
         flash(f'Department "{department.name}" deleted successfully!', 'success')
         
     except Exception as e:
@@ -909,24 +867,119 @@ def delete_department(dept_id):
     
     return redirect(url_for('main.manage_departments'))
 
-@bp.route('/generate-all-matches')
+@bp.route('/generate-all-matches', methods=['POST'])
+@login_required('admin', 'Access denied.')
+@csrf_protected
 def generate_all_matches():
-    """Admin function to generate matches for all students"""
-    if session.get('user_type') != 'admin':
-        flash('Access denied.', 'danger')
-        return redirect(url_for('main.index'))
-        
+    """Admin function to generate matches for all students, as a resumable background run"""
+    config = current_app.config
     try:
-        total_matches = matching_engine.generate_all_matches()
-        flash(f'Generated {total_matches} total matches!', 'success')
+        run = rematch.start_background_rematch(
+            current_app._get_current_object(), matching_engine,
+            batch_size=config["REMATCH_BATCH_SIZE"], memory_limit_mb=config["REMATCH_MEMORY_LIMIT_MB"],
+            stale_after=config["REMATCH_STALE_AFTER"], gc_grace=config["REMATCH_GC_GRACE"],
+            tile_budget_mb=config["REMATCH_TILE_BUDGET_MB"], top_k=config["MATCH_RETENTION_TOP_K"],
+        )
+        if run.attempts > 1:
+            flash(f'Resumed match run {run.id} after {run.students_done} students.', 'success')
+        else:
+            flash(f'Started match run {run.id} for {run.total_students} students.', 'success')
         
+    except rematch.RematchInProgress as e:
+        flash(f'{e}.', 'warning')
     except Exception as e:
         logging.error(f"Error generating all matches: {e}")
         flash('Failed to generate matches. Please try again.', 'error')
     
     return redirect(url_for('main.admin_dashboard'))
 
+@bp.route('/admin/match-runs/<int:run_id>/progress')
+@login_required('admin', 'Access denied.')
+def match_run_progress(run_id):
+    """Live progress of a full rematch, polled by the admin dashboard"""
+    return jsonify(MatchRun.query.get_or_404(run_id).progress())
+
+@bp.route('/internships/search')
+def search_internships():
+    """Browse internships by facets, with optional full-text search re-ranked by match score"""
+    query = request.args.get('q', '').strip()
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = 20
+    filters = facets.parse_filters(request.args)
+
+    student = get_current_user() if session.get('user_type') == 'student' else None
+    blend = current_app.config["SEARCH_BLEND_WEIGHT"] if student and request.args.get('blend') else 0.0
+
+    index = facets.facet_index.ensure_fresh()
+    base = None
+    hits = search.ranked_ids(db.session.connection(), query, limit=search.FILTER_WINDOW) if query else None
+    # Masks and IDs must come from the same slots, so no edit may land in between
+    with index.reading():
+        if query:
+            # Facet counts describe the text hits rather than the whole catalog
+            base = index.mask_of(internship_id for internship_id, _ in hits)
+        facet_counts = index.counts(filters, base)
+        if query:
+            within = set(index.ids(index.select(filters, base))) if filters else None
+        else:
+            selected_ids = index.ids(index.select(filters))
+
+    if query:
+        results, total = search.search_internships(query, page=page, per_page=per_page, student=student,
+                                                   blend=blend, engine=matching_engine, within=within)
+    else:
+        total = len(selected_ids)
+        page_ids = selected_ids[(page - 1) * per_page:page * per_page]
+        internships = {internship.id: internship
+                       for internship in Internship.query.filter(Internship.id.in_(page_ids))}
+        results = [{'internship': internships[internship_id], 'match_score': None}
+                   for internship_id in page_ids if internship_id in internships]
+
+    def toggle_url(facet, value):
+        """This page with one facet value switched on or off, back on page 1"""
+        args = request.args.to_dict(flat=False)
+        args.pop('page', None)
+        values = args.get(facet, [])
+        args[facet] = [v for v in values if v != value] if value in values else values + [value]
+        return url_for('main.search_internships', **args)
+
+    def page_url(number):
+        args = request.args.to_dict(flat=False)
+        args['page'] = [number]
+        return url_for('main.search_internships', **args)
+
+    return render_template('search.html',
+                         query=query,
+                         results=results,
+                         total=total,
+                         page=page,
+                         pages=(total + per_page - 1) // per_page,
+                         blend=bool(blend),
+                         can_blend=student is not None,
+                         facet_labels=facets.FACETS,
+                         facet_counts=facet_counts,
+                         filters=filters,
+                         toggle_url=toggle_url,
+                         page_url=page_url)
+
+def internship_page_stamp(internship_id):
+    """Last-modified time and version of everything an internship page shows"""
+    row = db.session.query(Internship.updated_at, Internship.created_at, Department.name, Department.is_active)\
+                    .join(Department, Internship.department_id == Department.id)\
+                    .filter(Internship.id == internship_id).first()
+    if row is None:
+        return None
+    last_modified = row.updated_at or row.created_at
+    return last_modified, (last_modified, row.name, row.is_active)
+
+def invalidate_department_pages(department_id):
+    """Drop cached pages of every internship a department has posted"""
+    for (internship_id,) in db.session.query(Internship.id).filter_by(department_id=department_id):
+        page_cache.invalidate('main.view_internship', internship_id=internship_id)
+
 @bp.route('/internship/<int:internship_id>')
+@read_replica
+@cached_page(stamp=internship_page_stamp)
 def view_internship(internship_id):
     """View internship details"""
     internship = Internship.query.get_or_404(internship_id)
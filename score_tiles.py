@@ -0,0 +1,264 @@
+import numpy as np
+
+from weights import COMPONENTS
+
+# Score planes of a tile: the overall score, then each component (the Match columns they fill)
+PLANES = ('overall',) + tuple(COMPONENTS)
+
+# Bytes one tile cell costs: a float32 per plane, the float32 sparse skills product and
+# the temporaries the academic and affirmative action planes are built from
+CELL_BYTES = 4 * (len(PLANES) + 4)
+
+# Narrowest internship tile, so a tiny budget still moves through the catalog in useful steps
+MIN_TILE_COLUMNS = 256
+
+# Internship quota columns a student's social category can claim (see calculate_affirmative_action_score)
+QUOTA_FIELDS = ('rural_quota', 'sc_quota', 'st_quota', 'obc_quota')
+
+# Distinct student values whose score rows a pair table keeps between batches
+TABLE_ROWS = 20000
+
+
+def tile_shape(rows, columns, budget_mb):
+    """(students, internships) per tile so one tile's score planes fit in ``budget_mb``"""
+    cells = max(1, int(budget_mb * 2**20) // CELL_BYTES)
+    if rows * columns <= cells:
+        return rows, columns
+    tile_columns = min(columns, max(MIN_TILE_COLUMNS, cells // max(rows, 1)))
+    return max(1, min(rows, cells // tile_columns)), tile_columns
+
+
+def _factorize(values):
+    """Integer codes into the list of distinct values, compared exactly as the scalar scorers see them"""
+    lookup = {}
+    codes = np.empty(len(values), dtype=np.intp)
+    for n, value in enumerate(values):
+        codes[n] = lookup.setdefault(value, len(lookup))
+    return codes, list(lookup)
+
+
+class _PairTable:
+    """A scalar scorer evaluated once per distinct (student value, internship value) pair.
+
+    Text rules like location and sector matching depend on a handful of
+    distinct values, so a tile is gathered from a small table instead of
+    calling the scorer for every cell. Rows of student values are kept between
+    batches (up to TABLE_ROWS of them).
+    """
+
+    def __init__(self, score, internship_values):
+        self.score = score
+        self.internship_codes, self.internship_values = _factorize(internship_values)
+        self.rows = {}
+
+    def lookup(self, student_values):
+        """(student codes, table) with table[code, internship code] the score"""
+        codes, distinct = _factorize(student_values)
+        table = np.empty((len(distinct), len(self.internship_values)), dtype=np.float32)
+        for n, value in enumerate(distinct):
+            row = self.rows.get(value)
+            if row is None:
+                row = np.array([self.score(value, internship_value) for internship_value in self.internship_values],
+                               dtype=np.float32)
+                if len(self.rows) < TABLE_ROWS:
+                    self.rows[value] = row
+            table[n] = row
+        return codes, table
+
+    def gather(self, codes, table, rows, columns):
+        return table[np.ix_(codes[rows], self.internship_codes[columns])]
+
+
+class _StudentBatch:
+    """Per-student score inputs of one batch, aligned with its rows"""
+
+    def __init__(self, scorer, students):
+        engine = scorer.engine
+        self.ids = np.array([student.id for student in students], dtype=np.int64)
+        self.texts = [(student.technical_skills or "") + " " + (student.soft_skills or "") for student in students]
+        self.vectors = engine.state.skills_vectors(self.texts).astype(np.float32)
+        self.location = scorer.location.lookup(
+            [(student.preferred_locations, student.current_location) for student in students])
+        self.sector = scorer.sector.lookup([student.sector_interests for student in students])
+        self.course = scorer.course.lookup([student.course for student in students])
+        self.year = scorer.year.lookup([student.year_of_study for student in students])
+
+        # CGPA part of the academic score, mirroring calculate_academic_score
+        self.has_cgpa = np.array([bool(student.cgpa) for student in students])
+        self.cgpa = np.array([student.cgpa or 0.0 for student in students], dtype=np.float32)
+        self.cgpa_default = np.minimum(self.cgpa / 10.0 * 0.4, 0.4)
+
+        # Affirmative action inputs, mirroring calculate_affirmative_action_score
+        self.quota = np.full(len(students), -1, dtype=np.intp)
+        for n, student in enumerate(students):
+            if student.social_category and student.social_category != 'General':
+                field = f"{student.social_category.lower()}_quota"
+                if field in QUOTA_FIELDS:
+                    self.quota[n] = QUOTA_FIELDS.index(field)
+        self.rural = np.array([(student.district_type or '').lower() in ('rural', 'aspirational')
+                               for student in students])
+        self.bonus = np.array([0.1 * (not student.pm_scheme_participant)
+                               + 0.1 * ((student.previous_internships or 0) <= 1) for student in students],
+                              dtype=np.float32)
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class TileScorer:
+    """Vectorized scores of student batches against a fixed internship catalog, one tile at a time.
+
+    A batch is never scored as a whole students x internships matrix: tiles are
+    sized by tile_shape so their float32 score planes stay within
+    ``budget_mb``, and each tile is handed to a reducer that keeps only the
+    pairs worth storing. Skills come from one float32 sparse product per tile
+    against the catalog's vectors in the fitted state (fitted first if there is
+    none, as score_pairs would score it); the text rules (location, sector, course, year)
+    are gathered from per-value tables of the engine's own scorers, and the
+    numeric rules are the engine's formulas over arrays, so scores agree with
+    match_rows to float32 precision.
+    """
+
+    def __init__(self, engine, internships, budget_mb=64):
+        engine.warm_up()
+        if engine.state is None:
+            # Every student is scored against the whole catalog, so fitting once pays off
+            engine.fit()
+        engine.refresh_weights()
+        self.engine = engine
+        self.weights = engine.weights
+        self.budget_mb = budget_mb
+        # Full internships never get matches (match_rows skips them too)
+        self.internships = [internship for internship in internships
+                            if (internship.filled_positions or 0) < internship.total_positions]
+        self.ids = np.array([internship.id for internship in self.internships], dtype=np.int64)
+
+        # Skills vectors in column order (internships posted or edited since the fit are projected)
+        self.catalog = engine.state.internship_vectors(self.internships).astype(np.float32).tocsr()
+
+        self.location = _PairTable(lambda student, location: engine.calculate_location_score(*student, location),
+                                   [internship.location for internship in self.internships])
+        self.sector = _PairTable(engine.calculate_sector_interest_score,
+                                 [internship.sector for internship in self.internships])
+        self.course = _PairTable(engine.calculate_course_score,
+                                 [internship.preferred_course for internship in self.internships])
+        self.year = _PairTable(engine.calculate_year_score,
+                               [internship.year_of_study_requirement for internship in self.internships])
+
+        self.has_min_cgpa = np.array([bool(internship.min_cgpa) for internship in self.internships])
+        self.min_cgpa = np.array([internship.min_cgpa or 1.0 for internship in self.internships], dtype=np.float32)
+        self.quotas = np.array([[(getattr(internship, field) or 0) > 0 for internship in self.internships]
+                                for field in QUOTA_FIELDS], dtype=bool).reshape(len(QUOTA_FIELDS), -1)
+
+    def __len__(self):
+        return len(self.internships)
+
+    def batch(self, students):
+        """Score inputs for a batch of students"""
+        return _StudentBatch(self, students)
+
+    def tiles(self, batch):
+        """(row slice, column slice) of every tile of a batch, internships innermost"""
+        rows, columns = tile_shape(len(batch), len(self), self.budget_mb)
+        for row in range(0, len(batch), rows):
+            for column in range(0, len(self), columns):
+                yield slice(row, min(row + rows, len(batch))), slice(column, min(column + columns, len(self)))
+
+    def score_tile(self, batch, rows, columns):
+        """Float32 scores of a tile, shaped (len(PLANES), rows, columns)"""
+        n_rows, n_columns = rows.stop - rows.start, columns.stop - columns.start
+        planes = np.zeros((len(PLANES), n_rows, n_columns), dtype=np.float32)
+        skills, academic, location, sector, affirmative = (planes[PLANES.index(name)] for name in COMPONENTS)
+
+        # All vectors are L2-normalised, so the products are cosines
+        skills[:] = np.minimum(batch.vectors[rows].dot(self.catalog[columns].T).toarray(), 1.0)
+
+        location[:] = self.location.gather(*batch.location, rows, columns)
+        sector[:] = self.sector.gather(*batch.sector, rows, columns)
+
+        cgpa = batch.cgpa[rows, None]
+        minimum = self.min_cgpa[None, columns]
+        academic[:] = np.where(batch.has_cgpa[rows, None],
+                               np.where(self.has_min_cgpa[None, columns],
+                                        np.where(cgpa >= minimum, np.minimum(cgpa / minimum * 0.4, 0.5), -0.3),
+                                        batch.cgpa_default[rows, None]),
+                               0.0)
+        academic += self.course.gather(*batch.course, rows, columns)
+        academic += self.year.gather(*batch.year, rows, columns)
+        np.clip(academic, 0.0, 1.0, out=academic)
+
+        quota = batch.quota[rows]
+        for n in range(len(QUOTA_FIELDS)):
+            claims = quota == n
+            if claims.any():
+                affirmative[claims] += np.float32(0.3) * self.quotas[n, columns]
+        rural = batch.rural[rows]
+        if rural.any():
+            affirmative[rural] += np.where(self.quotas[0, columns], np.float32(0.25), np.float32(0.15))
+        affirmative += batch.bonus[rows, None]
+        np.minimum(affirmative, 1.0, out=affirmative)
+
+        overall = planes[0]
+        for name, weight in self.weights.items():
+            overall += np.float32(weight) * planes[PLANES.index(name)]
+        return planes
+
+
+class SurvivorReducer:
+    """Streaming reduction of score tiles to the pairs worth storing.
+
+    A pair survives if its overall score reaches ``threshold``; with ``top_k``
+    only each student's best ``top_k`` survivors are kept, merged tile by tile
+    so no more than k candidates per student are ever held.
+    """
+
+    def __init__(self, n_rows, threshold, top_k=0):
+        self.threshold = np.float32(threshold)
+        self.top_k = top_k
+        if top_k:
+            self.columns = np.full((n_rows, top_k), -1, dtype=np.intp)
+            self.planes = np.full((len(PLANES), n_rows, top_k), -np.inf, dtype=np.float32)
+        else:
+            self.found = []
+
+    def add(self, rows, columns, planes):
+        keep = planes[0] >= self.threshold
+        if not self.top_k:
+            tile_rows, tile_columns = np.nonzero(keep)
+            self.found.append((tile_rows + rows.start, tile_columns + columns.start,
+                               planes[:, tile_rows, tile_columns]))
+            return
+        scores = np.where(keep, planes[0], -np.inf)
+        if scores.shape[1] > self.top_k:
+            best = np.argpartition(-scores, self.top_k - 1, axis=1)[:, :self.top_k]
+        else:
+            best = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+        candidates = np.take_along_axis(planes, best[None], axis=2)
+        candidates[0] = np.take_along_axis(scores, best, axis=1)
+        # Merge with the best so far and keep the top k of both
+        merged_columns = np.concatenate([self.columns[rows], best + columns.start], axis=1)
+        merged = np.concatenate([self.planes[:, rows], candidates], axis=2)
+        top = np.argpartition(-merged[0], self.top_k - 1, axis=1)[:, :self.top_k]
+        self.columns[rows] = np.take_along_axis(merged_columns, top, axis=1)
+        self.planes[:, rows] = np.take_along_axis(merged, top[None], axis=2)
+
+    def pairs(self):
+        """(rows, columns, planes) of the survivors; planes is shaped (len(PLANES), pairs)"""
+        if self.top_k:
+            found = np.isfinite(self.planes[0])
+            return np.nonzero(found)[0], self.columns[found], self.planes[:, found]
+        if not self.found:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp), np.empty((len(PLANES), 0), np.float32)
+        return (np.concatenate([rows for rows, _, _ in self.found]),
+                np.concatenate([columns for _, columns, _ in self.found]),
+                np.concatenate([planes for _, _, planes in self.found], axis=1))
+
+
+def survivor_rows(scorer, batch, rows, columns, planes):
+    """Match column values of a reducer's survivors"""
+    values = {name: planes[n].astype(np.float64).round(6).tolist() for n, name in enumerate(PLANES)}
+    student_ids = batch.ids[rows].tolist()
+    internship_ids = scorer.ids[columns].tolist()
+    return [dict({COMPONENTS.get(name, 'overall_score'): values[name][n] for name in PLANES},
+                 student_id=student_ids[n], internship_id=internship_ids[n])
+            for n in range(len(student_ids))]
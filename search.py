@@ -0,0 +1,192 @@
+import re
+
+from sqlalchemy import text
+
+from extensions import db
+
+# Columns covered by the full-text index, with their relative ranking weights
+SEARCH_COLUMNS = ('title', 'description', 'required_skills', 'sector')
+SQLITE_WEIGHTS = (10.0, 1.0, 5.0, 3.0)
+POSTGRES_WEIGHTS = ('A', 'D', 'B', 'C')
+
+# How many text hits are re-ranked when blending in the student's match score
+BLEND_WINDOW = 200
+
+# How many text hits are considered when results are narrowed by facet filters
+FILTER_WINDOW = 2000
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+SQLITE_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS internships_fts USING fts5("
+    "title, description, required_skills, sector, "
+    "content='internships', content_rowid='id', tokenize='porter unicode61')",
+    # External-content FTS table kept in sync by triggers; updates that do not touch
+    # the indexed columns (seat counts, status) leave the index alone
+    "CREATE TRIGGER IF NOT EXISTS internships_fts_ai AFTER INSERT ON internships BEGIN "
+    "INSERT INTO internships_fts(rowid, title, description, required_skills, sector) "
+    "VALUES (new.id, new.title, new.description, new.required_skills, new.sector); END",
+    "CREATE TRIGGER IF NOT EXISTS internships_fts_ad AFTER DELETE ON internships BEGIN "
+    "INSERT INTO internships_fts(internships_fts, rowid, title, description, required_skills, sector) "
+    "VALUES ('delete', old.id, old.title, old.description, old.required_skills, old.sector); END",
+    "CREATE TRIGGER IF NOT EXISTS internships_fts_au "
+    "AFTER UPDATE OF title, description, required_skills, sector ON internships BEGIN "
+    "INSERT INTO internships_fts(internships_fts, rowid, title, description, required_skills, sector) "
+    "VALUES ('delete', old.id, old.title, old.description, old.required_skills, old.sector); "
+    "INSERT INTO internships_fts(rowid, title, description, required_skills, sector) "
+    "VALUES (new.id, new.title, new.description, new.required_skills, new.sector); END",
+)
+
+POSTGRES_DDL = (
+    # A stored generated column is maintained by PostgreSQL itself on every write
+    "ALTER TABLE internships ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    + " || ".join(f"setweight(to_tsvector('english', coalesce({column}, '')), '{weight}')"
+                  for column, weight in zip(SEARCH_COLUMNS, POSTGRES_WEIGHTS))
+    + ") STORED",
+    "CREATE INDEX IF NOT EXISTS ix_internships_search_vector ON internships USING gin (search_vector)",
+)
+
+
+def search_terms(query):
+    """Lower-cased word tokens of a free-text query"""
+    return [token.lower() for token in _TOKEN.findall(query or "")]
+
+
+def ensure_search_index(connection):
+    """Create the full-text index for this database if it is missing.
+
+    Returns True when it was created (and filled from existing rows).
+    """
+    dialect = connection.dialect.name
+    if dialect == 'sqlite':
+        exists = connection.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'internships_fts'")).first()
+        for statement in SQLITE_DDL:
+            connection.execute(text(statement))
+        if not exists:
+            connection.execute(text("INSERT INTO internships_fts(internships_fts) VALUES ('rebuild')"))
+        return not exists
+    if dialect == 'postgresql':
+        exists = connection.execute(text(
+            "SELECT 1 FROM information_schema.columns "
+            "WHERE table_name = 'internships' AND column_name = 'search_vector'")).first()
+        for statement in POSTGRES_DDL:
+            connection.execute(text(statement))
+        return not exists
+    return False
+
+
+def _match_sql(dialect, terms):
+    """(FROM/WHERE fragment, rank expression, parameters) for the given terms"""
+    if dialect == 'sqlite':
+        # Every term must match, as a prefix, in any indexed column
+        match = " ".join('"%s"*' % term.replace('"', '') for term in terms)
+        weights = ", ".join(str(weight) for weight in SQLITE_WEIGHTS)
+        return ("internships_fts JOIN internships i ON i.id = internships_fts.rowid "
+                "WHERE internships_fts MATCH :match AND i.is_active",
+                f"-bm25(internships_fts, {weights})",
+                {'match': match})
+    if dialect == 'postgresql':
+        tsquery = " & ".join(f"{term}:*" for term in terms)
+        return ("internships i, to_tsquery('english', :tsquery) q "
+                "WHERE i.search_vector @@ q AND i.is_active",
+                "ts_rank_cd(i.search_vector, q)",
+                {'tsquery': tsquery})
+    # Other databases: unranked substring match on every term
+    clauses, params = [], {}
+    for n, term in enumerate(terms):
+        params[f'term{n}'] = f'%{term}%'
+        clauses.append("(" + " OR ".join(f"lower(coalesce(i.{column}, '')) LIKE :term{n}"
+                                          for column in SEARCH_COLUMNS) + ")")
+    return "internships i WHERE i.is_active AND " + " AND ".join(clauses), "0.0", params
+
+
+def ranked_ids(connection, query, limit=20, offset=0):
+    """[(internship_id, rank)] best text matches first; rank is higher-is-better"""
+    terms = search_terms(query)
+    if not terms:
+        return []
+    source, rank, params = _match_sql(connection.dialect.name, terms)
+    rows = connection.execute(
+        text(f"SELECT i.id, {rank} AS rank FROM {source} ORDER BY rank DESC, i.id LIMIT :limit OFFSET :offset"),
+        dict(params, limit=limit, offset=offset),
+    )
+    return [(row[0], float(row[1])) for row in rows]
+
+
+def count_matches(connection, query):
+    terms = search_terms(query)
+    if not terms:
+        return 0
+    source, _, params = _match_sql(connection.dialect.name, terms)
+    return connection.execute(text(f"SELECT count(*) FROM {source}"), params).scalar()
+
+
+def search_internships(query, page=1, per_page=20, student=None, blend=0.0, engine=None, within=None):
+    """Ranked, paginated internship search.
+
+    With a student and ``blend`` > 0, the best BLEND_WINDOW text hits are re-ranked
+    by (1 - blend) * normalised text rank + blend * match score. Stored Match rows
+    are used where they exist; ``engine`` scores the other hits in one batch.
+    ``within``, a set of internship IDs (e.g. from facet filters), restricts the
+    best FILTER_WINDOW hits to those IDs.
+
+    Returns (list of {'internship', 'rank', 'match_score', 'score'}, total hits).
+    """
+    from generations import live_matches
+    from models import Internship, Match
+
+    connection = db.session.connection()
+    total = count_matches(connection, query)
+    if not total:
+        return [], 0
+
+    blending = student is not None and blend > 0
+    windowed = blending or within is not None
+    if within is not None:
+        hits = [hit for hit in ranked_ids(connection, query, limit=FILTER_WINDOW) if hit[0] in within]
+        hits = hits[:BLEND_WINDOW] if blending else hits
+        total = len(hits)
+    elif blending:
+        hits = ranked_ids(connection, query, limit=BLEND_WINDOW)
+        total = min(total, BLEND_WINDOW)
+    else:
+        hits = ranked_ids(connection, query, limit=per_page, offset=(page - 1) * per_page)
+    if windowed:
+        if not blending:
+            hits = hits[(page - 1) * per_page:page * per_page]
+
+    internships = {internship.id: internship
+                   for internship in Internship.query.filter(Internship.id.in_([i for i, _ in hits]))}
+    match_scores = {}
+    if student is not None:
+        # Stored overall scores are 0-1; calculate_match_percentage is 0-100
+        match_scores = {internship_id: overall_score * 100
+                        for internship_id, overall_score in db.session.query(Match.internship_id, Match.overall_score)
+                        .filter(Match.student_id == student.id, Match.internship_id.in_(list(internships)),
+                                live_matches())}
+        if blending and engine is not None:
+            # Hits without a stored match are scored together in one batch
+            unscored = [internship for internship_id, internship in internships.items()
+                        if internship_id not in match_scores]
+            if unscored:
+                scores = engine.score_pairs([(student, internship) for internship in unscored])
+                match_scores.update((internship.id, round(scores[n]['overall'] * 100, 1))
+                                    for n, internship in enumerate(unscored))
+
+    top_rank = max((rank for _, rank in hits), default=0.0) or 1.0
+    results = []
+    for internship_id, rank in hits:
+        internship = internships.get(internship_id)
+        if internship is None:
+            continue
+        match_score = match_scores.get(internship_id)
+        score = rank / top_rank
+        if blending:
+            score = (1 - blend) * score + blend * (match_score or 0.0) / 100.0
+        results.append({'internship': internship, 'rank': rank, 'match_score': match_score, 'score': score})
+
+    if blending:
+        results.sort(key=lambda result: result['score'], reverse=True)
+        results = results[(page - 1) * per_page:page * per_page]
+    return results, total
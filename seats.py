@@ -0,0 +1,75 @@
+from datetime import datetime
+
+from sqlalchemy import func
+
+from extensions import db
+
+APPLICATION_STATUSES = ('pending', 'under_review', 'shortlisted', 'accepted', 'rejected')
+
+
+class SeatsFull(Exception):
+    """Every position of the internship is already filled"""
+
+
+class StatusChanged(Exception):
+    """The application's status was changed by someone else in the meantime"""
+
+
+def take_seat(internship_id, now=None):
+    """Fill one position if any is free, in a single conditional UPDATE.
+
+    The capacity check happens inside the statement, so concurrent reviewers can
+    never push filled_positions past total_positions. Returns True if a seat was taken.
+    """
+    from models import Internship
+
+    filled = func.coalesce(Internship.filled_positions, 0)
+    return Internship.query.filter(Internship.id == internship_id, filled < Internship.total_positions)\
+                           .update({Internship.filled_positions: filled + 1,
+                                    Internship.updated_at: now or datetime.utcnow()},
+                                   synchronize_session=False) == 1
+
+
+def release_seat(internship_id, now=None):
+    """Free one filled position, never going below zero. Returns True if one was freed."""
+    from models import Internship
+
+    return Internship.query.filter(Internship.id == internship_id, Internship.filled_positions > 0)\
+                           .update({Internship.filled_positions: Internship.filled_positions - 1,
+                                    Internship.updated_at: now or datetime.utcnow()},
+                                   synchronize_session=False) == 1
+
+
+def change_application_status(application, new_status, department_notes=None):
+    """Move an application to ``new_status`` and keep the seat count in step.
+
+    The status change is an UPDATE conditional on the status this request read,
+    so two reviewers racing on the same application cannot both accept it (or
+    both release its seat). Accepting then takes a seat with take_seat; leaving
+    'accepted' releases one. Both statements commit together. Nothing is changed
+    when SeatsFull or StatusChanged is raised.
+    """
+    from models import Application
+
+    if new_status not in APPLICATION_STATUSES:
+        raise ValueError(f"status must be one of {APPLICATION_STATUSES}")
+    old_status = application.status
+    now = datetime.utcnow()
+    try:
+        updated = Application.query.filter(Application.id == application.id, Application.status == old_status)\
+                                   .update({Application.status: new_status,
+                                            Application.department_notes: department_notes,
+                                            Application.response_date: now,
+                                            Application.updated_at: now},
+                                           synchronize_session=False)
+        if not updated:
+            raise StatusChanged()
+        if old_status != 'accepted' and new_status == 'accepted':
+            if not take_seat(application.internship_id, now):
+                raise SeatsFull()
+        elif old_status == 'accepted' and new_status != 'accepted':
+            release_seat(application.internship_id, now)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
@@ -0,0 +1,208 @@
+import importlib
+import logging
+import time
+import warnings
+from datetime import datetime
+
+from sqlalchemy import delete, func, insert, select
+
+from extensions import db
+
+# Component keys of score_pairs results -> ShadowScore columns
+SCORE_COLUMNS = {
+    'skills': 'skills_score',
+    'academic': 'academic_score',
+    'location': 'location_score',
+    'sector': 'sector_score',
+    'affirmative_action': 'affirmative_action_score',
+}
+
+# Absolute score deltas are histogrammed into bins of 0.001 for the 95th percentile
+DELTA_BINS = 1000
+
+
+def candidate_engine(factory=None, snapshot_version=None, skills_backend=None, weights=None):
+    """A separate engine to shadow production with; the production engine is left alone.
+
+    ``factory`` is an optional "module:attribute" naming an engine class or a
+    function returning one (default InternshipMatchingEngine). It is configured
+    like production from the app config, then with the candidate's overrides:
+    another snapshot version, skills backend or weights.
+    """
+    from flask import current_app
+
+    from matching_engine import InternshipMatchingEngine
+    from weights import resolve_weights, stored_weights
+
+    if factory:
+        module_name, _, attribute = factory.partition(':')
+        engine = getattr(importlib.import_module(module_name), attribute or 'InternshipMatchingEngine')()
+    else:
+        engine = InternshipMatchingEngine()
+    config = current_app.config
+    engine.configure(
+        snapshot_dir=config["ENGINE_SNAPSHOT_DIR"],
+        skills_backend=skills_backend or config["SKILLS_BACKEND"],
+        weights=weights or stored_weights() or resolve_weights(
+            config["MATCH_WEIGHT_PROFILE"], config["MATCH_WEIGHTS"], config["MATCH_WEIGHT_PROFILES"]),
+    )
+    if snapshot_version and not engine.load_snapshot(config["ENGINE_SNAPSHOT_DIR"], snapshot_version):
+        raise ValueError(f"could not load engine snapshot {snapshot_version}")
+    engine.warm_up()
+    return engine
+
+
+class _Comparison:
+    """Per-student rank agreement and score deltas, accumulated batch by batch"""
+
+    def __init__(self, top_k):
+        import numpy as np
+
+        self.top_k = top_k
+        self.students = 0
+        self.pairs = 0
+        self.correlations = []
+        self.overlaps = []
+        self.delta_sum = 0.0
+        self.abs_delta_sum = 0.0
+        self.max_abs_delta = 0.0
+        self.abs_deltas = np.zeros(DELTA_BINS, dtype=np.int64)
+
+    def add_student(self, production, shadow):
+        import numpy as np
+        from scipy.stats import spearmanr
+
+        production = np.asarray(production, dtype=np.float64)
+        shadow = np.asarray(shadow, dtype=np.float64)
+        self.students += 1
+        self.pairs += len(production)
+        deltas = shadow - production
+        self.delta_sum += float(deltas.sum())
+        abs_deltas = np.abs(deltas)
+        self.abs_delta_sum += float(abs_deltas.sum())
+        self.max_abs_delta = max(self.max_abs_delta, float(abs_deltas.max()))
+        self.abs_deltas += np.bincount(np.minimum((abs_deltas * DELTA_BINS).astype(np.int64), DELTA_BINS - 1),
+                                       minlength=DELTA_BINS)
+        if len(production) > 1:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                correlation = spearmanr(production, shadow).statistic
+            # Undefined when either side ranks every match the same
+            if not np.isnan(correlation):
+                self.correlations.append(float(correlation))
+        k = min(self.top_k, len(production))
+        # Stable sorts so tied scores rank by internship ID on both sides
+        top_production = set(np.argsort(-production, kind='stable')[:k].tolist())
+        top_shadow = set(np.argsort(-shadow, kind='stable')[:k].tolist())
+        self.overlaps.append(len(top_production & top_shadow) / k)
+
+    def results(self):
+        import numpy as np
+
+        p95 = None
+        if self.pairs:
+            position = int(np.searchsorted(np.cumsum(self.abs_deltas), 0.95 * self.pairs, side='left'))
+            # Upper edge of the bin, but never above the largest delta seen
+            p95 = min((min(position, DELTA_BINS - 1) + 1) / DELTA_BINS, self.max_abs_delta)
+        return {
+            'students': self.students,
+            'pairs': self.pairs,
+            'top_k': self.top_k,
+            'rank_correlation': float(np.mean(self.correlations)) if self.correlations else None,
+            'top_k_overlap': float(np.mean(self.overlaps)) if self.overlaps else None,
+            'mean_delta': self.delta_sum / self.pairs if self.pairs else None,
+            'mean_abs_delta': self.abs_delta_sum / self.pairs if self.pairs else None,
+            'p95_abs_delta': p95,
+            'max_abs_delta': self.max_abs_delta if self.pairs else None,
+        }
+
+
+def _production_batch(lo, hi):
+    from generations import live_matches
+    from matching_engine import scoring_bundles
+    from models import Internship, Match, Student
+
+    student, internship = scoring_bundles()
+    return db.session.execute(
+        select(Match.student_id, Match.internship_id, Match.overall_score, student, internship)
+        .join(Student, Match.student_id == Student.id)
+        .join(Internship, Match.internship_id == Internship.id)
+        .where(Match.student_id.between(lo, hi), live_matches(), Match.status != 'expired')
+        .order_by(Match.student_id, Match.internship_id)
+    ).all()
+
+
+def run_shadow(engine, label, top_k=10, batch_size=500, pause=0.0, keep=3):
+    """Rescore every live match with a candidate engine into shadow_scores and compare.
+
+    Production matches are read, never written. Students are taken in ID ranges
+    of ``batch_size``; each range is scored with one batched score_pairs call and
+    written in its own short transaction, sleeping ``pause`` seconds in between
+    to leave room for live traffic. Scores of all but the ``keep`` latest runs
+    are deleted afterwards. Returns the finished ShadowRun.
+    """
+    from models import ShadowRun, ShadowScore, Student
+
+    run = ShadowRun(label=label, top_k=top_k)
+    db.session.add(run)
+    db.session.commit()
+    comparison = _Comparison(top_k)
+    start = time.perf_counter()
+    try:
+        low, high = db.session.query(func.min(Student.id), func.max(Student.id)).one()
+        for lo in range(low or 0, (high or -1) + 1, batch_size):
+            rows = _production_batch(lo, lo + batch_size - 1)
+            if not rows:
+                continue
+            scores = engine.score_pairs([(row.student, row.internship) for row in rows])
+            db.session.execute(insert(ShadowScore), [
+                dict({column: score[name] for name, column in SCORE_COLUMNS.items()},
+                     run_id=run.id, student_id=row.student_id, internship_id=row.internship_id,
+                     production_score=row.overall_score, overall_score=score['overall'])
+                for row, score in zip(rows, scores)
+            ])
+            db.session.commit()
+            # Rows are ordered by student, so each student's matches are one contiguous slice
+            first = 0
+            for n in range(1, len(rows) + 1):
+                if n == len(rows) or rows[n].student_id != rows[first].student_id:
+                    comparison.add_student([row.overall_score for row in rows[first:n]],
+                                           [score['overall'] for score in scores[first:n]])
+                    first = n
+            if pause:
+                time.sleep(pause)
+    except Exception:
+        db.session.rollback()
+        run.status = 'failed'
+        run.finished_at = datetime.utcnow()
+        db.session.commit()
+        raise
+
+    for name, value in comparison.results().items():
+        setattr(run, name, value)
+    run.status = 'completed'
+    run.finished_at = datetime.utcnow()
+    db.session.commit()
+    prune_shadow_scores(keep)
+    logging.info(f"Shadow run {run.id} ({label}) scored {run.pairs} matches "
+                 f"in {time.perf_counter() - start:.1f}s")
+    return run
+
+
+def prune_shadow_scores(keep=3):
+    """Delete the scores of all but the ``keep`` most recent shadow runs (their summaries stay)"""
+    from models import ShadowRun, ShadowScore
+
+    kept = [run_id for (run_id,) in db.session.query(ShadowRun.id).order_by(ShadowRun.id.desc()).limit(keep)]
+    deleted = db.session.execute(delete(ShadowScore).where(ShadowScore.run_id.notin_(kept))).rowcount
+    db.session.commit()
+    return deleted
+
+
+def largest_deltas(run_id, limit=10):
+    """The run's matches whose shadow score moved furthest from production"""
+    from models import ShadowScore
+
+    return ShadowScore.query.filter_by(run_id=run_id)\
+        .order_by(func.abs(ShadowScore.overall_score - ShadowScore.production_score).desc())\
+        .limit(limit).all()
@@ -0,0 +1,61 @@
+# Skills backends: "tfidf" fits a vocabulary (per pair, or once per catalog in the
+# engine state); "hashing" has no fitted state, so any process can vectorize a
+# student or internship on its own and get identical vectors
+SKILLS_BACKENDS = ('tfidf', 'hashing')
+
+# 2**18 columns keeps collisions negligible for skill lists while staying small as CSR
+HASHING_FEATURES = 2 ** 18
+
+
+def preprocess_skills(skills_text):
+    """Convert comma-separated skills to clean text"""
+    if not skills_text:
+        return ""
+    return " ".join([skill.strip().lower() for skill in skills_text.split(",")])
+
+
+def hashing_preprocess(skills_text):
+    """Like preprocess_skills, plus the initials of every multi-word skill.
+
+    "Machine Learning" also emits "ml", so it meets a student who wrote "ML".
+    """
+    if not skills_text:
+        return ""
+    tokens = []
+    for skill in skills_text.split(","):
+        skill = skill.strip().lower()
+        if not skill:
+            continue
+        tokens.append(skill)
+        words = skill.replace("-", " ").split()
+        if len(words) > 1:
+            tokens.append("".join(word[0] for word in words if word[0].isalnum()))
+    return " ".join(tokens)
+
+
+_hashing_vectorizer = None
+
+
+def hashing_vectorizer():
+    """Word (1-2)-gram and character (3-4)-gram hashing features, concatenated"""
+    global _hashing_vectorizer
+    if _hashing_vectorizer is None:
+        from sklearn.feature_extraction.text import HashingVectorizer
+        from sklearn.pipeline import FeatureUnion
+
+        # Character n-grams within word boundaries catch spelling variants such as
+        # "postgres"/"postgresql" or "javascript"/"java script"
+        _hashing_vectorizer = FeatureUnion([
+            ('word', HashingVectorizer(analyzer='word', ngram_range=(1, 2), stop_words='english',
+                                       n_features=HASHING_FEATURES, alternate_sign=False, norm='l2')),
+            ('char', HashingVectorizer(analyzer='char_wb', ngram_range=(3, 4),
+                                       n_features=HASHING_FEATURES, alternate_sign=False, norm='l2')),
+        ])
+    return _hashing_vectorizer
+
+
+def hashing_vectors(texts):
+    """L2-normalised hashing vectors for already preprocessed texts"""
+    from sklearn.preprocessing import normalize
+
+    return normalize(hashing_vectorizer().transform(texts)).tocsr()
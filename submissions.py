@@ -0,0 +1,85 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import insert, literal, or_, select
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+
+# Outcomes of submit_application
+CREATED = 'created'
+RESUBMITTED = 'resubmitted'  # a retry of a submission that already went through
+DUPLICATE = 'duplicate'      # an earlier, different submission to the same internship
+CLOSED = 'closed'            # unknown, inactive or past its deadline
+
+
+def new_submission_token():
+    """Token rendered into an application form; the same form posted twice carries the same token"""
+    return uuid.uuid4().hex
+
+
+def _insert_statement(dialect):
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        return None
+    from models import Application
+
+    return dialect_insert(Application.__table__)
+
+
+def submit_application(student_id, internship_id, cover_letter='', portfolio_url='', additional_notes='',
+                       submission_token=None, now=None):
+    """Create an application in one round trip, safe to repeat.
+
+    A single INSERT ... SELECT FROM internships ... ON CONFLICT DO NOTHING
+    RETURNING id. The SELECT only yields a row while the internship is active and
+    before its deadline, and the conflict clause absorbs both a second
+    application to the same internship and a replayed submission token. Only
+    when nothing was inserted does a second query tell those cases apart.
+
+    Returns (outcome, application ID or None).
+    """
+    from models import Application, Internship
+
+    now = now or datetime.utcnow()
+    open_internship = select(
+        literal(student_id), Internship.id, literal(cover_letter), literal(portfolio_url),
+        literal(additional_notes), literal('pending'), literal(now), literal(now), literal(submission_token),
+    ).where(
+        Internship.id == internship_id,
+        Internship.is_active.is_(True),
+        or_(Internship.application_deadline.is_(None), Internship.application_deadline > now),
+    )
+    columns = ['student_id', 'internship_id', 'cover_letter', 'portfolio_url', 'additional_notes',
+               'status', 'applied_at', 'updated_at', 'submission_token']
+
+    statement = _insert_statement(db.session.get_bind().dialect.name)
+    try:
+        if statement is not None:
+            statement = statement.from_select(columns, open_internship)\
+                                 .on_conflict_do_nothing()\
+                                 .returning(Application.id)
+            application_id = db.session.execute(statement).scalar()
+        else:
+            # Other databases: plain INSERT ... SELECT, with the unique constraints as the guard
+            result = db.session.execute(insert(Application.__table__).from_select(columns, open_internship))
+            application_id = db.session.query(Application.id).filter_by(
+                student_id=student_id, internship_id=internship_id).scalar() if result.rowcount else None
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        application_id = None
+
+    if application_id is not None:
+        return CREATED, application_id
+
+    existing = db.session.query(Application.id, Application.submission_token)\
+                         .filter_by(student_id=student_id, internship_id=internship_id).first()
+    if existing is None:
+        return CLOSED, None
+    if submission_token is not None and existing.submission_token == submission_token:
+        return RESUBMITTED, existing.id
+    return DUPLICATE, existing.id
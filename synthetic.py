@@ -0,0 +1,171 @@
+import random
+
+from models import Admin, Application, Department, Student, Internship
+
+# Canonical skill -> surface forms people actually type for it
+SKILL_VARIANTS = {
+    'machine learning': ['Machine Learning', 'ML', 'machine-learning'],
+    'deep learning': ['Deep Learning', 'DL', 'deep-learning'],
+    'natural language processing': ['Natural Language Processing', 'NLP'],
+    'python': ['Python', 'python3', 'Python Programming'],
+    'javascript': ['JavaScript', 'Javascript', 'JS', 'Java Script'],
+    'sql': ['SQL', 'MySQL', 'SQL Queries'],
+    'postgresql': ['PostgreSQL', 'Postgres', 'postgresql'],
+    'data analysis': ['Data Analysis', 'Data Analytics', 'data analyst'],
+    'cloud computing': ['Cloud Computing', 'AWS Cloud', 'cloud'],
+    'java': ['Java', 'Core Java', 'Java SE'],
+    'spring boot': ['Spring Boot', 'SpringBoot', 'Spring'],
+    'geographic information systems': ['GIS', 'Geographic Information Systems', 'GIS Mapping'],
+    'policy research': ['Policy Research', 'Public Policy Research', 'policy analysis'],
+    'economics': ['Economics', 'Economic Analysis', 'econ'],
+    'research writing': ['Research Writing', 'Report Writing', 'technical writing'],
+    'communication': ['Communication', 'Communication Skills', 'comms'],
+    'project management': ['Project Management', 'PM', 'project-management'],
+    'renewable energy': ['Renewable Energy', 'Solar Energy', 'renewables'],
+    'internet of things': ['Internet of Things', 'IoT', 'IOT'],
+    'excel': ['Excel', 'MS Excel', 'Microsoft Excel'],
+    'cybersecurity': ['Cybersecurity', 'Cyber Security', 'InfoSec'],
+    'ui design': ['UI Design', 'User Interface Design', 'UI/UX'],
+}
+
+SOFT_SKILLS = ['Teamwork', 'Leadership', 'Problem Solving', 'Time Management', 'Writing']
+SECTORS = ['Technology', 'Policy', 'Healthcare', 'Energy', 'Environment', 'Transport', 'Finance', 'Education']
+LOCATIONS = ['New Delhi', 'Mumbai', 'Bengaluru', 'Chennai', 'Pune', 'Lucknow', 'Jaipur', 'Kolkata',
+             'Hyderabad', 'Remote']
+COURSES = ['Computer Science', 'Economics', 'Public Policy', 'Electrical Engineering',
+           'Environmental Science', 'Data Science', 'Civil Engineering', 'Business Administration']
+YEAR_REQUIREMENTS = ['Any', '2nd Year', '3rd Year', 'Final Year']
+SOCIAL_CATEGORIES = ['General', 'OBC', 'SC', 'ST']
+DISTRICT_TYPES = ['Urban', 'Rural', 'Aspirational']
+
+# Password given to every synthetic account created by populate_students
+SYNTHETIC_PASSWORD = 'Synthetic@123'
+
+
+def random_skills(rng, count, variant_rate=0.5):
+    """Pick canonical skills and render them, sometimes using a variant spelling.
+
+    Returns (set of canonical skills, comma-separated surface text).
+    """
+    canonical = rng.sample(sorted(SKILL_VARIANTS), count)
+    surface = [rng.choice(SKILL_VARIANTS[skill]) if rng.random() < variant_rate else SKILL_VARIANTS[skill][0]
+               for skill in canonical]
+    return set(canonical), ", ".join(surface)
+
+
+def student_fields(rng, index, variant_rate=0.5):
+    """Column values for one synthetic student, plus its canonical skills"""
+    canonical, technical_skills = random_skills(rng, rng.randint(2, 5), variant_rate)
+    return canonical, {
+        'email': f'student{index}@synthetic.test',
+        'name': f'Synthetic Student {index}',
+        'institution': 'Synthetic Institute of Technology',
+        'course': rng.choice(COURSES),
+        'year_of_study': rng.randint(1, 4),
+        'cgpa': round(rng.uniform(5.5, 9.8), 2),
+        'technical_skills': technical_skills,
+        'soft_skills': ", ".join(rng.sample(SOFT_SKILLS, 2)),
+        'sector_interests': ", ".join(rng.sample(SECTORS, 2)),
+        'preferred_locations': ", ".join(rng.sample(LOCATIONS, 2)),
+        'current_location': rng.choice(LOCATIONS),
+        'social_category': rng.choice(SOCIAL_CATEGORIES),
+        'district_type': rng.choice(DISTRICT_TYPES),
+        'previous_internships': rng.randint(0, 3),
+        'pm_scheme_participant': rng.random() < 0.2,
+    }
+
+
+def internship_fields(rng, index, department_id, variant_rate=0.5):
+    """Column values for one synthetic internship, plus its canonical skills"""
+    canonical, required_skills = random_skills(rng, rng.randint(2, 4), variant_rate)
+    return canonical, {
+        'department_id': department_id,
+        'title': f'Synthetic Internship {index}',
+        'description': f'Synthetic internship {index} requiring {required_skills}.',
+        'sector': rng.choice(SECTORS),
+        'location': rng.choice(LOCATIONS),
+        'required_skills': required_skills,
+        'preferred_course': rng.choice(COURSES),
+        'min_cgpa': round(rng.uniform(5.0, 8.5), 1),
+        'year_of_study_requirement': rng.choice(YEAR_REQUIREMENTS),
+        'total_positions': rng.randint(1, 10),
+        'filled_positions': 0,
+        'duration_months': rng.randint(2, 6),
+        'stipend': rng.choice([5000, 8000, 10000, 12000, 15000]),
+        'rural_quota': rng.randint(0, 2),
+        'sc_quota': rng.randint(0, 2),
+        'st_quota': rng.randint(0, 1),
+        'obc_quota': rng.randint(0, 2),
+        'is_active': True,
+    }
+
+
+def make_students(count, seed=0, variant_rate=0.5, start=0):
+    """Transient Student objects with their canonical skill sets"""
+    rng = random.Random(seed)
+    students = []
+    for index in range(start, start + count):
+        canonical, fields = student_fields(rng, index, variant_rate)
+        students.append((Student(**fields), canonical))
+    return students
+
+
+def make_internships(count, department_id=None, seed=1, variant_rate=0.5, start=0):
+    """Transient Internship objects with their canonical skill sets"""
+    rng = random.Random(seed)
+    internships = []
+    for index in range(start, start + count):
+        canonical, fields = internship_fields(rng, index, department_id, variant_rate)
+        internships.append((Internship(**fields), canonical))
+    return internships
+
+
+def populate_students(count, seed=0, start=0, password=SYNTHETIC_PASSWORD):
+    """Insert synthetic students that can log in; existing emails are left alone.
+
+    Returns the emails of all ``count`` accounts.
+    """
+    from extensions import db
+
+    students = [student for student, _ in make_students(count, seed=seed, start=start)]
+    emails = [student.email for student in students]
+    existing = {email for (email,) in db.session.query(Student.email).filter(Student.email.in_(emails))}
+    for student in students:
+        if student.email not in existing:
+            student.set_password(password)
+            db.session.add(student)
+    db.session.commit()
+    return emails
+
+
+def populate_department(index=0, password=SYNTHETIC_PASSWORD):
+    """A synthetic department that can log in (and the admin who created it), made if missing"""
+    from extensions import db
+
+    admin = Admin.query.filter_by(email='admin@synthetic.test').first()
+    if admin is None:
+        admin = Admin(email='admin@synthetic.test', name='Synthetic Admin')
+        admin.set_password(password)
+        db.session.add(admin)
+        db.session.flush()
+    email = f'department{index}@synthetic.test'
+    department = Department.query.filter_by(email=email).first()
+    if department is None:
+        department = Department(email=email, name=f'Synthetic Department {index}', department_type='Central',
+                                ministry='Synthetic Ministry', created_by=admin.id)
+        department.set_password(password)
+        db.session.add(department)
+    db.session.commit()
+    return department
+
+
+def populate_applications(internship_id, emails, status='pending'):
+    """One application per student email to an internship; returns the application IDs"""
+    from extensions import db
+
+    student_ids = [student_id for (student_id,) in db.session.query(Student.id).filter(Student.email.in_(emails))]
+    applications = [Application(student_id=student_id, internship_id=internship_id, status=status)
+                    for student_id in student_ids]
+    db.session.add_all(applications)
+    db.session.commit()
+    return [application.id for application in applications]
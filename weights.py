@@ -0,0 +1,123 @@
+import json
+import logging
+import time
+
+from sqlalchemy import delete, func, select, update
+
+from extensions import db
+
+# Component score -> Match column it is stored in
+COMPONENTS = {
+    'skills': 'skills_score',
+    'academic': 'academic_score',
+    'location': 'location_score',
+    'sector': 'sector_score',
+    'affirmative_action': 'affirmative_action_score',
+}
+
+# app_settings key of the weights switched to with `flask matches reweight`
+WEIGHTS_SETTING = 'match_weights'
+
+# Named weight profiles; "default" is what matches were always scored with
+WEIGHT_PROFILES = {
+    'default': {'skills': 0.35, 'academic': 0.25, 'location': 0.20, 'sector': 0.15, 'affirmative_action': 0.05},
+    'skills_first': {'skills': 0.50, 'academic': 0.20, 'location': 0.10, 'sector': 0.15, 'affirmative_action': 0.05},
+    'inclusion': {'skills': 0.30, 'academic': 0.20, 'location': 0.20, 'sector': 0.10, 'affirmative_action': 0.20},
+}
+
+
+def normalize_weights(weights):
+    """Weights for every component, scaled to sum to 1 so overall scores stay in 0..1"""
+    unknown = set(weights) - set(COMPONENTS)
+    if unknown:
+        raise ValueError(f"unknown score components {sorted(unknown)}; expected {list(COMPONENTS)}")
+    if any(weight < 0 for weight in weights.values()):
+        raise ValueError("weights cannot be negative")
+    total = sum(weights.values())
+    if not total:
+        raise ValueError("at least one weight must be positive")
+    return {name: float(weights.get(name, 0.0)) / total for name in COMPONENTS}
+
+
+def parse_weights(text):
+    """'skills=0.4,academic=0.3,...' -> normalized weights (missing components weigh 0)"""
+    weights = {}
+    for part in filter(None, (part.strip() for part in text.split(','))):
+        name, _, weight = part.partition('=')
+        try:
+            weights[name.strip()] = float(weight)
+        except ValueError:
+            raise ValueError(f"bad weight {part!r}; expected component=number") from None
+    return normalize_weights(weights)
+
+
+def resolve_weights(profile='default', override=None, profiles=None):
+    """The weights in effect: an explicit 'name=weight,...' override, else the named profile"""
+    if override:
+        return parse_weights(override)
+    profiles = profiles or WEIGHT_PROFILES
+    if profile not in profiles:
+        raise ValueError(f"unknown weight profile {profile!r}; expected one of {sorted(profiles)}")
+    return normalize_weights(profiles[profile])
+
+
+def weighted_score(scores, weights):
+    """Overall score from a {component: score} dict"""
+    return float(sum((scores.get(name) or 0.0) * weight for name, weight in weights.items()))
+
+
+def overall_score_expression(weights):
+    """SQL expression deriving the overall score from the stored component columns"""
+    from models import Match
+
+    return sum(func.coalesce(getattr(Match, COMPONENTS[name]), 0.0) * weight
+               for name, weight in weights.items())
+
+
+def stored_weights():
+    """Weights switched to with `flask matches reweight`, or None when the configured ones apply.
+
+    Read on a connection of its own, so a missing app_settings table (before
+    `flask db upgrade`) cannot break the caller's transaction.
+    """
+    from models import AppSetting
+
+    try:
+        with db.engine.connect() as connection:
+            value = connection.execute(select(AppSetting.value).where(AppSetting.key == WEIGHTS_SETTING)).scalar()
+    except Exception as e:
+        logging.warning(f"Could not read the stored match weights: {e}")
+        return None
+    return normalize_weights(json.loads(value)) if value else None
+
+
+def reweight_matches(weights, switch=True):
+    """Make ``weights`` the active weights and re-derive overall_score for every live match.
+
+    With ``switch`` the weights are stored in app_settings, where every engine
+    picks them up for new matches (see InternshipMatchingEngine.refresh_weights);
+    without it the stored weights are cleared and the configured ones apply
+    again. The setting and the UPDATE commit together. Nothing is rescored: the
+    stored component scores are recombined in the database. Only the published
+    generation is touched; superseded ones keep the scores their readers saw.
+    Returns (rows updated, seconds taken).
+    """
+    from generations import live_matches
+    from models import AppSetting, Match
+
+    start = time.perf_counter()
+    try:
+        if switch:
+            db.session.merge(AppSetting(key=WEIGHTS_SETTING, value=json.dumps(weights)))
+        else:
+            db.session.execute(delete(AppSetting).where(AppSetting.key == WEIGHTS_SETTING))
+        result = db.session.execute(update(Match).where(live_matches())
+                                    .values(overall_score=overall_score_expression(weights))
+                                    .execution_options(synchronize_session=False))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    seconds = time.perf_counter() - start
+    logging.info(f"Re-weighted {result.rowcount} matches in {seconds:.2f}s")
+    return result.rowcount, seconds